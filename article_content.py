@@ -0,0 +1,269 @@
+import argparse
+import hashlib
+import zlib
+
+from mysql.connector import Error
+
+from download_articles_from_db import create_connection
+from loader_common import EXISTS_LOOKUP_SIZE, fetch_existing_rows
+
+try:
+    import zstandard
+except ImportError:  # zstandard 已列入 requirements.txt；未安装时新写入退回标准库 zlib，但无法读取 zstd 行
+    zstandard = None
+
+# 新写入正文默认使用的压缩算法；已写入的行按各自的 codec 解压
+DEFAULT_CODEC = 'zstd' if zstandard else 'zlib'
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+
+def content_hash(text):
+    """正文的SHA-256，用于判断正文是否变化"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress_content(text, codec=DEFAULT_CODEC):
+    """
+    压缩正文
+
+    Args:
+        text: 正文
+        codec: zstd / zlib
+
+    Returns:
+        tuple: (codec, 原文SHA-256, 原文UTF-8字节数, 压缩后的字节串)
+    """
+    raw = text.encode('utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("未安装 zstandard，无法使用 zstd 压缩，请 pip install zstandard 或改用 zlib")
+        data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    elif codec == 'zlib':
+        data = zlib.compress(raw, ZLIB_LEVEL)
+    else:
+        raise ValueError(f"不支持的压缩算法: {codec}")
+    return codec, hashlib.sha256(raw).hexdigest(), len(raw), data
+
+
+def decompress_content(codec, data):
+    """按 codec 解压正文"""
+    if data is None:
+        return None
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("该正文使用 zstd 压缩，读取前请 pip install zstandard")
+        raw = zstandard.ZstdDecompressor().decompress(bytes(data))
+    elif codec == 'zlib':
+        raw = zlib.decompress(bytes(data))
+    else:
+        raise ValueError(f"不支持的压缩算法: {codec}")
+    return raw.decode('utf-8')
+
+
+def store_contents(connection, cursor, items, codec=DEFAULT_CODEC):
+    """
+    把正文压缩后写入 article_content 并提交
+
+    先按文章ID批量查询已存储正文的哈希，哈希相同的直接跳过，不再压缩和写入。
+
+    Args:
+        connection: MySQL数据库连接对象
+        cursor: 游标
+        items: [(文章ID, 正文), ...]，正文为空的跳过
+        codec: 压缩算法
+
+    Returns:
+        tuple: (写入条数, 未变化条数)
+    """
+    items = {article_id: text for article_id, text in items if text}
+    existing = fetch_existing_rows(cursor, 'article_content', 'article_id', ['content_hash'], items)
+    rows = []
+    for article_id, text in items.items():
+        digest = content_hash(text)
+        if existing.get(article_id) == (digest,):
+            continue
+        rows.append((article_id,) + compress_content(text, codec))
+    if rows:
+        cursor.executemany("""
+                           INSERT INTO article_content (article_id, codec, content_hash, raw_length, data)
+                           VALUES (%s, %s, %s, %s, %s)
+                           ON DUPLICATE KEY UPDATE codec = VALUES(codec), content_hash = VALUES(content_hash),
+                                                   raw_length = VALUES(raw_length), data = VALUES(data)
+                           """, rows)
+    connection.commit()
+    return len(rows), len(items) - len(rows)
+
+
+def store_contents_by_url(connection, cursor, contents, codec=DEFAULT_CODEC):
+    """
+    按文章链接写入压缩正文，供导入脚本在写入 articles 之后调用
+
+    Args:
+        contents: {url: 正文}
+
+    Returns:
+        tuple: (写入条数, 未变化条数)
+    """
+    ids = fetch_existing_rows(cursor, 'articles', 'url', ['id'], contents)
+    return store_contents(connection, cursor, [(ids[url][0], text) for url, text in contents.items() if url in ids],
+                          codec)
+
+
+def get_article_contents(connection, article_ids):
+    """
+    批量读取正文，透明解压
+
+    优先读取 article_content；尚未迁移的文章读取 articles.content 中的原文。
+
+    Args:
+        connection: MySQL数据库连接对象
+        article_ids: 文章ID列表
+
+    Returns:
+        dict: {文章ID: 正文}，没有正文的文章不在结果中
+    """
+    article_ids = list(article_ids)
+    contents = {}
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(article_ids), EXISTS_LOOKUP_SIZE):
+            chunk = article_ids[start:start + EXISTS_LOOKUP_SIZE]
+            cursor.execute(f"""
+                           SELECT a.id, c.codec, c.data, a.content
+                           FROM articles a
+                                    LEFT JOIN article_content c ON c.article_id = a.id
+                           WHERE a.id IN ({', '.join(['%s'] * len(chunk))})
+                           """, tuple(chunk))
+            for article_id, codec, data, inline in cursor.fetchall():
+                text = decompress_content(codec, data) if data is not None else inline
+                if text is not None:
+                    contents[article_id] = text
+    finally:
+        cursor.close()
+    return contents
+
+
+def get_compressed_contents(connection, article_ids):
+    """
+    只从 article_content 批量读取并解压正文，不读取 articles.content
+
+    供已经查出 articles.content 的调用方在没有压缩正文时回退到原文。
+
+    Returns:
+        dict: {文章ID: 正文}，article_content 中没有的文章不在结果中
+    """
+    article_ids = list(article_ids)
+    contents = {}
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(article_ids), EXISTS_LOOKUP_SIZE):
+            chunk = article_ids[start:start + EXISTS_LOOKUP_SIZE]
+            cursor.execute(f"SELECT article_id, codec, data FROM article_content "
+                           f"WHERE article_id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+            for article_id, codec, data in cursor.fetchall():
+                contents[article_id] = decompress_content(codec, data)
+    finally:
+        cursor.close()
+    return contents
+
+
+def get_article_content(connection, article_id):
+    """
+    读取单篇文章的正文
+
+    Returns:
+        str: 正文，没有正文时为None
+    """
+    return get_article_contents(connection, [article_id]).get(article_id)
+
+
+def migrate_inline_content(connection, codec=DEFAULT_CODEC, batch_size=500, keep_inline=False):
+    """
+    把 articles.content 中的原文迁移到 article_content
+
+    按ID分批处理，每批压缩写入后清空 articles.content 并提交，中断后重新运行会从剩余的行继续。
+
+    Args:
+        connection: MySQL数据库连接对象
+        codec: 压缩算法
+        batch_size: 每批迁移的文章数
+        keep_inline: 是否保留 articles.content 中的原文
+
+    Returns:
+        dict: 迁移的文章数、原文和压缩后的字节数
+    """
+    stats = {'articles': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+    last_id = 0
+    cursor = connection.cursor()
+    try:
+        while True:
+            cursor.execute("""
+                           SELECT id, content FROM articles
+                           WHERE id > %s AND content IS NOT NULL
+                           ORDER BY id LIMIT %s
+                           """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            store_contents(connection, cursor, rows, codec)
+            if not keep_inline:
+                ids = [row[0] for row in rows]
+                cursor.execute(f"UPDATE articles SET content = NULL WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                               tuple(ids))
+            connection.commit()
+
+            stats['articles'] += len(rows)
+            stats['raw_bytes'] += sum(len(text.encode('utf-8')) for _, text in rows if text)
+            print(f"已迁移 {stats['articles']} 篇文章正文")
+
+        cursor.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM article_content")
+        stats['stored_bytes'] = int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+    print(f"迁移完成: {stats['articles']} 篇，原文 {stats['raw_bytes'] / 1024 / 1024:.1f} MB，"
+          f"article_content 共 {stats['stored_bytes'] / 1024 / 1024:.1f} MB")
+    if stats['articles'] and not keep_inline:
+        print("提示: 清空 articles.content 后可执行 OPTIMIZE TABLE articles 回收表空间")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章正文压缩存储：迁移已有正文或读取单篇正文')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--migrate', action='store_true', help='把 articles.content 中的原文迁移到 article_content')
+    parser.add_argument('--codec', choices=['zstd', 'zlib'], default=DEFAULT_CODEC,
+                        help=f'压缩算法 (默认: {DEFAULT_CODEC})')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批迁移的文章数 (默认: 500)')
+    parser.add_argument('--keep-inline', action='store_true', help='迁移后保留 articles.content 中的原文')
+    parser.add_argument('--article-id', type=int, help='打印指定文章的正文')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        if args.migrate:
+            migrate_inline_content(connection, args.codec, args.batch_size, args.keep_inline)
+        if args.article_id:
+            content = get_article_content(connection, args.article_id)
+            print(content if content is not None else f"文章 {args.article_id} 没有正文")
+    except (Error, ValueError) as e:
+        print(f"处理正文时出错: {e}")
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+文章元数据的本地SQLite镜像
+
+增量同步只拉取新增行：articles 按 id 高水位同步，阅读、点赞等计数的变化和删除不会同步；
+article_link_info 另外按 collect_time 同步重新采集的行。需要这些变化时用 --full 全量重建。
+"""
+import argparse
+import os
+import sqlite3
+
+from download_articles_from_db import create_connection
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_dir", "article_mirror.db")
+
+# 镜像的列，articles 只同步元数据，不含正文和分词结果
+LINK_INFO_COLUMNS = ["id", "account_name", "title", "link", "release_date", "release_day", "is_free",
+                     "collect_time"]
+ARTICLES_COLUMNS = ["id", "sys_id", "account_name", "url", "title", "cover_image", "summary", "create_time",
+                    "publish_time", "read_count", "like_count", "share_count", "favorite_count",
+                    "comment_count", "author", "is_original", "article_type", "collection"]
+
+MIRROR_SCHEMA = """
+                CREATE TABLE IF NOT EXISTS article_link_info (
+                    id           INTEGER PRIMARY KEY,
+                    account_name TEXT NOT NULL,
+                    title        TEXT NOT NULL,
+                    link         TEXT NOT NULL,
+                    release_date TEXT,
+                    release_day  TEXT,
+                    is_free      INTEGER NOT NULL,
+                    collect_time TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_link_collect ON article_link_info (collect_time, id);
+                CREATE INDEX IF NOT EXISTS idx_link_account_collect ON article_link_info (account_name, collect_time, id);
+                CREATE INDEX IF NOT EXISTS idx_link_free_collect ON article_link_info (is_free, collect_time, id);
+                CREATE INDEX IF NOT EXISTS idx_link_release_day ON article_link_info (release_day);
+
+                CREATE TABLE IF NOT EXISTS articles (
+                    id             INTEGER PRIMARY KEY,
+                    sys_id         TEXT,
+                    account_name   TEXT NOT NULL,
+                    url            TEXT NOT NULL,
+                    title          TEXT NOT NULL,
+                    cover_image    TEXT,
+                    summary        TEXT,
+                    create_time    TEXT,
+                    publish_time   TEXT,
+                    read_count     INTEGER,
+                    like_count     INTEGER,
+                    share_count    INTEGER,
+                    favorite_count INTEGER,
+                    comment_count  INTEGER,
+                    author         TEXT,
+                    is_original    INTEGER,
+                    article_type   TEXT,
+                    collection     TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_articles_account_publish ON articles (account_name, publish_time);
+                CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    table_name        TEXT PRIMARY KEY,
+                    last_id           INTEGER NOT NULL DEFAULT 0,
+                    last_collect_time TEXT
+                );
+                """
+
+
+def open_mirror(mirror_path=DEFAULT_MIRROR_PATH, create=False):
+    """
+    打开本地SQLite镜像
+
+    返回的连接可以直接传给 download_articles_from_db 中的查询函数使用。
+
+    Args:
+        mirror_path: 镜像文件路径
+        create: 文件不存在时是否创建
+
+    Returns:
+        sqlite3.Connection: 镜像连接
+    """
+    if not create and not os.path.exists(mirror_path):
+        raise FileNotFoundError(f"本地镜像 {mirror_path} 不存在，请先运行 article_mirror.py 同步")
+    os.makedirs(os.path.dirname(os.path.abspath(mirror_path)), exist_ok=True)
+    mirror = sqlite3.connect(mirror_path)
+    mirror.execute("PRAGMA journal_mode = WAL")
+    mirror.execute("PRAGMA synchronous = NORMAL")
+    mirror.executescript(MIRROR_SCHEMA)
+    return mirror
+
+
+def _to_text(value):
+    """SQLite没有日期类型，统一存为可按字符串排序的文本"""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M:%S") if hasattr(value, "hour") else value.strftime("%Y-%m-%d")
+    return value
+
+
+def _get_state(mirror, table_name):
+    row = mirror.execute("SELECT last_id, last_collect_time FROM sync_state WHERE table_name = ?",
+                         (table_name,)).fetchone()
+    return row if row else (0, None)
+
+
+def _save_state(mirror, table_name, last_id, last_collect_time):
+    mirror.execute("INSERT OR REPLACE INTO sync_state (table_name, last_id, last_collect_time) VALUES (?, ?, ?)",
+                   (table_name, last_id, last_collect_time))
+
+
+def _copy_rows(mirror, table_name, columns, rows):
+    placeholders = ", ".join("?" for _ in columns)
+    mirror.executemany(f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                       [tuple(_to_text(value) for value in row) for row in rows])
+
+
+def _sync_new_rows(connection, mirror, table_name, columns, last_id, batch_size):
+    """按主键高水位同步新增的行，返回 (行数, 新的最大ID, 最大采集时间)"""
+    cursor = connection.cursor()
+    synced = 0
+    max_collect_time = None
+    collect_index = columns.index("collect_time") if "collect_time" in columns else None
+    try:
+        while True:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} WHERE id > %s ORDER BY id LIMIT %s",
+                           (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            _copy_rows(mirror, table_name, columns, rows)
+            last_id = rows[-1][0]
+            if collect_index is not None:
+                batch_max = max(_to_text(row[collect_index]) for row in rows)
+                max_collect_time = max(max_collect_time or batch_max, batch_max)
+            synced += len(rows)
+            mirror.commit()
+            print(f"  {table_name}: 已同步新增 {synced} 行")
+    finally:
+        cursor.close()
+    return synced, last_id, max_collect_time
+
+
+def _sync_updated_link_rows(connection, mirror, last_id, last_collect_time, batch_size):
+    """按采集时间高水位同步已镜像范围内被重新采集（collect_time变化）的行"""
+    cursor = connection.cursor()
+    synced = 0
+    max_collect_time = last_collect_time
+    cursor_time, cursor_id = last_collect_time, last_id
+    try:
+        while True:
+            cursor.execute(f"""
+                           SELECT {', '.join(LINK_INFO_COLUMNS)} FROM article_link_info
+                           WHERE id <= %s AND (collect_time > %s OR (collect_time = %s AND id > %s))
+                           ORDER BY collect_time, id LIMIT %s
+                           """, (last_id, cursor_time, cursor_time, cursor_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            _copy_rows(mirror, "article_link_info", LINK_INFO_COLUMNS, rows)
+            cursor_time, cursor_id = _to_text(rows[-1][-1]), rows[-1][0]
+            max_collect_time = max(max_collect_time, cursor_time)
+            synced += len(rows)
+            mirror.commit()
+    finally:
+        cursor.close()
+    return synced, max_collect_time
+
+
+def sync_mirror(connection, mirror_path=DEFAULT_MIRROR_PATH, batch_size=5000, full=False):
+    """
+    把 article_link_info 和 articles 的元数据增量同步到本地SQLite镜像
+
+    - 新增行按 id 高水位拉取
+    - article_link_info 中已有行若重新采集（collect_time 变大）则按 collect_time 高水位拉取
+    - articles 只追加新行：已同步行的计数等修改不会更新（表中没有可用的修改时间列）
+    - full=True 时清空镜像后全量同步（用于同步删除或 articles 计数的变化）
+
+    Args:
+        connection: MySQL数据库连接对象
+        mirror_path: 镜像文件路径
+        batch_size: 每批拉取的行数
+        full: 是否全量重建
+
+    Returns:
+        dict: 各表同步的行数
+    """
+    mirror = open_mirror(mirror_path, create=True)
+    stats = {}
+    try:
+        if full:
+            mirror.execute("DELETE FROM article_link_info")
+            mirror.execute("DELETE FROM articles")
+            mirror.execute("DELETE FROM sync_state")
+            mirror.commit()
+
+        # article_link_info：先同步旧范围内的更新，再同步新增，避免新行被重复拉取
+        last_id, last_collect_time = _get_state(mirror, "article_link_info")
+        updated = 0
+        if last_collect_time:
+            updated, last_collect_time = _sync_updated_link_rows(connection, mirror, last_id, last_collect_time,
+                                                                 batch_size)
+        inserted, last_id, new_max_time = _sync_new_rows(connection, mirror, "article_link_info",
+                                                         LINK_INFO_COLUMNS, last_id, batch_size)
+        if new_max_time:
+            last_collect_time = max(last_collect_time or new_max_time, new_max_time)
+        _save_state(mirror, "article_link_info", last_id, last_collect_time)
+        stats["article_link_info"] = {"inserted": inserted, "updated": updated}
+
+        last_id, _ = _get_state(mirror, "articles")
+        inserted, last_id, _ = _sync_new_rows(connection, mirror, "articles", ARTICLES_COLUMNS, last_id,
+                                              batch_size)
+        _save_state(mirror, "articles", last_id, None)
+        stats["articles"] = {"inserted": inserted}
+        mirror.commit()
+    finally:
+        mirror.close()
+
+    print(f"同步完成: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把文章元数据同步到本地SQLite镜像')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--mirror', default=DEFAULT_MIRROR_PATH, help=f'镜像文件路径 (默认: {DEFAULT_MIRROR_PATH})')
+    parser.add_argument('--batch-size', type=int, default=5000, help='每批拉取的行数 (默认: 5000)')
+    parser.add_argument('--full', action='store_true', help='清空镜像后全量同步；增量同步对 articles 只追加新行，'
+                             '已有行的修改（如阅读、点赞数）以及两表的删除只有全量同步才会反映到镜像')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        sync_mirror(connection, args.mirror, args.batch_size, args.full)
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+
+if __name__ == "__main__":
+    main()
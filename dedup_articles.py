@@ -0,0 +1,267 @@
+import argparse
+import json
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from mysql.connector import Error
+
+from article_content import get_article_contents
+from download_articles_from_db import create_connection
+
+NUM_PERM = 128
+BANDS = 16  # 16个band、每band 8行，Jaccard约0.7以上的文章对大概率成为候选
+SHINGLE_SIZE = 5  # 正文按5字切片
+MAX_BUCKET_SIZE = 200  # 超大的桶多为模板化正文等退化情况，只取前若干篇生成候选对
+TITLE_SHINGLE_SIZE = 3  # 标题按3字切片
+MIN_FEATURES = 8  # 特征太少时相似度没有区分度（如只剩一两个关键词），不参与聚类
+SEED = 20250817
+
+
+class MinHasher:
+    """
+    MinHash签名：每个排列用 (a*x + b) mod 2^64 的高32位近似随机排列，整批特征一次向量化计算
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, features):
+        """
+        计算特征集合的签名
+
+        Returns:
+            np.ndarray: 长度为 num_perm 的 uint32 数组；特征为空时全为最大值
+        """
+        if not features:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features), dtype=np.uint64,
+                             count=len(features))
+        with np.errstate(over='ignore'):
+            permuted = (self.a[:, np.newaxis] * hashes[np.newaxis, :] + self.b[:, np.newaxis]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def article_features(title, segment_words, content=None, shingle_size=SHINGLE_SIZE):
+    """
+    文章的特征集合：标题的字切片、分词结果，加上去掉空白后正文的字切片
+
+    分词结果只保留技术关键词，标题常常只剩一两个词，所以始终带上标题切片，
+    否则 "Flink到底是什么？" 和 "Flink为什么这么快？" 的特征会完全相同。
+    """
+    features = set()
+    if title:
+        text = ''.join(title.split())
+        features.update(f"t:{text[i:i + TITLE_SHINGLE_SIZE]}"
+                        for i in range(max(len(text) - TITLE_SHINGLE_SIZE + 1, 1)))
+    words = json.loads(segment_words) if segment_words else []
+    features.update(f"w:{word}" for word in words)
+    if content:
+        text = ''.join(content.split())
+        features.update(f"c:{text[i:i + shingle_size]}" for i in range(max(len(text) - shingle_size + 1, 1)))
+    return features
+
+
+def compute_signatures(connection, hasher, with_content=True, batch_size=2000, min_features=MIN_FEATURES):
+    """
+    按ID分批读取文章并计算签名
+
+    特征数少于 min_features 的文章不计算签名，不参与聚类。
+
+    Returns:
+        tuple: (文章ID数组, 签名矩阵 (文章数 x num_perm))
+    """
+    article_ids = []
+    signatures = []
+    skipped = 0
+    cursor = connection.cursor()
+    try:
+        last_id = 0
+        while True:
+            cursor.execute("SELECT id, title, segment_words FROM articles WHERE id > %s ORDER BY id LIMIT %s",
+                           (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            contents = get_article_contents(connection, [row[0] for row in rows]) if with_content else {}
+            for article_id, title, segment_words in rows:
+                features = article_features(title, segment_words, contents.get(article_id))
+                if len(features) < min_features:
+                    skipped += 1
+                    continue
+                article_ids.append(article_id)
+                signatures.append(hasher.signature(features))
+            print(f"已计算 {len(article_ids)} 篇文章的签名")
+    finally:
+        cursor.close()
+
+    if skipped:
+        print(f"{skipped} 篇文章特征少于 {min_features} 个，不参与聚类")
+
+    if not signatures:
+        return np.array([], dtype=np.int64), np.empty((0, hasher.num_perm), dtype=np.uint32)
+    return np.asarray(article_ids, dtype=np.int64), np.vstack(signatures)
+
+
+def lsh_candidate_pairs(signatures, bands=BANDS, max_bucket_size=MAX_BUCKET_SIZE):
+    """
+    LSH分桶：签名切成 bands 段，任一段完全相同的文章进入同一个桶，只有同桶的文章两两成为候选
+
+    超过 max_bucket_size 的桶只取前 max_bucket_size 篇，其余文章在该band中不生成候选对。
+
+    Returns:
+        tuple: ({(行号i, 行号j), ...}（i < j）, 因桶过大被截断的文章数（按band累计）)
+    """
+    rows_per_band = signatures.shape[1] // bands
+    pairs = set()
+    truncated = 0
+    for band in range(bands):
+        buckets = defaultdict(list)
+        segment = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        for i, key in enumerate(segment.view(np.dtype((np.void, segment.dtype.itemsize * rows_per_band))).ravel()):
+            buckets[key.tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) > max_bucket_size:
+                truncated += len(members) - max_bucket_size
+                members = members[:max_bucket_size]
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((members[x], members[y]))
+    return pairs, truncated
+
+
+def cluster_duplicates(article_ids, signatures, threshold=0.8, bands=BANDS):
+    """
+    找出近似重复的文章并聚类
+
+    候选对按签名一致的比例（Jaccard相似度的估计）过滤，再用并查集合并为簇。
+
+    Args:
+        article_ids: 文章ID数组
+        signatures: 签名矩阵
+        threshold: 判定为重复的最小相似度
+        bands: LSH的band数
+
+    Returns:
+        dict: {文章ID: 簇ID}，簇ID为簇中最小的文章ID；没有重复的文章不在结果中
+    """
+    empty = np.all(signatures == np.iinfo(np.uint32).max, axis=1)
+    parent = list(range(len(article_ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    candidates, truncated = lsh_candidate_pairs(signatures, bands)
+    print(f"LSH候选文章对 {len(candidates)} 个")
+    if truncated:
+        print(f"警告: {truncated} 个桶成员因桶超过 {MAX_BUCKET_SIZE} 篇被截断，可能漏掉部分重复")
+    for i, j in candidates:
+        if empty[i] or empty[j]:
+            continue
+        if np.count_nonzero(signatures[i] == signatures[j]) / signatures.shape[1] >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    members = defaultdict(list)
+    for i in range(len(article_ids)):
+        members[find(i)].append(i)
+    clusters = {}
+    for rows in members.values():
+        if len(rows) > 1:
+            cluster_id = int(article_ids[rows].min())
+            clusters.update((int(article_ids[row]), cluster_id) for row in rows)
+    return clusters
+
+
+def save_clusters(connection, clusters, chunk_size=20000):
+    """
+    把簇ID写入 articles.dup_cluster_id
+
+    先写入临时表，再按ID区间 UPDATE ... LEFT JOIN，不在任何簇中的文章置为NULL。
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_dup_clusters")
+        cursor.execute("""
+                       CREATE TEMPORARY TABLE tmp_dup_clusters (
+                           id         BIGINT PRIMARY KEY,
+                           cluster_id BIGINT NOT NULL
+                       ) ENGINE = InnoDB
+                       """)
+        items = list(clusters.items())
+        for start in range(0, len(items), 5000):
+            cursor.executemany("INSERT INTO tmp_dup_clusters (id, cluster_id) VALUES (%s, %s)",
+                               items[start:start + 5000])
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM articles")
+        max_id = cursor.fetchone()[0]
+        changed = 0
+        for start in range(0, max_id + 1, chunk_size):
+            cursor.execute("""
+                           UPDATE articles a
+                               LEFT JOIN tmp_dup_clusters t ON t.id = a.id
+                           SET a.dup_cluster_id = t.cluster_id
+                           WHERE a.id BETWEEN %s AND %s
+                           """, (start, start + chunk_size - 1))
+            changed += cursor.rowcount
+            connection.commit()
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_dup_clusters")
+        print(f"已更新 {changed} 篇文章的 dup_cluster_id")
+        return changed
+    finally:
+        cursor.close()
+
+
+def dedup_articles(connection, threshold=0.8, with_content=True, dry_run=False):
+    """
+    计算全部文章的近似重复簇并写回 articles.dup_cluster_id
+
+    Returns:
+        dict: {文章ID: 簇ID}
+    """
+    article_ids, signatures = compute_signatures(connection, MinHasher(), with_content)
+    clusters = cluster_duplicates(article_ids, signatures, threshold)
+    print(f"共 {len(article_ids)} 篇文章，{len(set(clusters.values()))} 个重复簇，"
+          f"涉及 {len(clusters)} 篇文章")
+    if not dry_run:
+        save_clusters(connection, clusters)
+    return clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用MinHash和LSH找出近似重复的文章，并写入 articles.dup_cluster_id')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--threshold', type=float, default=0.8, help='判定为重复的最小相似度 (默认: 0.8)')
+    parser.add_argument('--no-content', action='store_true', help='只用标题和标题分词，不读取正文')
+    parser.add_argument('--dry-run', action='store_true', help='只统计，不写回数据库')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        dedup_articles(connection, args.threshold, not args.no_content, args.dry_run)
+    except Error as e:
+        print(f"计算重复文章时出错: {e}")
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+
+if __name__ == "__main__":
+    main()
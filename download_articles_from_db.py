@@ -1,14 +1,20 @@
 import sys
+import base64
+import json
+import sqlite3
 
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 import argparse
 
 from mysql.connector.abstracts import MySQLConnectionAbstract
 from mysql.connector.pooling import PooledMySQLConnection
 
+# article_link_info 查询列，顺序与 ArticleInfo 构造参数一致
+ARTICLE_COLUMNS = "id, account_name, title, link, release_date, is_free, collect_time"
+
 
 class ArticleInfo:
     """
@@ -65,6 +71,194 @@ def create_connection(host: str, database: str, user: str, password: str,
         return None
 
 
+def encode_page_token(collect_time: datetime, article_id: int) -> str:
+    """
+    将分页游标 (collect_time, id) 编码为页码令牌
+
+    Args:
+        collect_time: 上一页最后一条记录的采集时间
+        article_id: 上一页最后一条记录的ID
+
+    Returns:
+        str: URL安全的页码令牌
+    """
+    payload = json.dumps({"t": collect_time.strftime("%Y-%m-%d %H:%M:%S"), "id": article_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(page_token: str) -> Tuple[datetime, int]:
+    """
+    解析页码令牌
+
+    Args:
+        page_token: encode_page_token 生成的令牌
+
+    Returns:
+        Tuple[datetime, int]: (collect_time, id) 游标
+
+    Raises:
+        ValueError: 令牌格式不正确
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(page_token.encode("ascii")).decode("utf-8"))
+        return datetime.strptime(payload["t"], "%Y-%m-%d %H:%M:%S"), int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"无效的页码令牌: {page_token}") from e
+
+
+def _row_to_article(row) -> ArticleInfo:
+    """将查询结果行转换为ArticleInfo对象"""
+    collect_time = row[6]
+    if isinstance(collect_time, str):
+        # 本地SQLite镜像中时间以文本存储
+        collect_time = datetime.strptime(collect_time, "%Y-%m-%d %H:%M:%S")
+    return ArticleInfo(
+        id=row[0],
+        account_name=row[1],
+        title=row[2],
+        link=row[3],
+        release_date=row[4],
+        is_free=row[5],
+        collect_time=collect_time
+    )
+
+
+def _execute(connection, sql: str, params: tuple):
+    """
+    执行查询并返回全部结果，兼容MySQL连接和本地SQLite镜像连接
+    """
+    if isinstance(connection, sqlite3.Connection):
+        sql = sql.replace("%s", "?")
+        params = tuple(p.strftime("%Y-%m-%d %H:%M:%S") if isinstance(p, datetime) else p for p in params)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ArticleQuery:
+    """
+    文章查询构建器
+
+    任意组合账号、是否免费、采集时间范围和发布日期范围过滤条件，
+    按 (collect_time, id) 倒序输出，并支持基于游标（keyset）的分页。
+    时间范围均为左闭右开区间；发布日期按 migrate_schema 维护的 release_day 列（YYYY-MM-DD）过滤。
+    """
+
+    def __init__(self, account_name: str = None, is_free: int = None,
+                 collect_time_from: datetime = None, collect_time_to: datetime = None,
+                 release_date_from: str = None, release_date_to: str = None):
+        self.account_name = account_name
+        self.is_free = is_free
+        self.collect_time_from = collect_time_from
+        self.collect_time_to = collect_time_to
+        self.release_date_from = release_date_from
+        self.release_date_to = release_date_to
+
+    def _where(self) -> Tuple[List[str], list]:
+        """生成过滤条件及参数"""
+        conditions = []
+        params = []
+        if self.account_name is not None:
+            conditions.append("account_name = %s")
+            params.append(self.account_name)
+        if self.is_free is not None:
+            conditions.append("is_free = %s")
+            params.append(int(self.is_free))
+        if self.collect_time_from is not None:
+            conditions.append("collect_time >= %s")
+            params.append(self.collect_time_from)
+        if self.collect_time_to is not None:
+            conditions.append("collect_time < %s")
+            params.append(self.collect_time_to)
+        if self.release_date_from is not None:
+            conditions.append("release_day >= %s")
+            params.append(self.release_date_from)
+        if self.release_date_to is not None:
+            conditions.append("release_day < %s")
+            params.append(self.release_date_to)
+        return conditions, params
+
+    def to_sql(self, page_size: int = None, page_token: str = None) -> Tuple[str, tuple]:
+        """
+        生成SQL语句及参数
+
+        Args:
+            page_size: 每页条数，为None时不分页
+            page_token: 上一页返回的页码令牌
+
+        Returns:
+            Tuple[str, tuple]: SQL语句和参数
+        """
+        conditions, params = self._where()
+        if page_token:
+            last_collect_time, last_id = decode_page_token(page_token)
+            # 展开为 OR 形式，便于优化器在 (collect_time, id) 上做范围扫描
+            conditions.append("(collect_time < %s OR (collect_time = %s AND id < %s))")
+            params.extend([last_collect_time, last_collect_time, last_id])
+
+        sql = f"SELECT {ARTICLE_COLUMNS} FROM article_link_info"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY collect_time DESC, id DESC"
+        if page_size:
+            sql += " LIMIT %s"
+            params.append(int(page_size))
+        return sql, tuple(params)
+
+    def fetch_page(self, connection, page_size: int,
+                   page_token: str = None) -> Tuple[List[ArticleInfo], Optional[str]]:
+        """
+        获取一页文章信息
+
+        Args:
+            connection: MySQL数据库连接对象或本地SQLite镜像连接
+            page_size: 每页条数
+            page_token: 上一页返回的页码令牌，为None时从第一页开始
+
+        Returns:
+            Tuple[List[ArticleInfo], Optional[str]]: 本页文章列表和下一页令牌（没有下一页时为None）
+        """
+        sql, params = self.to_sql(page_size, page_token)
+        articles = [_row_to_article(row) for row in _execute(connection, sql, params)]
+
+        next_token = None
+        if len(articles) == page_size:
+            last = articles[-1]
+            next_token = encode_page_token(last.collect_time, last.id)
+        return articles, next_token
+
+    def iter_pages(self, connection, page_size: int,
+                   page_token: str = None) -> Iterator[Tuple[List[ArticleInfo], Optional[str]]]:
+        """
+        逐页遍历查询结果，可从任意页码令牌处继续
+
+        Yields:
+            Tuple[List[ArticleInfo], Optional[str]]: 每页文章列表和下一页令牌
+        """
+        while True:
+            articles, page_token = self.fetch_page(connection, page_size, page_token)
+            if articles:
+                yield articles, page_token
+            if not page_token:
+                break
+
+    def fetch_all(self, connection) -> List[ArticleInfo]:
+        """
+        一次性获取全部匹配的文章信息
+
+        Args:
+            connection: MySQL数据库连接对象或本地SQLite镜像连接
+
+        Returns:
+            List[ArticleInfo]: 文章信息实体列表
+        """
+        sql, params = self.to_sql()
+        return [_row_to_article(row) for row in _execute(connection, sql, params)]
+
+
 def get_all_articles(connection) -> List[ArticleInfo]:
     """
     从数据库中获取所有文章信息
@@ -77,38 +271,10 @@ def get_all_articles(connection) -> List[ArticleInfo]:
     """
     articles = []
     try:
-        cursor = connection.cursor()
-
-        # SQL查询语句
-        select_query = """
-                       SELECT id, account_name, title, link, release_date, is_free, collect_time
-                       FROM article_link_info
-                       ORDER BY collect_time DESC \
-                       """
-
-        cursor.execute(select_query)
-        records = cursor.fetchall()
-
-        # 将查询结果转换为ArticleInfo对象列表
-        for row in records:
-            article = ArticleInfo(
-                id=row[0],
-                account_name=row[1],
-                title=row[2],
-                link=row[3],
-                release_date=row[4],
-                is_free=row[5],
-                collect_time=row[6]
-            )
-            articles.append(article)
-
+        articles = ArticleQuery().fetch_all(connection)
         print(f"成功查询到 {len(articles)} 条文章记录")
-
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         print(f"查询数据时出错: {e}")
-    finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
 
     return articles
 
@@ -126,39 +292,10 @@ def get_articles_by_account(connection, account_name: str) -> List[ArticleInfo]:
     """
     articles = []
     try:
-        cursor = connection.cursor()
-
-        # SQL查询语句
-        select_query = """
-                       SELECT id, account_name, title, link, release_date, is_free, collect_time
-                       FROM article_link_info
-                       WHERE account_name = %s
-                       ORDER BY collect_time DESC \
-                       """
-
-        cursor.execute(select_query, (account_name,))
-        records = cursor.fetchall()
-
-        # 将查询结果转换为ArticleInfo对象列表
-        for row in records:
-            article = ArticleInfo(
-                id=row[0],
-                account_name=row[1],
-                title=row[2],
-                link=row[3],
-                release_date=row[4],
-                is_free=row[5],
-                collect_time=row[6]
-            )
-            articles.append(article)
-
+        articles = ArticleQuery(account_name=account_name).fetch_all(connection)
         print(f"账号 '{account_name}' 共查询到 {len(articles)} 条文章记录")
-
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         print(f"查询数据时出错: {e}")
-    finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
 
     return articles
 
@@ -175,39 +312,10 @@ def get_free_articles(connection) -> List[ArticleInfo]:
     """
     articles = []
     try:
-        cursor = connection.cursor()
-
-        # SQL查询语句
-        select_query = """
-                       SELECT id, account_name, title, link, release_date, is_free, collect_time
-                       FROM article_link_info
-                       WHERE is_free = 1
-                       ORDER BY collect_time DESC \
-                       """
-
-        cursor.execute(select_query)
-        records = cursor.fetchall()
-
-        # 将查询结果转换为ArticleInfo对象列表
-        for row in records:
-            article = ArticleInfo(
-                id=row[0],
-                account_name=row[1],
-                title=row[2],
-                link=row[3],
-                release_date=row[4],
-                is_free=row[5],
-                collect_time=row[6]
-            )
-            articles.append(article)
-
+        articles = ArticleQuery(is_free=1).fetch_all(connection)
         print(f"共查询到 {len(articles)} 条免费文章记录")
-
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         print(f"查询数据时出错: {e}")
-    finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
 
     return articles
 
@@ -224,39 +332,10 @@ def get_paid_articles(connection) -> List[ArticleInfo]:
     """
     articles = []
     try:
-        cursor = connection.cursor()
-
-        # SQL查询语句
-        select_query = """
-                       SELECT id, account_name, title, link, release_date, is_free, collect_time
-                       FROM article_link_info
-                       WHERE is_free = 0
-                       ORDER BY collect_time DESC \
-                       """
-
-        cursor.execute(select_query)
-        records = cursor.fetchall()
-
-        # 将查询结果转换为ArticleInfo对象列表
-        for row in records:
-            article = ArticleInfo(
-                id=row[0],
-                account_name=row[1],
-                title=row[2],
-                link=row[3],
-                release_date=row[4],
-                is_free=row[5],
-                collect_time=row[6]
-            )
-            articles.append(article)
-
+        articles = ArticleQuery(is_free=0).fetch_all(connection)
         print(f"共查询到 {len(articles)} 条付费文章记录")
-
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         print(f"查询数据时出错: {e}")
-    finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
 
     return articles
 
@@ -284,36 +363,189 @@ def print_articles(articles: List[ArticleInfo]):
               f"{article.release_date:<12} {is_free_text:<8} {article.collect_time}")
 
 
+class AccountSummary:
+    """
+    账号维度的文章统计
+
+    coverage 是链接在 articles 中已有同url行的比例，只表示该文章已导入 articles，
+    不检查正文是否为空，也不记录页面是否渲染成功。
+    """
+
+    def __init__(self, account_name: str = "", total: int = 0, free_count: int = 0, paid_count: int = 0,
+                 first_release_day=None, last_release_day=None, last_collect_time: datetime = None,
+                 captured_count: int = 0):
+        self.account_name = account_name
+        self.total = total
+        self.free_count = free_count
+        self.paid_count = paid_count
+        self.first_release_day = first_release_day
+        self.last_release_day = last_release_day
+        self.last_collect_time = last_collect_time
+        self.captured_count = captured_count  # articles 中存在对应url的链接数
+
+    @property
+    def coverage(self) -> float:
+        """入库覆盖率：captured_count / total"""
+        return self.captured_count / self.total if self.total else 0.0
+
+    def __str__(self):
+        return f"AccountSummary(account_name='{self.account_name}', total={self.total}, " \
+               f"free_count={self.free_count}, paid_count={self.paid_count}, " \
+               f"release_days={self.first_release_day}~{self.last_release_day}, " \
+               f"last_collect_time={self.last_collect_time}, coverage={self.coverage:.2%})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def get_article_summary(connection, account_name: str = None) -> List[AccountSummary]:
+    """
+    在数据库端按账号聚合文章统计，只返回聚合后的行
+
+    覆盖率按 article_link_info.link LEFT JOIN articles.url 计算，即已导入 articles 的链接占比；
+    articles 中有行但正文为空的文章同样计为已覆盖。
+
+    Args:
+        connection: MySQL数据库连接对象或本地SQLite镜像连接
+        account_name: 只统计指定账号，为None时统计全部账号
+
+    Returns:
+        List[AccountSummary]: 按文章数倒序的账号统计列表
+    """
+    sql = """
+          SELECT l.account_name,
+                 COUNT(*),
+                 SUM(CASE WHEN l.is_free = 1 THEN 1 ELSE 0 END),
+                 SUM(CASE WHEN l.is_free = 0 THEN 1 ELSE 0 END),
+                 MIN(l.release_day),
+                 MAX(l.release_day),
+                 MAX(l.collect_time),
+                 COUNT(a.id)
+          FROM article_link_info l
+                   LEFT JOIN articles a ON a.url = l.link
+          """
+    params = ()
+    if account_name is not None:
+        sql += " WHERE l.account_name = %s"
+        params = (account_name,)
+    sql += " GROUP BY l.account_name ORDER BY COUNT(*) DESC"
+
+    summaries = []
+    try:
+        for row in _execute(connection, sql, params):
+            summaries.append(AccountSummary(
+                account_name=row[0],
+                total=int(row[1]),
+                free_count=int(row[2] or 0),
+                paid_count=int(row[3] or 0),
+                first_release_day=row[4],
+                last_release_day=row[5],
+                last_collect_time=row[6],
+                captured_count=int(row[7])
+            ))
+        print(f"共统计 {len(summaries)} 个账号")
+    except (Error, sqlite3.Error) as e:
+        print(f"统计数据时出错: {e}")
+
+    return summaries
+
+
+def print_summary(summaries: List[AccountSummary]):
+    """
+    打印账号统计表
+
+    Args:
+        summaries: 账号统计列表
+    """
+    if not summaries:
+        print("没有统计数据")
+        return
+
+    print(f"\n{'账号名称':<15} {'文章数':<8} {'免费':<8} {'付费':<8} {'最早发布':<12} {'最晚发布':<12} "
+          f"{'最近采集时间':<20} {'入库覆盖率':<8}")
+    print("-" * 110)
+
+    for summary in summaries:
+        print(f"{summary.account_name:<15} {summary.total:<8} {summary.free_count:<8} {summary.paid_count:<8} "
+              f"{str(summary.first_release_day or '-'):<12} {str(summary.last_release_day or '-'):<12} "
+              f"{str(summary.last_collect_time or '-'):<20} {summary.coverage:.2%}")
+
+    total = sum(s.total for s in summaries)
+    captured = sum(s.captured_count for s in summaries)
+    print("-" * 110)
+    print(f"{'合计':<15} {total:<8} {sum(s.free_count for s in summaries):<8} "
+          f"{sum(s.paid_count for s in summaries):<8} 入库覆盖率 {captured / total if total else 0:.2%}")
+
+
 if __name__ == '__main__':
     # 创建参数解析器
     parser = argparse.ArgumentParser(description='从MySQL数据库查询文章信息')
-    parser.add_argument('--host', required=True, help='MySQL服务器地址')
-    parser.add_argument('--database', required=True, help='数据库名称')
-    parser.add_argument('--user', required=True, help='用户名')
-    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--host', help='MySQL服务器地址')
+    parser.add_argument('--database', help='数据库名称')
+    parser.add_argument('--user', help='用户名')
+    parser.add_argument('--password', help='密码')
     parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--mirror', nargs='?', const='', default=None,
+                        help='从本地SQLite镜像查询，可指定镜像路径 (默认使用 article_mirror.py 的路径)')
+    parser.add_argument('--account', help='按账号名称过滤')
+    parser.add_argument('--is-free', type=int, choices=[0, 1], help='按是否免费过滤: 1免费, 0付费')
+    parser.add_argument('--collect-from', help='采集时间下限(含), 格式: YYYY-MM-DD HH:MM:SS')
+    parser.add_argument('--collect-to', help='采集时间上限(不含), 格式: YYYY-MM-DD HH:MM:SS')
+    parser.add_argument('--release-from', help='发布日期下限(含), 格式: YYYY-MM-DD')
+    parser.add_argument('--release-to', help='发布日期上限(不含), 格式: YYYY-MM-DD')
+    parser.add_argument('--page-size', type=int, help='每页条数，不指定时一次性查询全部')
+    parser.add_argument('--page-token', help='从该页码令牌处继续查询')
+    parser.add_argument('--summary', action='store_true', help='只输出按账号聚合的统计 (可配合 --account)；'
+                             '覆盖率为链接在 articles 表中已有同url行的比例，不检查正文内容')
 
     # 解析命令行参数
     args = parser.parse_args()
-
-    # 创建数据库连接
-    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
-    if not connection:
-        print("无法连接到MySQL数据库")
-        sys.exit(1)
+    if args.mirror is None and not (args.host and args.database and args.user and args.password):
+        parser.error('未使用 --mirror 时必须提供 --host、--database、--user 和 --password')
+    if args.page_token and not args.page_size:
+        parser.error('--page-token 需要与 --page-size 一起使用')
+
+    query = ArticleQuery(
+        account_name=args.account,
+        is_free=args.is_free,
+        collect_time_from=datetime.strptime(args.collect_from, '%Y-%m-%d %H:%M:%S') if args.collect_from else None,
+        collect_time_to=datetime.strptime(args.collect_to, '%Y-%m-%d %H:%M:%S') if args.collect_to else None,
+        release_date_from=args.release_from,
+        release_date_to=args.release_to
+    )
+
+    if args.mirror is not None:
+        # 本地镜像查询不访问MySQL
+        from article_mirror import DEFAULT_MIRROR_PATH, open_mirror
+        connection = open_mirror(args.mirror or DEFAULT_MIRROR_PATH)
+    else:
+        # 创建数据库连接
+        connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+        if not connection:
+            print("无法连接到MySQL数据库")
+            sys.exit(1)
 
     try:
-        # 获取所有文章
-        all_articles = get_all_articles(connection)
-        print(f"总共获取到 {len(all_articles)} 篇文章")
-        print_articles(all_articles)
+        if args.summary:
+            print_summary(get_article_summary(connection, args.account))
+        elif args.page_size:
+            # 按页查询，输出下一页令牌供后续继续
+            page_articles, next_token = query.fetch_page(connection, args.page_size, args.page_token)
+            print(f"本页获取到 {len(page_articles)} 篇文章")
+            print_articles(page_articles)
+            print(f"\n下一页令牌: {next_token or '无 (已到最后一页)'}")
+        else:
+            # 获取全部匹配的文章
+            all_articles = query.fetch_all(connection)
+            print(f"总共获取到 {len(all_articles)} 篇文章")
+            print_articles(all_articles)
 
     except Exception as e:
         print(f"查询过程中出错: {e}")
     finally:
         # 关闭数据库连接
-        if connection.is_connected():
+        if isinstance(connection, sqlite3.Connection):
+            connection.close()
+        elif connection.is_connected():
             connection.close()
             print("MySQL连接已关闭")
-
-
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from article_content import get_compressed_contents
+from download_articles_from_db import create_connection
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parquet_export")
+STATE_FILE = "_export_state.json"
+
+# 账号名用字典编码，分区列 month 为 YYYY-MM
+ACCOUNT_TYPE = pa.dictionary(pa.int32(), pa.string())
+PARTITION_SCHEMA = pa.schema([("account_name", ACCOUNT_TYPE), ("month", pa.string())])
+
+# 每张表导出的列及类型；month_column 为划分月份分区所用的时间列
+EXPORT_TABLES = {
+    "article_link_info": {
+        "month_column": "collect_time",
+        "fields": [
+            ("id", pa.int64()),
+            ("account_name", ACCOUNT_TYPE),
+            ("title", pa.string()),
+            ("link", pa.string()),
+            ("release_date", pa.string()),
+            ("release_day", pa.date32()),
+            ("is_free", pa.int8()),
+            ("collect_time", pa.timestamp("s")),
+        ],
+    },
+    "articles": {
+        "month_column": "publish_time",
+        "fields": [
+            ("id", pa.int64()),
+            ("sys_id", pa.string()),
+            ("account_name", ACCOUNT_TYPE),
+            ("url", pa.string()),
+            ("title", pa.string()),
+            ("cover_image", pa.string()),
+            ("summary", pa.string()),
+            ("create_time", pa.timestamp("s")),
+            ("publish_time", pa.timestamp("s")),
+            ("read_count", pa.int32()),
+            ("like_count", pa.int32()),
+            ("share_count", pa.int32()),
+            ("favorite_count", pa.int32()),
+            ("comment_count", pa.int32()),
+            ("author", pa.string()),
+            ("is_original", pa.int8()),
+            ("article_type", pa.string()),
+            ("collection", pa.string()),
+            ("segment_words", pa.list_(pa.string())),
+        ],
+    },
+}
+
+
+def _load_state(output_dir):
+    path = os.path.join(output_dir, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(output_dir, state):
+    path = os.path.join(output_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _table_schema(table_name, with_content=False):
+    fields = list(EXPORT_TABLES[table_name]["fields"])
+    if table_name == "articles" and with_content:
+        fields.append(("content", pa.string()))
+    return pa.schema(fields + [("month", pa.string())])
+
+
+def _month_of(value):
+    return value.strftime("%Y-%m") if value else "unknown"
+
+
+def _iter_record_batches(connection, table_name, schema, last_id, batch_size, progress):
+    """
+    按主键顺序分批读取表数据并转换为Arrow RecordBatch
+
+    progress 字典记录已导出的最大ID和行数，供调用方在写入完成后保存增量状态
+    """
+    columns = [name for name in schema.names if name != "month"]
+    month_index = columns.index(EXPORT_TABLES[table_name]["month_column"])
+    segment_index = columns.index("segment_words") if "segment_words" in columns else None
+    content_index = columns.index("content") if "content" in columns else None
+
+    cursor = connection.cursor()
+    try:
+        while True:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} WHERE id > %s ORDER BY id LIMIT %s",
+                           (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            data = [list(column) for column in zip(*rows)]
+            if segment_index is not None:
+                data[segment_index] = [json.loads(v) if v else [] for v in data[segment_index]]
+            if content_index is not None:
+                # 已迁移到 article_content 的正文从压缩表读取，其余使用本次查出的 articles.content
+                contents = get_compressed_contents(connection, data[0])
+                data[content_index] = [contents.get(article_id, inline)
+                                       for article_id, inline in zip(data[0], data[content_index])]
+            data.append([_month_of(v) for v in data[month_index]])
+
+            last_id = rows[-1][0]
+            progress["last_id"] = last_id
+            progress["rows"] += len(rows)
+            print(f"  {table_name}: 已导出 {progress['rows']} 行")
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=schema.field(i).type) for i, values in enumerate(data)],
+                schema=schema
+            )
+    finally:
+        cursor.close()
+
+
+def _move_files(src_dir, dst_dir):
+    """把 src_dir 下的文件按相同的相对路径（分区目录）移入 dst_dir"""
+    for root, _, files in os.walk(src_dir):
+        target = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            os.replace(os.path.join(root, name), os.path.join(target, name))
+
+
+def export_table(connection, table_name, output_dir=DEFAULT_OUTPUT_DIR, batch_size=20000,
+                 incremental=False, with_content=False):
+    """
+    把一张表导出为按 account_name 和月份分区的Parquet数据集
+
+    Args:
+        connection: MySQL数据库连接对象
+        table_name: article_link_info 或 articles
+        output_dir: 导出根目录，每张表写到其下的同名子目录
+        batch_size: 每批读取的行数
+        incremental: 为True时只追加上次导出之后新增的行（按id高水位），否则全量重写
+        with_content: articles 是否包含正文列
+
+    数据先写入导出根目录下的临时目录，全部写完后才移入数据集目录并保存增量状态；
+    中途失败时数据集和状态保持不变，重新运行不会产生重复的分片文件。
+
+    Returns:
+        int: 本次导出的行数
+    """
+    dataset_dir = os.path.join(output_dir, table_name)
+    state = _load_state(output_dir)
+    last_id = state.get(table_name, {}).get("last_id", 0) if incremental else 0
+
+    schema = _table_schema(table_name, with_content)
+    progress = {"last_id": last_id, "rows": 0}
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    staging_dir = os.path.join(output_dir, f"_staging-{table_name}-{run_id}")
+    os.makedirs(staging_dir)
+
+    try:
+        ds.write_dataset(
+            _iter_record_batches(connection, table_name, schema, last_id, batch_size, progress),
+            staging_dir,
+            schema=schema,
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+            # 每次运行使用不同的文件名前缀，增量追加时不会覆盖已有文件
+            basename_template=f"part-{run_id}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=batch_size,
+        )
+
+        if incremental:
+            _move_files(staging_dir, dataset_dir)
+        else:
+            if os.path.isdir(dataset_dir):
+                shutil.rmtree(dataset_dir)
+            os.replace(staging_dir, dataset_dir)
+
+        state[table_name] = {"last_id": progress["last_id"], "exported_at": run_id}
+        _save_state(output_dir, state)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    print(f"{table_name} 导出完成，本次 {progress['rows']} 行，数据集目录: {dataset_dir}")
+    return progress["rows"]
+
+
+def open_dataset(table_name, output_dir=DEFAULT_OUTPUT_DIR):
+    """
+    打开导出的Parquet数据集，按 account_name 和 month 分区裁剪
+
+    例如只扫描某账号某月的部分列::
+
+        dataset = open_dataset("article_link_info")
+        dataset.to_table(columns=["title", "collect_time"],
+                         filter=(ds.field("account_name") == "五分钟学大数据") & (ds.field("month") == "2025-08"))
+    """
+    return ds.dataset(os.path.join(output_dir, table_name), format="parquet",
+                      partitioning=ds.partitioning(flavor="hive", dictionaries="infer"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把文章表导出为按账号和月份分区的Parquet数据集')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help=f'导出目录 (默认: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--tables', nargs='+', choices=list(EXPORT_TABLES), default=list(EXPORT_TABLES),
+                        help='要导出的表 (默认: 全部)')
+    parser.add_argument('--batch-size', type=int, default=20000, help='每批读取的行数 (默认: 20000)')
+    parser.add_argument('--incremental', action='store_true', help='只追加上次导出之后新增的行')
+    parser.add_argument('--with-content', action='store_true', help='articles 同时导出正文列')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        for table_name in args.tables:
+            export_table(connection, table_name, args.output_dir, args.batch_size,
+                         args.incremental, args.with_content)
+    except Exception as e:
+        print(f"导出过程中出错: {e}")
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import unicodedata
+
+from mysql.connector import Error
+
+from download_articles_from_db import create_connection
+from loader_common import EXISTS_LOOKUP_SIZE
+from migrate_schema import backfill_keyword_postings, keyword_postings_sql
+
+
+def keyword_index_exists(cursor):
+    """article_keywords 是否已创建（迁移版本8）"""
+    cursor.execute("""
+                   SELECT COUNT(*) FROM information_schema.TABLES
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'article_keywords'
+                   """)
+    return cursor.fetchone()[0] > 0
+
+
+def refresh_article_keywords(cursor, article_ids):
+    """
+    按 articles.segment_words 的当前值重建指定文章的关键词倒排，不提交
+
+    Args:
+        cursor: 游标
+        article_ids: 分词结果被写入的文章ID
+    """
+    article_ids = list(article_ids)
+    for start in range(0, len(article_ids), EXISTS_LOOKUP_SIZE):
+        chunk = article_ids[start:start + EXISTS_LOOKUP_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"DELETE FROM article_keywords WHERE article_id IN ({placeholders})", tuple(chunk))
+        cursor.execute(keyword_postings_sql(f"a.id IN ({placeholders})"), tuple(chunk))
+
+
+def refresh_staged_keywords(cursor, staging_table, start_id, end_id):
+    """
+    重建暂存表中 ID 在 [start_id, end_id] 内的文章的关键词倒排，不提交
+
+    供集合式批量更新分词结果时与 UPDATE ... JOIN 暂存表 同段执行。
+    """
+    cursor.execute(f"""
+                   DELETE ak FROM article_keywords ak
+                       JOIN {staging_table} t ON t.id = ak.article_id
+                   WHERE t.id BETWEEN %s AND %s
+                   """, (start_id, end_id))
+    cursor.execute(keyword_postings_sql(f"a.id BETWEEN %s AND %s "
+                                        f"AND a.id IN (SELECT id FROM {staging_table})"), (start_id, end_id))
+
+
+def _collation_key(keyword):
+    """
+    近似 article_keywords.keyword 的 utf8mb4_0900_ai_ci 比较规则：忽略大小写、重音和全角/半角差异
+
+    在该排序规则下 "Flink" 和 "flink" 是同一个值，必须在拼查询前合并，
+    否则 AND 检索的 COUNT(DISTINCT keyword) 永远达不到词数。
+    """
+    decomposed = unicodedata.normalize('NFKD', keyword.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def search_articles(connection, keywords, mode='and', limit=100):
+    """
+    按关键词检索文章
+
+    Args:
+        connection: MySQL数据库连接对象
+        keywords: 关键词列表，大小写不同的同一个词只算一个
+        mode: and 为同时包含全部关键词，or 为包含任意一个
+        limit: 最多返回的文章数，按ID倒序（新文章在前）；为None时不限制
+
+    Returns:
+        list: 文章ID
+    """
+    unique = {}
+    for keyword in keywords:
+        unique.setdefault(_collation_key(keyword), keyword)
+    keywords = list(unique.values())
+    if not keywords:
+        return []
+    placeholders = ', '.join(['%s'] * len(keywords))
+    params = list(keywords)
+    if mode == 'and':
+        query = f"""
+                SELECT article_id FROM article_keywords
+                WHERE keyword IN ({placeholders})
+                GROUP BY article_id
+                HAVING COUNT(DISTINCT keyword) = %s
+                ORDER BY article_id DESC
+                """
+        params.append(len(keywords))
+    elif mode == 'or':
+        query = f"""
+                SELECT DISTINCT article_id FROM article_keywords
+                WHERE keyword IN ({placeholders})
+                ORDER BY article_id DESC
+                """
+    else:
+        raise ValueError(f"不支持的检索模式: {mode}")
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, tuple(params))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def keyword_counts(connection, keywords=None, limit=50):
+    """
+    统计关键词对应的文章数
+
+    Args:
+        connection: MySQL数据库连接对象
+        keywords: 要统计的关键词，为None时返回文章数最多的 limit 个关键词
+        limit: 不指定关键词时返回的个数
+
+    Returns:
+        list: [(关键词, 文章数), ...]，按文章数倒序
+    """
+    cursor = connection.cursor()
+    try:
+        if keywords:
+            keywords = list(keywords)
+            cursor.execute(f"""
+                           SELECT keyword, COUNT(*) AS cnt FROM article_keywords
+                           WHERE keyword IN ({', '.join(['%s'] * len(keywords))})
+                           GROUP BY keyword ORDER BY cnt DESC
+                           """, tuple(keywords))
+        else:
+            cursor.execute("""
+                           SELECT keyword, COUNT(*) AS cnt FROM article_keywords
+                           GROUP BY keyword ORDER BY cnt DESC LIMIT %s
+                           """, (limit,))
+        return [(keyword, count) for keyword, count in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def rebuild_index(connection, batch_size=10000):
+    """清空并从 articles.segment_words 全量重建关键词倒排"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("TRUNCATE TABLE article_keywords")
+        return backfill_keyword_postings(connection, cursor, batch_size)
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按分词关键词检索文章')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--search', nargs='+', metavar='KEYWORD', help='检索包含这些关键词的文章')
+    parser.add_argument('--mode', choices=['and', 'or'], default='and', help='多个关键词的组合方式 (默认: and)')
+    parser.add_argument('--limit', type=int, default=100, help='最多返回的文章数/关键词数 (默认: 100)')
+    parser.add_argument('--counts', nargs='*', metavar='KEYWORD', help='统计关键词的文章数，不指定关键词时列出最常见的关键词')
+    parser.add_argument('--rebuild', action='store_true', help='从 articles.segment_words 全量重建倒排')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        if args.rebuild:
+            rebuild_index(connection)
+        if args.search:
+            article_ids = search_articles(connection, args.search, args.mode, args.limit)
+            print(f"找到 {len(article_ids)} 篇文章")
+            if article_ids:
+                cursor = connection.cursor()
+                cursor.execute(f"SELECT id, account_name, title FROM articles "
+                               f"WHERE id IN ({', '.join(['%s'] * len(article_ids))}) ORDER BY id DESC",
+                               tuple(article_ids))
+                for article_id, account_name, title in cursor.fetchall():
+                    print(f"  [{article_id}] {account_name} - {title}")
+                cursor.close()
+        if args.counts is not None:
+            for keyword, count in keyword_counts(connection, args.counts, args.limit):
+                print(f"  {keyword}: {count}")
+    except (Error, ValueError) as e:
+        print(f"检索关键词时出错: {e}")
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+
+if __name__ == "__main__":
+    main()
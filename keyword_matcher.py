@@ -0,0 +1,144 @@
+import string
+from collections import deque
+
+ASCII_ALNUM = frozenset(string.ascii_letters + string.digits)
+
+
+def _fold(text):
+    """逐字符转小写；转换后长度变化的字符保持原样，保证匹配位置与原文一致"""
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多模式匹配器
+
+    构建一次后，对任意文本只需一次线性扫描即可找出词典中所有词的出现位置，
+    耗时与词典大小无关。ignore_case=True 时英文词不区分大小写（如 flink / Flink / FLINK），
+    匹配结果统一返回词典中的原始写法。
+
+    只由英文字母和数字组成的词要求整词匹配：前后紧挨着英文字母或数字时不算匹配，
+    避免 Archive、sparkle 中匹配出 Hive、Spark。
+    """
+
+    def __init__(self, terms, ignore_case=True):
+        self.ignore_case = ignore_case
+        self.terms = {}  # 规范化后的词 -> 词典中的写法
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # 每个状态结束的词 [(长度, 词, 是否要求整词匹配)]，长词在前
+
+        for term in terms:
+            if term:
+                self._add(term)
+        self._build()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, word):
+        return self.canonical(word) is not None
+
+    def _normalize(self, text):
+        return _fold(text) if self.ignore_case else text
+
+    def _add(self, term):
+        key = self._normalize(term)
+        if key in self.terms:
+            return
+        self.terms[key] = term
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(key), term, all(c in ASCII_ALNUM for c in key)))
+
+    def _build(self):
+        """按层次遍历计算失败指针，并把失败指针所指状态的输出合并进来"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = sorted(self._output[next_state] + self._output[self._fail[next_state]],
+                                                  reverse=True)
+
+    def canonical(self, word):
+        """word 恰好是词典中的词时返回词典中的写法，否则返回None"""
+        return self.terms.get(self._normalize(word))
+
+    def iter_matches(self, text):
+        """
+        扫描文本，按结束位置依次生成所有（可能重叠的）匹配
+
+        Yields:
+            tuple: (起始位置, 结束位置, 词典中的写法)
+        """
+        state = 0
+        for end, char in enumerate(self._normalize(text), 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, term, whole_word in self._output[state]:
+                start = end - length
+                if whole_word and ((start > 0 and text[start - 1] in ASCII_ALNUM)
+                                   or (end < len(text) and text[end] in ASCII_ALNUM)):
+                    continue
+                yield start, end, term
+
+    def find_all(self, text):
+        """
+        找出所有匹配，包括互相重叠或包含的匹配（如“数据中台”和其中的“中台”）
+
+        Returns:
+            list: [(起始位置, 结束位置, 词), ...]，按起始位置排序，同一位置长词在前
+        """
+        return sorted(self.iter_matches(text), key=lambda m: (m[0], m[0] - m[1]))
+
+    def find(self, text):
+        """
+        按最左最长原则找出互不重叠的匹配
+
+        例如 “实时数仓” 和 “数仓” 都在词典中时，文本 “实时数仓” 只返回 “实时数仓”。
+
+        Returns:
+            list: [(起始位置, 结束位置, 词), ...]，按起始位置排序
+        """
+        matches = []
+        last_end = 0
+        for start, end, term in self.find_all(text):
+            if start >= last_end:
+                matches.append((start, end, term))
+                last_end = end
+        return matches
+
+    def distinct(self, text, overlapping=True):
+        """
+        文本中出现的词，按首次出现的位置排列且不重复
+
+        Args:
+            text: 文本
+            overlapping: 为True时包含重叠和被包含的匹配，否则按最左最长原则只保留互不重叠的匹配
+
+        Returns:
+            list: 词典中的写法
+        """
+        matches = self.find_all(text) if overlapping else self.find(text)
+        seen = set()
+        result = []
+        for _, _, term in matches:
+            if term not in seen:
+                seen.add(term)
+                result.append(term)
+        return result
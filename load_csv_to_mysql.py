@@ -6,8 +6,15 @@ import os
 from datetime import datetime
 import json
 
+from keyword_index import keyword_index_exists, refresh_article_keywords, refresh_staged_keywords
+from loader_common import BatchResult, LoadCheckpoint, Quarantine, RowValidator, parse_update_columns, write_batch
+from migrate_schema import canonical_link, canonical_link_sql
 
-def create_connection(host, database, user, password, port=3306):
+# 采集脚本写出的 collect_time 格式
+COLLECT_TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y%m%d%H%M%S')
+
+
+def create_connection(host, database, user, password, port=3306, allow_local_infile=False):
     """创建MySQL数据库连接"""
     try:
         connection = mysql.connector.connect(
@@ -15,7 +22,8 @@ def create_connection(host, database, user, password, port=3306):
             database=database,
             user=user,
             password=password,
-            port=port
+            port=port,
+            allow_local_infile=allow_local_infile
         )
         if connection.is_connected():
             print(f"成功连接到MySQL数据库 {database}")
@@ -25,80 +33,425 @@ def create_connection(host, database, user, password, port=3306):
         return None
 
 
-def insert_data_from_csv(connection, csv_file_path):
-    """从CSV文件读取数据并插入到MySQL数据库"""
+LINK_COLUMNS = ['account_name', 'title', 'link', 'release_date', 'is_free', 'collect_time']
+
+# upsert时默认覆盖的列：刷新标题、发布日期和付费状态，保留首次采集时间
+DEFAULT_UPDATE_COLUMNS = ['title', 'release_date', 'is_free']
+
+# 采集脚本写出的文件名前缀：wx_links_YYYYMMDDHHMMSS.csv
+CRAWL_CSV_PREFIX = 'wx_links_'
+QUARANTINE_SUFFIX = '.quarantine.csv'
+
+
+def is_crawl_csv(csv_file_path):
+    """
+    判断文件是否为采集脚本写出的CSV
+
+    隔离文件（*.quarantine.csv）一律不是；其余文件名符合 wx_links_*.csv，
+    或表头与 LINK_COLUMNS 一致时才是。
+    """
+    file_name = os.path.basename(csv_file_path)
+    if file_name.lower().endswith(QUARANTINE_SUFFIX):
+        return False
+    if file_name.startswith(CRAWL_CSV_PREFIX) and file_name.lower().endswith('.csv'):
+        return True
     try:
-        cursor = connection.cursor()
+        with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as file:
+            header = next(csv.reader(file), None)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return False
+    return header is not None and [name.strip() for name in header[:len(LINK_COLUMNS)]] == LINK_COLUMNS
 
-        # SQL插入语句
-        insert_query = """
-                       INSERT INTO article_link_info (account_name, title, link, release_date, is_free, collect_time)
-                       VALUES (%s, %s, %s, %s, %s, %s) \
-                       """
+
+def _parse_csv_row(row):
+    """
+    校验并转换一行CSV数据
+
+    Returns:
+        tuple: (插入参数元组, None)；校验失败时为 (None, 失败原因)
+    """
+    # 检查行是否有足够的列
+    if len(row) < 6:
+        return None, "列数不足"
+
+    # 提取数据
+    account_name, title, link, release_date, is_free, collect_time = row[:6]
+
+    # 跳过空行
+    if not account_name or not title or not link or not release_date:
+        return None, "缺少必要字段"
+
+    # 处理is_free字段
+    try:
+        is_free_int = int(is_free)
+    except ValueError:
+        is_free_int = 1  # 默认为免费
+
+    # 处理collect_time字段
+    collect_time_dt = None
+    for fmt in COLLECT_TIME_FORMATS:
+        try:
+            collect_time_dt = datetime.strptime(collect_time.strip(), fmt)
+            break
+        except ValueError:
+            continue
+    if collect_time_dt is None:
+        collect_time_dt = datetime.now()
+
+    return (account_name, title, canonical_link(link), release_date, is_free_int, collect_time_dt), None
+
+
+def _flush_batch(connection, cursor, batch, batch_rows, update_columns, quarantine, validator=None):
+    """写入一批数据，出错的行连同原始内容写入隔离文件"""
+    if validator:
+        result = validator.write(connection, cursor, batch)
+    else:
+        result = write_batch(connection, cursor, 'article_link_info', LINK_COLUMNS, batch,
+                             key_column='link', update_columns=update_columns)
+    for values, error in result.failed:
+        row_no, row = batch_rows[id(values)]
+        print(f"插入第{row_no}行时出错: {error}")
+        quarantine.add(row_no, error, row)
+    return result
+
+
+def insert_data_from_csv(connection, csv_file_path, batch_size=1000, update_columns=None, resume=False,
+                         quarantine_path=None, prefilter=True):
+    """
+    从CSV文件读取数据并分批插入到MySQL数据库
+
+    每批单独提交，提交后保存断点（<CSV>.checkpoint.json）；校验失败或写入失败的行
+    连同原因写入隔离文件（默认 <CSV>.quarantine.csv）。整个文件导入成功后删除断点。
+
+    Args:
+        connection: MySQL数据库连接对象
+        csv_file_path: CSV文件路径
+        batch_size: 每批插入并提交的行数
+        update_columns: 为None时普通插入；否则按链接upsert，链接已存在时只覆盖这些列
+        resume: 是否从上次中断的断点继续
+        quarantine_path: 隔离文件路径
+        prefilter: 写入前按链接去重并对照数据库已有行，只写入新增或有变化的行
+
+    Returns:
+        BatchResult: 新增/更新/未变化/失败的统计
+    """
+    total = BatchResult()
+    validator = RowValidator('article_link_info', LINK_COLUMNS, 'link', update_columns) if prefilter else None
+    checkpoint = LoadCheckpoint(csv_file_path)
+    start_row = checkpoint.load() if resume else 0
+    chunk_id = checkpoint.chunk_id
+    quarantine = None
+    try:
+        cursor = connection.cursor()
 
         # 读取CSV文件并插入数据
         with open(csv_file_path, 'r', encoding='utf-8-sig') as file:
             csv_reader = csv.reader(file)
 
             # 跳过标题行
-            next(csv_reader)
-
-            row_count = 0
-            for row in csv_reader:
-                # 检查行是否有足够的列
-                if len(row) < 6:
+            header = next(csv_reader)
+            quarantine = Quarantine(quarantine_path or csv_file_path + '.quarantine.csv', header,
+                                    append=start_row > 0)
+
+            batch = []
+            batch_rows = {}
+            row_no = start_row
+            for row_no, row in enumerate(csv_reader, 1):
+                if row_no <= start_row or not row:
                     continue
 
-                # 提取数据
-                account_name, title, link, release_date, is_free, collect_time = row
-
-                # 跳过空行
-                if not account_name or not title or not link or not release_date:
+                values, reason = _parse_csv_row(row)
+                if values is None:
+                    quarantine.add(row_no, reason, row)
+                    if validator:
+                        validator.invalid()
                     continue
 
-                # 处理is_free字段
-                try:
-                    is_free_int = int(is_free)
-                except ValueError:
-                    is_free_int = 1  # 默认为免费
+                batch.append(values)
+                batch_rows[id(values)] = (row_no, row)
+                if len(batch) >= batch_size:
+                    total.add(_flush_batch(connection, cursor, batch, batch_rows, update_columns, quarantine,
+                                           validator))
+                    chunk_id += 1
+                    quarantine.flush()
+                    checkpoint.save(row_no, chunk_id)
+                    batch = []
+                    batch_rows = {}
+
+            if batch:
+                total.add(_flush_batch(connection, cursor, batch, batch_rows, update_columns, quarantine,
+                                       validator))
+                chunk_id += 1
+            quarantine.flush()
+            checkpoint.save(row_no, chunk_id)
+
+            if validator:
+                print(validator.stats)
+            print(f"导入结果: {total}")
+
+        checkpoint.clear()
 
-                # 处理collect_time字段
-                try:
-                    collect_time_dt = datetime.strptime(collect_time, '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    collect_time_dt = datetime.now()
+    except Exception as e:
+        print(f"插入数据时出错: {e}")
+        print(f"已提交到第 {checkpoint.row} 行，可使用 --resume 从断点继续")
+        connection.rollback()
+        total.error = str(e)
+    finally:
+        if quarantine:
+            quarantine.close()
+        if 'cursor' in locals() and cursor:
+            cursor.close()
 
-                # 插入数据
-                try:
-                    cursor.execute(insert_query, (
-                        account_name,
-                        title,
-                        link,
-                        release_date,
-                        is_free_int,
-                        collect_time_dt
-                    ))
-                    row_count += 1
-                except Error as e:
-                    print(f"插入行时出错: {e}")
-                    print(f"数据: {row}")
-                    continue
+    return total
+
+
+def _detect_line_terminator(csv_file_path):
+    """根据首行判断CSV换行符（csv模块默认写出CRLF）"""
+    with open(csv_file_path, 'rb') as file:
+        first_line = file.readline()
+    return '\\r\\n' if first_line.endswith(b'\r\n') else '\\n'
+
+
+def _collect_time_sql(column):
+    """
+    生成把采集时间文本解析为DATETIME的SQL表达式，格式与 COLLECT_TIME_FORMATS 一致，无法解析时为NULL
+
+    先用正则拆出年月日时分秒并校验取值范围（含当月天数），只对合法的值调用 STR_TO_DATE：
+    严格模式下 INSERT/UPDATE 中的 STR_TO_DATE 遇到非法日期会报错中止整条语句，而不是返回NULL。
+    CASE 按顺序求值，不匹配格式的值不会进入后面的 CAST。
+    """
+    value = f"TRIM({column})"
+    dashed = [
+        f"SUBSTRING_INDEX({value}, '-', 1)",
+        f"SUBSTRING_INDEX(SUBSTRING_INDEX({value}, '-', 2), '-', -1)",
+        f"SUBSTRING_INDEX(SUBSTRING_INDEX({value}, ' ', 1), '-', -1)",
+        f"SUBSTRING_INDEX(SUBSTRING_INDEX({value}, ' ', -1), ':', 1)",
+        f"SUBSTRING_INDEX(SUBSTRING_INDEX({value}, ':', 2), ':', -1)",
+        f"SUBSTRING_INDEX({value}, ':', -1)",
+    ]
+    compact = [f"SUBSTRING({value}, {start}, {length})"
+               for start, length in ((1, 4), (5, 2), (7, 2), (9, 2), (11, 2), (13, 2))]
+
+    def valid(parts):
+        year, month, day, hour, minute, second = (f"CAST({part} AS UNSIGNED)" for part in parts)
+        # 月份先夹到1-12再计算当月天数，避免日期运算本身溢出
+        days_in_month = (f"DAY(LAST_DAY(MAKEDATE(GREATEST({year}, 1000), 1) "
+                         f"+ INTERVAL (LEAST(GREATEST({month}, 1), 12) - 1) MONTH))")
+        return (f"{year} >= 1000 AND {month} BETWEEN 1 AND 12 AND {day} BETWEEN 1 AND {days_in_month} "
+                f"AND {hour} <= 23 AND {minute} <= 59 AND {second} <= 59")
+
+    return (
+        f"CASE "
+        f"WHEN {value} REGEXP '^[0-9]{{4}}-[0-9]{{1,2}}-[0-9]{{1,2}} [0-9]{{1,2}}:[0-9]{{1,2}}:[0-9]{{1,2}}$' "
+        f"THEN CASE WHEN {valid(dashed)} THEN STR_TO_DATE({value}, '%Y-%m-%d %H:%i:%s') END "
+        f"WHEN {value} REGEXP '^[0-9]{{14}}$' "
+        f"THEN CASE WHEN {valid(compact)} THEN STR_TO_DATE({value}, '%Y%m%d%H%i%s') END "
+        f"END"
+    )
+
+
+# 暂存行的拒绝原因，与 article_link_info 的列长度对应；逐行导入时这些行会在写入时失败
+_STAGED_REJECT_REASON_SQL = """
+    CASE
+        WHEN COALESCE(account_name, '') = '' OR COALESCE(title, '') = '' OR COALESCE(link, '') = ''
+            OR COALESCE(release_date, '') = '' THEN '缺少必要字段'
+        WHEN CHAR_LENGTH(account_name) > 128 THEN '账号名称超过128个字符'
+        WHEN CHAR_LENGTH(title) > 512 THEN '标题超过512个字符'
+        WHEN CHAR_LENGTH(release_date) > 64 THEN '发布日期超过64个字符'
+        WHEN CHAR_LENGTH(TRIM(link)) > 767 THEN '链接超过512个字符'
+        WHEN TRIM(is_free) REGEXP '^[+-]?[0-9]+$'
+            THEN CASE WHEN TRIM(is_free) REGEXP '^[+-]?0*[0-9]{1,3}$'
+                           AND CAST(TRIM(is_free) AS SIGNED) BETWEEN -128 AND 127 THEN NULL
+                      ELSE 'is_free超出范围' END
+    END
+"""
+
+
+def bulk_load_csv(connection, csv_file_path, update_columns=None, quarantine_path=None):
+    """
+    使用 LOAD DATA LOCAL INFILE 批量导入采集CSV
+
+    文件先原样装入临时表，在临时表中完成校验和规范化，再用一条 INSERT ... SELECT 写入 article_link_info，
+    校验和默认值与逐行导入（_parse_csv_row）一致：
+    - 跳过标题行（含BOM）以及缺少账号/标题/链接/发布日期的行
+    - 超出列长度、is_free 超出范围的行被拒绝（逐行导入时这些行写入失败）
+    - is_free 非整数时默认为1（免费）
+    - collect_time 支持 YYYY-MM-DD HH:MM:SS 和 YYYYMMDDHHMMSS，无法解析时取当前时间（并统计条数）
+    - 链接按 canonical_link 规则规范化；文件内重复的链接只取一条
+    - update_columns 为None时跳过已存在的链接，否则只覆盖这些列
+
+    被拒绝的行连同原因写入隔离文件（默认 <CSV>.quarantine.csv）。写入不使用 INSERT IGNORE，
+    严格模式下出现未预料的数据错误时整个文件回滚，而不是被静默吞掉。
+
+    连接需以 allow_local_infile=True 创建，服务器需开启 local_infile。
+
+    Args:
+        connection: MySQL数据库连接对象
+        csv_file_path: CSV文件路径
+        update_columns: 为None时普通插入；否则按链接upsert
+        quarantine_path: 隔离文件路径
+
+    Returns:
+        BatchResult: 新增/更新/未变化的统计（文件内重复计入 duplicates，超长等被拒绝的行计入 failed）
+    """
+    result = BatchResult()
+    upsert = update_columns is not None
+    quarantine = Quarantine(quarantine_path or csv_file_path + '.quarantine.csv', LINK_COLUMNS)
+    try:
+        cursor = connection.cursor()
 
-            connection.commit()
-            print(f"成功插入 {row_count} 条记录")
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_article_link_import")
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_article_link_keep")
+        cursor.execute("""
+                       CREATE TEMPORARY TABLE tmp_article_link_import (
+                           row_no        BIGINT AUTO_INCREMENT PRIMARY KEY,
+                           account_name  TEXT,
+                           title         TEXT,
+                           link          TEXT,
+                           release_date  TEXT,
+                           is_free       TEXT,
+                           collect_time  TEXT,
+                           canonical     VARCHAR(768),
+                           collected_at  DATETIME,
+                           reject_reason VARCHAR(64),
+                           KEY idx_canonical (canonical)
+                       ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                       """)
+
+        line_terminator = _detect_line_terminator(csv_file_path)
+        cursor.execute(f"""
+                        LOAD DATA LOCAL INFILE %s
+                        INTO TABLE tmp_article_link_import
+                        CHARACTER SET utf8mb4
+                        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                        LINES TERMINATED BY '{line_terminator}'
+                        IGNORE 1 LINES
+                        (account_name, title, link, release_date, is_free, collect_time)
+                        """, (os.path.abspath(csv_file_path),))
+        staged = cursor.rowcount
+        print(f"已装入临时表 {staged} 行")
+
+        # 先按列长度等校验，只为通过校验的行计算规范化链接和采集时间
+        cursor.execute(f"UPDATE tmp_article_link_import SET reject_reason = {_STAGED_REJECT_REASON_SQL}")
+        cursor.execute(f"""
+                       UPDATE tmp_article_link_import
+                       SET canonical    = {canonical_link_sql('link')},
+                           collected_at = {_collect_time_sql('collect_time')}
+                       WHERE reject_reason IS NULL
+                       """)
+        cursor.execute("""
+                       UPDATE tmp_article_link_import
+                       SET reject_reason = '链接超过512个字符', canonical = NULL
+                       WHERE reject_reason IS NULL AND CHAR_LENGTH(canonical) > 512
+                       """)
+
+        cursor.execute("""
+                       SELECT row_no, account_name, title, link, release_date, is_free, collect_time, reject_reason
+                       FROM tmp_article_link_import
+                       WHERE reject_reason IS NOT NULL
+                       ORDER BY row_no
+                       """)
+        rejected = 0
+        missing = 0
+        for row_no, *values, reason in cursor.fetchall():
+            quarantine.add(row_no, reason, values)
+            rejected += 1
+            if reason == '缺少必要字段':
+                missing += 1
+            else:
+                result.failed.append((tuple(values), reason))
+        quarantine.flush()
+
+        cursor.execute("""
+                       SELECT COUNT(*) FROM tmp_article_link_import
+                       WHERE reject_reason IS NULL AND collected_at IS NULL AND COALESCE(TRIM(collect_time), '') <> ''
+                       """)
+        bad_collect_time = cursor.fetchone()[0]
+
+        # 文件内重复链接：普通插入保留第一条，upsert保留最后一条（与逐行导入的结果一致）
+        cursor.execute(f"""
+                       CREATE TEMPORARY TABLE tmp_article_link_keep (row_no BIGINT PRIMARY KEY) ENGINE = InnoDB
+                       SELECT {'MAX' if upsert else 'MIN'}(row_no) AS row_no
+                       FROM tmp_article_link_import
+                       WHERE reject_reason IS NULL
+                       GROUP BY canonical
+                       """)
+        kept = cursor.rowcount
+        result.duplicates = staged - rejected - kept
+
+        cursor.execute("""
+                       SELECT COUNT(*)
+                       FROM tmp_article_link_import t
+                                JOIN tmp_article_link_keep k ON k.row_no = t.row_no
+                                JOIN article_link_info a ON a.link = t.canonical
+                       """)
+        existing = cursor.fetchone()[0]
+
+        if upsert:
+            assignments = ", ".join(f"{c} = VALUES({c})" for c in update_columns) or "link = link"
+            source_filter = f"ON DUPLICATE KEY UPDATE {assignments}"
+            existing_join = ""
+        else:
+            # 普通插入时用反连接跳过已存在的链接，不使用 IGNORE 以免吞掉其他错误
+            existing_join = "LEFT JOIN article_link_info a ON a.link = t.canonical"
+            source_filter = "WHERE a.id IS NULL"
+
+        cursor.execute(f"""
+                       INSERT INTO article_link_info
+                           (account_name, title, link, release_date, is_free, collect_time)
+                       SELECT t.account_name,
+                              t.title,
+                              t.canonical,
+                              t.release_date,
+                              CASE WHEN TRIM(t.is_free) REGEXP '^[+-]?[0-9]+$' THEN CAST(TRIM(t.is_free) AS SIGNED) ELSE 1 END,
+                              COALESCE(t.collected_at, NOW())
+                       FROM tmp_article_link_import t
+                                JOIN tmp_article_link_keep k ON k.row_no = t.row_no
+                                {existing_join}
+                       {source_filter}
+                       """)
+        affected = cursor.rowcount
+        connection.commit()
+
+        result.inserted = kept - existing
+        if upsert:
+            # affected rows = 新增 + 2*更新
+            result.updated = (affected - result.inserted) // 2
+            result.unchanged = existing - result.updated
+        else:
+            result.unchanged = existing
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_article_link_keep")
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_article_link_import")
+        print(f"导入结果: {result}，缺少必要字段跳过 {missing} 条")
+        if bad_collect_time:
+            print(f"采集时间无法解析、改用当前时间 {bad_collect_time} 条")
 
     except Exception as e:
-        print(f"插入数据时出错: {e}")
+        print(f"批量导入数据时出错: {e}")
         connection.rollback()
+        result.error = str(e)
     finally:
+        quarantine.close()
         if 'cursor' in locals() and cursor:
             cursor.close()
 
+    return result
+
 
-def update_segmented_words(connection, csv_file_path):
-    """从CSV文件读取分词结果并根据ID更新到MySQL数据库"""
+def _segment_words_json(segmented_words):
+    """将逗号分隔的分词结果转换为JSON数组字符串"""
+    words_list = segmented_words.split(',') if segmented_words else []
+    return json.dumps(words_list, ensure_ascii=False)
+
+
+def update_segmented_words(connection, csv_file_path, index_batch_size=1000):
+    """从CSV文件读取分词结果并根据ID更新到MySQL数据库，同时维护关键词倒排 article_keywords"""
     try:
         cursor = connection.cursor()
+        update_index = keyword_index_exists(cursor)
+        if not update_index:
+            print("未找到 article_keywords 表，跳过关键词倒排更新（请先运行 migrate_schema.py）")
 
         # SQL更新语句
         update_query = """
@@ -112,6 +465,7 @@ def update_segmented_words(connection, csv_file_path):
             csv_reader = csv.DictReader(file)
 
             row_count = 0
+            updated_ids = []
             for row in csv_reader:
                 # 提取数据
                 article_id = row.get('id')
@@ -122,22 +476,23 @@ def update_segmented_words(connection, csv_file_path):
                     continue
 
                 # 处理分词结果
-                if segmented_words:
-                    # 将逗号分隔的字符串转换为列表
-                    words_list = segmented_words.split(',') if segmented_words else []
-                    # 转换为JSON格式
-                    segment_words_json = json.dumps(words_list, ensure_ascii=False)
-                else:
-                    segment_words_json = json.dumps([], ensure_ascii=False)
+                segment_words_json = _segment_words_json(segmented_words)
 
                 # 更新数据
                 try:
                     cursor.execute(update_query, (segment_words_json, int(article_id)))
                     row_count += 1
+                    updated_ids.append(int(article_id))
                 except Error as e:
                     print(f"更新ID为 {article_id} 的记录时出错: {e}")
                     continue
 
+                if update_index and len(updated_ids) >= index_batch_size:
+                    refresh_article_keywords(cursor, updated_ids)
+                    updated_ids = []
+
+            if update_index and updated_ids:
+                refresh_article_keywords(cursor, updated_ids)
             connection.commit()
             print(f"成功更新 {row_count} 条记录的分词结果")
 
@@ -149,6 +504,98 @@ def update_segmented_words(connection, csv_file_path):
             cursor.close()
 
 
+
+def bulk_update_segmented_words(connection, csv_file_path, batch_size=5000, chunk_size=20000):
+    """
+    通过临时表集合式批量更新分词结果
+
+    先把 (id, 分词JSON) 以多行INSERT分批写入临时表，再按ID区间分段执行
+    UPDATE articles JOIN 临时表，每段提交一次。CSV中重复的ID以最后一条为准。
+    关键词倒排 article_keywords 存在时，同一段内一并重建这些文章的倒排。
+
+    Args:
+        connection: MySQL数据库连接对象
+        csv_file_path: 分词结果CSV文件路径
+        batch_size: 每批写入临时表的行数
+        chunk_size: 每次UPDATE覆盖的ID区间长度
+
+    Returns:
+        int: 分词结果实际发生变化的记录数
+    """
+    changed = 0
+    try:
+        cursor = connection.cursor()
+        update_index = keyword_index_exists(cursor)
+        if not update_index:
+            print("未找到 article_keywords 表，跳过关键词倒排更新（请先运行 migrate_schema.py）")
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_segment_words")
+        cursor.execute("""
+                       CREATE TEMPORARY TABLE tmp_segment_words (
+                           id            BIGINT PRIMARY KEY,
+                           segment_words JSON NOT NULL
+                       ) ENGINE = InnoDB
+                       """)
+        stage_query = """
+                      INSERT INTO tmp_segment_words (id, segment_words)
+                      VALUES (%s, %s)
+                      ON DUPLICATE KEY UPDATE segment_words = VALUES(segment_words)
+                      """
+
+        staged = 0
+        with open(csv_file_path, 'r', encoding='utf-8') as file:
+            csv_reader = csv.DictReader(file)
+
+            batch = []
+            for row in csv_reader:
+                article_id = row.get('id')
+                if not article_id:
+                    continue
+                try:
+                    batch.append((int(article_id), _segment_words_json(row.get('segmented_words', ''))))
+                except ValueError:
+                    print(f"跳过无效ID: {article_id}")
+                    continue
+
+                if len(batch) >= batch_size:
+                    cursor.executemany(stage_query, batch)
+                    staged += len(batch)
+                    batch = []
+
+            if batch:
+                cursor.executemany(stage_query, batch)
+                staged += len(batch)
+        print(f"已写入临时表 {staged} 行")
+
+        cursor.execute("SELECT MIN(id), MAX(id) FROM tmp_segment_words")
+        min_id, max_id = cursor.fetchone()
+        if min_id is not None:
+            for start in range(min_id, max_id + 1, chunk_size):
+                cursor.execute("""
+                               UPDATE articles a
+                                   JOIN tmp_segment_words t ON t.id = a.id
+                               SET a.segment_words = t.segment_words
+                               WHERE t.id BETWEEN %s AND %s
+                               """, (start, start + chunk_size - 1))
+                # 未开启 FOUND_ROWS 时 rowcount 为实际变化的行数
+                changed += cursor.rowcount
+                if update_index:
+                    refresh_staged_keywords(cursor, 'tmp_segment_words', start, start + chunk_size - 1)
+                connection.commit()
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_segment_words")
+        print(f"成功更新 {changed} 条记录的分词结果（其余记录未变化或ID不存在）")
+
+    except Exception as e:
+        print(f"批量更新分词数据时出错: {e}")
+        connection.rollback()
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+
+    return changed
+
+
 def main():
     # 创建参数解析器
     parser = argparse.ArgumentParser(description='将CSV文件数据导入MySQL数据库')
@@ -158,9 +605,19 @@ def main():
     parser.add_argument('--password', required=True, help='密码')
     parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
     parser.add_argument('--csv-file', required=False, help='CSV文件路径')
-    parser.add_argument('--segment-file', required=False, help='分词结果CSV文件路径 (用于update_segments模式)')
-    parser.add_argument('--mode', choices=['insert', 'update_segments'], default='insert',
-                       help='操作模式: insert (插入数据) 或 update_segments (更新分词结果)')
+    parser.add_argument('--segment-file', required=False,
+                        help='分词结果CSV文件路径 (用于update_segments/bulk_update_segments模式)')
+    parser.add_argument('--mode', choices=['insert', 'bulk_insert', 'update_segments', 'bulk_update_segments'],
+                        default='insert',
+                        help='操作模式: insert (插入数据)、bulk_insert (LOAD DATA批量导入)、'
+                             'update_segments (更新分词结果) 或 bulk_update_segments (通过临时表批量更新分词结果)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='每批插入并提交的行数 (默认: 1000)')
+    parser.add_argument('--upsert', action='store_true', help='按链接upsert，重复导入同一文件不会产生重复行')
+    parser.add_argument('--resume', action='store_true', help='insert模式下从上次中断的断点继续导入')
+    parser.add_argument('--quarantine-file', help='被拒绝行的隔离文件路径 (默认: <CSV文件>.quarantine.csv)')
+    parser.add_argument('--no-prefilter', action='store_true', help='insert模式下不做写入前的去重和已有行比对')
+    parser.add_argument('--update-columns', default=','.join(DEFAULT_UPDATE_COLUMNS),
+                        help=f'upsert时链接已存在要覆盖的列，逗号分隔 (默认: {",".join(DEFAULT_UPDATE_COLUMNS)})')
 
     # 解析命令行参数
     args = parser.parse_args()
@@ -169,13 +626,19 @@ def main():
     if not args.csv_file:
         args.csv_file = "/Users/houmengqi/code/wx-article-capture/wx_links_20250809180418.csv"
 
+    update_columns = None
+    if args.upsert:
+        try:
+            update_columns = parse_update_columns(args.update_columns, LINK_COLUMNS, 'link')
+        except ValueError as e:
+            parser.error(str(e))
+
     # 创建数据库连接
-    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port,
+                                   allow_local_infile=(args.mode == 'bulk_insert'))
     if not connection:
         return
 
-    args.mode = mode
-
     try:
         if args.mode == 'insert':
             # 检查CSV文件是否存在
@@ -184,7 +647,16 @@ def main():
                 return
 
             # 插入数据
-            insert_data_from_csv(connection, args.csv_file)
+            insert_data_from_csv(connection, args.csv_file, args.batch_size, update_columns, args.resume,
+                                 args.quarantine_file, not args.no_prefilter)
+            print("数据导入完成")
+        elif args.mode == 'bulk_insert':
+            if not os.path.exists(args.csv_file):
+                print(f"文件 {args.csv_file} 不存在")
+                return
+
+            # 大批量历史数据走 LOAD DATA 快速通道
+            bulk_load_csv(connection, args.csv_file, update_columns, args.quarantine_file)
             print("数据导入完成")
         elif args.mode == 'update_segments':
             # 更新分词结果
@@ -194,6 +666,14 @@ def main():
                 return
             update_segmented_words(connection, segment_file)
             print("分词结果更新完成")
+        elif args.mode == 'bulk_update_segments':
+            # 全量重新分词后走临时表集合式更新
+            segment_file = args.segment_file or "./words/articles_segmented_result.csv"
+            if not os.path.exists(segment_file):
+                print(f"分词结果文件 {segment_file} 不存在")
+                return
+            bulk_update_segmented_words(connection, segment_file)
+            print("分词结果更新完成")
     except Exception as e:
         print(f"处理过程中出错: {e}")
     finally:
@@ -203,6 +683,4 @@ def main():
             print("MySQL连接已关闭")
 
 if __name__ == "__main__":
-    # mode = "insert"
-    mode = "update_segments"
     main()
\ No newline at end of file
@@ -1,9 +1,32 @@
 import pandas as pd
+from openpyxl.cell.text import Text
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.xml.constants import SHARED_STRINGS, SHEET_MAIN_NS
 import mysql.connector
 from mysql.connector import Error
 import argparse
 import os
-from datetime import datetime
+import sqlite3
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import load_csv_to_mysql
+from article_content import DEFAULT_CODEC, store_contents_by_url
+from loader_common import (BatchResult, LoadCheckpoint, Quarantine, RowValidator, file_checksum,
+                           get_ingested_checksums, parse_update_columns, record_file_ingest, write_batch)
+from migrate_schema import canonical_link
+
+ARTICLE_COLUMNS = ['sys_id', 'account_name', 'url', 'title', 'cover_image', 'summary', 'create_time', 'publish_time',
+                   'read_count', 'like_count', 'share_count', 'favorite_count', 'comment_count',
+                   'author', 'is_original', 'article_type', 'collection', 'content']
+
+# 导出表格的中文表头，顺序与 ARTICLE_COLUMNS 中除 account_name 外的列对应
+XLSX_HEADERS = ['ID', '链接', '标题', '封面', '摘要', '创建时间', '发布时间', '阅读', '点赞', '分享', '喜欢', '留言',
+                '作者', '是否原创', '文章类型', '所属合集', '文章内容']
+
+# upsert时默认只刷新阅读、点赞等互动数据
+DEFAULT_UPDATE_COLUMNS = ['read_count', 'like_count', 'share_count', 'favorite_count', 'comment_count']
 
 
 def create_connection(host, database, user, password, port=3306):
@@ -24,102 +47,444 @@ def create_connection(host, database, user, password, port=3306):
         return None
 
 
-def insert_data_from_xlsx(connection, xlsx_file_path, account_name):
-    """从XLSX文件读取数据并插入到MySQL数据库"""
+def _flush_batch(connection, cursor, batch, update_columns, validator=None):
+    """写入一批数据并打印出错的行"""
+    if validator:
+        result = validator.write(connection, cursor, batch)
+    else:
+        result = write_batch(connection, cursor, 'articles', ARTICLE_COLUMNS, batch,
+                             key_column='url', update_columns=update_columns)
+    for values, error in result.failed:
+        print(f"写入 {values[2]} 时出错: {error}")
+    return result
+
+
+def _optional_text(series):
+    """空值转为None，其余保持原值"""
+    return series.astype(object).where(series.notna(), None)
+
+
+def _parse_time(series):
+    """
+    解析时间列，返回 (解析结果, 无法解析的掩码)
+
+    已是日期类型的单元格原样保留，字符串按 YYYY-MM-DD HH:MM:SS 解析
+    """
+    parsed = pd.to_datetime(series, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    invalid = series.notna() & parsed.isna()
+    return parsed.astype(object).where(parsed.notna(), None), invalid
+
+
+def _parse_count(series):
+    """解析计数列，空值为0，返回 (解析结果, 无法解析的掩码)"""
+    numeric = pd.to_numeric(series, errors='coerce')
+    invalid = series.notna() & numeric.isna()
+    return numeric.fillna(0).astype('int64'), invalid
+
+
+def normalize_xlsx_frame(df, account_name):
+    """
+    按列向量化地把导出表格转换为 articles 插入参数
+
+    Args:
+        df: 导出表格（中文表头），索引为从0开始的数据行序号，用于提示跳过的行
+        account_name: 账号名称
+
+    Returns:
+        tuple: (插入参数元组列表, [(行号, 跳过原因), ...], 与插入参数对应的行号列表)
+    """
+    missing = [name for name in XLSX_HEADERS if name not in df.columns]
+    if missing:
+        raise ValueError(f"缺少列: {', '.join(missing)}")
+
+    ids = df['ID']
+    sys_id = ids.astype(str).where(ids.notna(), None)
+    url = _optional_text(df['链接'].map(canonical_link, na_action='ignore'))
+    title = _optional_text(df['标题'])
+    create_time, invalid_create = _parse_time(df['创建时间'])
+    publish_time, invalid_publish = _parse_time(df['发布时间'])
+
+    counts = {}
+    invalid_counts = pd.Series(False, index=df.index)
+    for header in ('阅读', '点赞', '分享', '喜欢', '留言'):
+        counts[header], invalid = _parse_count(df[header])
+        invalid_counts |= invalid
+
+    is_original = (df['是否原创'].notna() & df['是否原创'].astype(str).str.strip().eq('原创')).astype('int64')
+
+    # 用布尔掩码标记需要跳过的行
+    invalid_format = invalid_create | invalid_publish | invalid_counts
+    missing_required = ~invalid_format & (url.isna() | (url == '') | title.isna() | (title == ''))
+    valid = ~(invalid_format | missing_required)
+
+    skipped = []
+    row_numbers = pd.Series(df.index + 1, index=df.index)
+    for row_no in row_numbers[invalid_format].tolist():
+        skipped.append((row_no, "时间或计数格式无法解析"))
+    for row_no in row_numbers[missing_required].tolist():
+        skipped.append((row_no, "缺少必要字段(url或title)"))
+    skipped.sort()
+
+    columns = [
+        sys_id, pd.Series(account_name, index=df.index), url, title,
+        _optional_text(df['封面']), _optional_text(df['摘要']), create_time, publish_time,
+        counts['阅读'], counts['点赞'], counts['分享'], counts['喜欢'], counts['留言'],
+        _optional_text(df['作者']), is_original, _optional_text(df['文章类型']),
+        _optional_text(df['所属合集']), _optional_text(df['文章内容']),
+    ]
+    records = list(zip(*(column[valid].tolist() for column in columns)))
+    return records, skipped, row_numbers[valid].tolist()
+
+
+class SpooledStringTable:
+    """
+    共享字符串表（sharedStrings.xml）的磁盘版本
+
+    Excel、WPS、XlsxWriter 导出的文本单元格（包括文章内容）都存放在共享字符串表中，
+    openpyxl 即使在只读模式下也会在打开工作簿时把整张表读入内存。这里改为流式解析后
+    写入临时SQLite文件，读取单元格时按下标查询，内存占用与表的大小无关（磁盘占用约等于文本总量）。
+    """
+
+    INSERT_BATCH_SIZE = 1000
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix='xlsx_strings_', suffix='.db')
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("CREATE TABLE strings (idx INTEGER PRIMARY KEY, text TEXT NOT NULL)")
+        self.size = 0
+
+    def load(self, xml_source):
+        """流式解析共享字符串表，逐批写入临时文件"""
+        string_tag = '{%s}si' % SHEET_MAIN_NS
+        batch = []
+        root = None
+        for event, node in ET.iterparse(xml_source, events=('start', 'end')):
+            if root is None:
+                root = node
+            if event != 'end' or node.tag != string_tag:
+                continue
+            batch.append((self.size, Text.from_tree(node).content.replace('x005F_', '')))
+            self.size += 1
+            # 已处理的 <si> 从根节点上摘掉，避免解析树随字符串个数增长
+            root.clear()
+            if len(batch) >= self.INSERT_BATCH_SIZE:
+                self.db.executemany("INSERT INTO strings (idx, text) VALUES (?, ?)", batch)
+                batch = []
+        if batch:
+            self.db.executemany("INSERT INTO strings (idx, text) VALUES (?, ?)", batch)
+        self.db.commit()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        row = self.db.execute("SELECT text FROM strings WHERE idx = ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return row[0]
+
+    def close(self):
+        self.db.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _SpooledStringsReader(ExcelReader):
+    """只读加载工作簿，共享字符串表使用 SpooledStringTable 而不是内存中的列表"""
+
+    def read_strings(self):
+        self.shared_strings = SpooledStringTable()
+        ct = self.package.find(SHARED_STRINGS)
+        if ct is not None:
+            with self.archive.open(ct.PartName[1:]) as src:
+                self.shared_strings.load(src)
+
+
+def iter_xlsx_chunks(xlsx_file_path, chunk_size=2000):
+    """
+    以 openpyxl 只读模式流式读取第一个工作表，按块生成DataFrame
+
+    表头只在首行解析一次；完全为空的行被忽略。每块的索引为数据行序号。
+    共享字符串表先转存到临时文件（见 SpooledStringTable），内存占用只与块大小有关，
+    与工作簿大小无关。
+
+    Yields:
+        pd.DataFrame: 数据块
+    """
+    reader = _SpooledStringsReader(xlsx_file_path, read_only=True, data_only=True, keep_links=False)
     try:
-        cursor = connection.cursor()
+        reader.read()
+        rows = reader.wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name).strip() if name is not None else '' for name in header]
+
+        chunk = []
+        index = []
+        for row_index, values in enumerate(rows):
+            if all(value is None for value in values):
+                continue
+            chunk.append(values[:len(columns)])
+            index.append(row_index)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=columns, index=index)
+                chunk, index = [], []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns, index=index)
+    finally:
+        reader.archive.close()
+        if isinstance(reader.shared_strings, SpooledStringTable):
+            reader.shared_strings.close()
 
-        # SQL插入语句
-        insert_query = """
-                       INSERT INTO articles (sys_id, account_name, url, title, cover_image, summary, create_time, publish_time, \
-                                             read_count, like_count, share_count, favorite_count, comment_count, \
-                                             author, is_original, article_type, collection, content) \
-                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                       """
 
-        # 读取XLSX文件
-        df = pd.read_excel(xlsx_file_path)
+def _raw_row(df, row_no):
+    """取出某行在导出表格中的原始值，写入隔离文件"""
+    return [None if pd.isna(value) else value for value in df.loc[row_no - 1, XLSX_HEADERS].tolist()]
 
-        print(f"从XLSX文件中读取到 {len(df)} 行数据")
+
+def insert_data_from_xlsx(connection, xlsx_file_path, account_name, batch_size=500, update_columns=None,
+                          chunk_size=None, resume=False, quarantine_path=None, prefilter=True, content_codec=None):
+    """
+    从XLSX文件读取数据并分批插入到MySQL数据库
+
+    每批单独提交，提交后保存断点（<XLSX>.checkpoint.json）；格式错误或写入失败的行
+    连同原因写入隔离文件（默认 <XLSX>.quarantine.csv）。整个文件导入成功后删除断点。
+
+    Args:
+        connection: MySQL数据库连接对象
+        xlsx_file_path: XLSX文件路径
+        account_name: 账号名称
+        batch_size: 每批写入并提交的行数
+        update_columns: 为None时普通插入；否则按url upsert，url已存在时只覆盖这些列
+        chunk_size: 为None时用 pd.read_excel 一次读入整个文件；
+                    否则流式读取，每次只在内存中保留 chunk_size 行（适合含大量正文的大文件）
+        resume: 是否从上次中断的断点继续
+        quarantine_path: 隔离文件路径
+        prefilter: 写入前按url去重并对照数据库已有行，只写入新增或有变化的行
+        content_codec: 为None时正文直接写入 articles.content；
+                       否则 articles.content 留空，正文按该算法压缩后写入 article_content
+
+    Returns:
+        BatchResult: 新增/更新/未变化/失败的统计
+    """
+    total = BatchResult()
+    validator = RowValidator('articles', ARTICLE_COLUMNS, 'url', update_columns) if prefilter else None
+    checkpoint = LoadCheckpoint(xlsx_file_path)
+    start_row = checkpoint.load() if resume else 0
+    chunk_id = checkpoint.chunk_id
+    quarantine = Quarantine(quarantine_path or xlsx_file_path + '.quarantine.csv', XLSX_HEADERS,
+                            append=start_row > 0)
+    try:
+        cursor = connection.cursor()
+
+        if chunk_size:
+            chunks = iter_xlsx_chunks(xlsx_file_path, chunk_size)
+        else:
+            # 读取XLSX文件
+            df = pd.read_excel(xlsx_file_path)
+            print(f"从XLSX文件中读取到 {len(df)} 行数据")
+            chunks = [df]
 
         row_count = 0
-        success_count = 0
         skip_count = 0
-
-        # 遍历每一行数据
-        for index, row in df.iterrows():
-            row_count += 1
-            try:
-                # 提取数据并处理空值
-                sys_id = str(row['ID']) if pd.notna(row['ID']) else None
-                url = row['链接'] if pd.notna(row['链接']) else None
-                title = row['标题'] if pd.notna(row['标题']) else None
-                cover_image = row['封面'] if pd.notna(row['封面']) else None
-                summary = row['摘要'] if pd.notna(row['摘要']) else None
-                create_time = None
-                if pd.notna(row['创建时间']):
-                    if isinstance(row['创建时间'], str):
-                        create_time = datetime.strptime(row['创建时间'], '%Y-%m-%d %H:%M:%S')
-                    else:
-                        create_time = row['创建时间']
-
-                publish_time = None
-                if pd.notna(row['发布时间']):
-                    if isinstance(row['发布时间'], str):
-                        publish_time = datetime.strptime(row['发布时间'], '%Y-%m-%d %H:%M:%S')
-                    else:
-                        publish_time = row['发布时间']
-
-                read_count = int(row['阅读']) if pd.notna(row['阅读']) else 0
-                like_count = int(row['点赞']) if pd.notna(row['点赞']) else 0
-                share_count = int(row['分享']) if pd.notna(row['分享']) else 0
-                favorite_count = int(row['喜欢']) if pd.notna(row['喜欢']) else 0
-                comment_count = int(row['留言']) if pd.notna(row['留言']) else 0
-                author = row['作者'] if pd.notna(row['作者']) else None
-                is_original = 0
-                if pd.notna(row['是否原创']):
-                    is_original_val = str(row['是否原创']).strip()
-                    if is_original_val == '原创':
-                        is_original = 1
-                article_type = row['文章类型'] if pd.notna(row['文章类型']) else None
-                collection = row['所属合集'] if pd.notna(row['所属合集']) else None
-                content = row['文章内容'] if pd.notna(row['文章内容']) else None
-
-                # 检查必要字段
-                if not url or not title:
-                    print(f"警告: 第{row_count}行缺少必要字段(url或title)，跳过")
-                    skip_count += 1
-                    continue
-
-                # 插入数据
-                cursor.execute(insert_query, (
-                    sys_id, account_name, url, title, cover_image, summary, create_time, publish_time,
-                    read_count, like_count, share_count, favorite_count, comment_count,
-                    author, is_original, article_type, collection, content
-                ))
-                success_count += 1
-
-                if success_count % 100 == 0:
-                    print(f"已处理 {success_count} 行数据...")
-
-            except Exception as e:
-                print(f"处理第{row_count}行时出错: {e}")
-                skip_count += 1
+        for df in chunks:
+            # 跳过断点之前已提交的行
+            df = df[df.index + 1 > start_row]
+            if df.empty:
                 continue
 
-        connection.commit()
+            records, skipped, record_rows = normalize_xlsx_frame(df, account_name)
+            for row_no, reason in skipped:
+                print(f"警告: 第{row_no}行{reason}，跳过")
+            if validator:
+                validator.invalid(len(skipped))
+
+            pending_skipped = list(skipped)
+            for start in range(0, len(records), batch_size):
+                batch = records[start:start + batch_size]
+                if content_codec:
+                    stripped = [values[:-1] + (None,) for values in batch]
+                    contents = {id(row): values[-1] for row, values in zip(stripped, batch)}
+                    batch = stripped
+                batch_rows = dict(zip(map(id, batch), record_rows[start:start + batch_size]))
+                result = _flush_batch(connection, cursor, batch, update_columns, validator)
+                total.add(result)
+                if content_codec:
+                    # 只为实际写入的行保存正文，被校验跳过或写入失败的已有行保持原正文
+                    written = {values[2]: contents[id(values)] for values in result.written if contents[id(values)]}
+                    if written:
+                        store_contents_by_url(connection, cursor, written, content_codec)
+                chunk_id += 1
+
+                last_row = record_rows[start + len(batch) - 1]
+                while pending_skipped and pending_skipped[0][0] <= last_row:
+                    row_no, reason = pending_skipped.pop(0)
+                    quarantine.add(row_no, reason, _raw_row(df, row_no))
+                for values, error in result.failed:
+                    row_no = batch_rows[id(values)]
+                    quarantine.add(row_no, error, _raw_row(df, row_no))
+                quarantine.flush()
+                checkpoint.save(last_row, chunk_id)
+
+            for row_no, reason in pending_skipped:
+                quarantine.add(row_no, reason, _raw_row(df, row_no))
+            quarantine.flush()
+            checkpoint.save(int(df.index[-1]) + 1, chunk_id)
+
+            row_count += len(df)
+            skip_count += len(skipped)
+            print(f"已处理 {row_count} 行数据...")
+
         print(f"数据导入完成:")
         print(f"  总行数: {row_count}")
-        print(f"  成功插入: {success_count} 条记录")
+        print(f"  {total}")
         print(f"  跳过: {skip_count} 条记录")
+        if validator:
+            print(f"  {validator.stats}")
+        checkpoint.clear()
 
     except Exception as e:
         print(f"插入数据时出错: {e}")
+        print(f"已提交到第 {checkpoint.row} 行，可使用 --resume 从断点继续")
         connection.rollback()
+        total.error = str(e)
     finally:
+        quarantine.close()
         if 'cursor' in locals() and cursor:
             cursor.close()
 
+    return total
+
+
+def discover_ingest_files(root_dir):
+    """
+    递归查找目录下的 .xlsx 导出文件和采集CSV
+
+    跳过 ~$ 开头的Excel临时文件；CSV只接受采集脚本的输出（见 load_csv_to_mysql.is_crawl_csv），
+    导入时写出的隔离文件和其他来源的CSV不会被当作采集CSV导入。
+
+    Returns:
+        list: 按路径排序的文件列表
+    """
+    files = []
+    for dir_path, _, file_names in os.walk(root_dir):
+        for file_name in file_names:
+            if file_name.startswith('~$'):
+                continue
+            file_path = os.path.join(dir_path, file_name)
+            if file_name.lower().endswith('.xlsx'):
+                files.append(file_path)
+            elif file_name.lower().endswith('.csv'):
+                if load_csv_to_mysql.is_crawl_csv(file_path):
+                    files.append(file_path)
+                else:
+                    print(f"跳过非采集CSV: {file_path}")
+    return sorted(files)
+
+
+def _ingest_file_worker(db_config, file_path, checksum, options):
+    """
+    在独立进程中导入单个文件，每个进程使用自己的数据库连接
+
+    Returns:
+        tuple: (文件路径, 状态, BatchResult)
+    """
+    connection = create_connection(**db_config)
+    if not connection:
+        result = BatchResult()
+        result.error = "无法连接到MySQL数据库"
+        return file_path, 'failed', result
+
+    try:
+        record_file_ingest(connection, checksum, file_path, 'running')
+        if file_path.lower().endswith('.csv'):
+            # 采集CSV每行自带账号名称
+            # 上次中断的文件从断点继续
+            result = load_csv_to_mysql.insert_data_from_csv(connection, file_path, options['batch_size'],
+                                                            options['csv_update_columns'], resume=True)
+        else:
+            # 从文件名中解析出account_name
+            account_name = os.path.basename(file_path).split(".")[0]
+            result = insert_data_from_xlsx(connection, file_path, account_name, options['batch_size'],
+                                           options['xlsx_update_columns'], options['chunk_size'], resume=True,
+                                           content_codec=options['content_codec'])
+        status = 'failed' if result.error else 'done'
+        record_file_ingest(connection, checksum, file_path, status, result, result.error)
+        return file_path, status, result
+    except Exception as e:
+        result = BatchResult()
+        result.error = str(e)
+        record_file_ingest(connection, checksum, file_path, 'failed', result, result.error)
+        return file_path, 'failed', result
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+def ingest_directory(db_config, root_dir, workers=None, batch_size=500, update_columns=None, chunk_size=None,
+                     force=False, content_codec=None):
+    """
+    并行导入目录下的全部XLSX和采集CSV文件
+
+    - 每个文件在独立的工作进程中导入，同时运行的进程数不超过 workers
+    - 导入进度按文件登记在 ingested_files 台账中，校验和已成功导入过的文件直接跳过
+
+    Args:
+        db_config: create_connection 的参数字典
+        root_dir: 要导入的目录
+        workers: 最大并行进程数，默认为CPU核数
+        batch_size: 每批写入并提交的行数
+        update_columns: 为None时普通插入；否则upsert，XLSX覆盖这些列，CSV使用其默认覆盖列
+        chunk_size: XLSX流式读取的块大小，为None时一次读入整个文件
+        force: 忽略台账，重新导入所有文件
+        content_codec: XLSX正文压缩写入 article_content 所用的算法，为None时写入 articles.content
+
+    Returns:
+        dict: {文件路径: (状态, BatchResult)}
+    """
+    files = discover_ingest_files(root_dir)
+    print(f"在 {root_dir} 下找到 {len(files)} 个待导入文件")
+    checksums = {path: file_checksum(path) for path in files}
+
+    if not force:
+        connection = create_connection(**db_config)
+        if not connection:
+            return {}
+        try:
+            cursor = connection.cursor()
+            done = get_ingested_checksums(cursor, set(checksums.values()))
+            cursor.close()
+        finally:
+            connection.close()
+        skipped = [path for path in files if checksums[path] in done]
+        for path in skipped:
+            print(f"跳过已导入的文件: {path}")
+        files = [path for path in files if checksums[path] not in done]
+
+    options = {
+        'batch_size': batch_size,
+        'chunk_size': chunk_size,
+        'content_codec': content_codec,
+        'xlsx_update_columns': update_columns,
+        'csv_update_columns': load_csv_to_mysql.DEFAULT_UPDATE_COLUMNS if update_columns is not None else None,
+    }
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_ingest_file_worker, db_config, path, checksums[path], options) for path in files]
+        for finished, future in enumerate(as_completed(futures), 1):
+            file_path, status, result = future.result()
+            results[file_path] = (status, result)
+            state = "完成" if status == 'done' else f"失败: {result.error}"
+            print(f"[{finished}/{len(files)}] {os.path.basename(file_path)} {state}，{result}")
+
+    failed = [path for path, (status, _) in results.items() if status != 'done']
+    print(f"目录导入结束: 成功 {len(results) - len(failed)} 个文件，失败 {len(failed)} 个文件")
+    return results
+
 
 def main():
     # 创建参数解析器
@@ -130,11 +495,41 @@ def main():
     parser.add_argument('--password', required=True, help='密码')
     parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
     parser.add_argument('--xlsx-file', required=False, help='XLSX文件路径')
+    parser.add_argument('--dir', help='导入目录下全部XLSX和采集CSV文件（并行）')
+    parser.add_argument('--workers', type=int, help='目录导入时的最大并行进程数 (默认: CPU核数)')
+    parser.add_argument('--force', action='store_true', help='目录导入时忽略台账，重新导入已导入过的文件')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批写入并提交的行数 (默认: 500)')
+    parser.add_argument('--upsert', action='store_true', help='按url upsert，重复导入同一文件不会产生重复行')
+    parser.add_argument('--stream-chunk-size', type=int,
+                        help='流式读取大文件，每次只在内存中保留指定行数 (默认: 一次读入整个文件)')
+    parser.add_argument('--resume', action='store_true', help='从上次中断的断点继续导入')
+    parser.add_argument('--quarantine-file', help='被拒绝行的隔离文件路径 (默认: <XLSX文件>.quarantine.csv)')
+    parser.add_argument('--no-prefilter', action='store_true', help='不做写入前的去重和已有行比对')
+    parser.add_argument('--compress-content', nargs='?', const=DEFAULT_CODEC, choices=['zstd', 'zlib'],
+                        help=f'正文压缩后写入 article_content 表，不写入 articles.content (默认算法: {DEFAULT_CODEC})')
+    parser.add_argument('--update-columns', default=','.join(DEFAULT_UPDATE_COLUMNS),
+                        help=f'upsert时url已存在要覆盖的列，逗号分隔 (默认: {",".join(DEFAULT_UPDATE_COLUMNS)})')
 
     # 解析命令行参数
     args = parser.parse_args()
-    root_path = os.path.dirname(os.path.abspath(__file__)) + "/db_dir/"
-    args.xlsx_file = root_path + "五分钟学大数据.xlsx"
+    update_columns = None
+    if args.upsert:
+        try:
+            update_columns = parse_update_columns(args.update_columns, ARTICLE_COLUMNS, 'url')
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.dir:
+        # 目录导入：每个工作进程自行创建数据库连接
+        db_config = {'host': args.host, 'database': args.database, 'user': args.user,
+                     'password': args.password, 'port': args.port}
+        ingest_directory(db_config, args.dir, args.workers, args.batch_size, update_columns,
+                         args.stream_chunk_size, args.force, args.compress_content)
+        return
+
+    if not args.xlsx_file:
+        root_path = os.path.dirname(os.path.abspath(__file__)) + "/db_dir/"
+        args.xlsx_file = root_path + "五分钟学大数据.xlsx"
 
     #从文件名中解析出account_name
     account_name = os.path.basename(args.xlsx_file).split(".")[0]
@@ -151,7 +546,9 @@ def main():
 
     try:
         # 插入数据
-        insert_data_from_xlsx(connection, args.xlsx_file, account_name)
+        insert_data_from_xlsx(connection, args.xlsx_file, account_name, args.batch_size, update_columns,
+                              args.stream_chunk_size, args.resume, args.quarantine_file, not args.no_prefilter,
+                              args.compress_content)
         print("数据导入完成")
     except Exception as e:
         print(f"导入过程中出错: {e}")
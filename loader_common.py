@@ -0,0 +1,441 @@
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from mysql.connector import Error
+
+# 判断已有记录时每次 IN 查询的键数量
+EXISTS_LOOKUP_SIZE = 2000
+
+
+def build_insert_query(table, columns, update_columns=None):
+    """
+    生成多行插入语句
+
+    Args:
+        table: 表名
+        columns: 插入的列
+        update_columns: 为None时生成普通INSERT；否则生成 INSERT ... ON DUPLICATE KEY UPDATE，
+                        键冲突时只覆盖这些列，其余列保留原值
+
+    Returns:
+        str: SQL语句
+    """
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if update_columns is not None:
+        if update_columns:
+            assignments = ", ".join(f"{column} = VALUES({column})" for column in update_columns)
+        else:
+            # 不覆盖任何列，键冲突时保持原样
+            assignments = f"{columns[0]} = {columns[0]}"
+        query += f" ON DUPLICATE KEY UPDATE {assignments}"
+    return query
+
+
+def parse_update_columns(value, columns, key_column):
+    """
+    解析命令行传入的逗号分隔覆盖列
+
+    Raises:
+        ValueError: 包含不存在的列或唯一键列
+    """
+    update_columns = [column.strip() for column in value.split(",") if column.strip()]
+    unknown = [column for column in update_columns if column not in columns or column == key_column]
+    if unknown:
+        raise ValueError(f"不能覆盖的列: {', '.join(unknown)}，可选列: "
+                         f"{', '.join(c for c in columns if c != key_column)}")
+    return update_columns
+
+
+def fetch_existing_keys(cursor, table, key_column, keys):
+    """
+    分批用 IN (...) 查询哪些键已存在于表中
+
+    Returns:
+        set: 已存在的键
+    """
+    keys = list(keys)
+    existing = set()
+    for start in range(0, len(keys), EXISTS_LOOKUP_SIZE):
+        chunk = keys[start:start + EXISTS_LOOKUP_SIZE]
+        cursor.execute(f"SELECT {key_column} FROM {table} WHERE {key_column} IN ({', '.join(['%s'] * len(chunk))})",
+                       tuple(chunk))
+        existing.update(row[0] for row in cursor.fetchall())
+    return existing
+
+
+def fetch_existing_rows(cursor, table, key_column, columns, keys):
+    """
+    分批用 IN (...) 查询已存在的键及其指定列的当前值
+
+    Returns:
+        dict: {键: 各列当前值的元组}
+    """
+    keys = list(keys)
+    existing = {}
+    select_columns = ', '.join([key_column] + list(columns))
+    for start in range(0, len(keys), EXISTS_LOOKUP_SIZE):
+        chunk = keys[start:start + EXISTS_LOOKUP_SIZE]
+        cursor.execute(f"SELECT {select_columns} FROM {table} WHERE {key_column} IN ({', '.join(['%s'] * len(chunk))})",
+                       tuple(chunk))
+        existing.update((row[0], tuple(row[1:])) for row in cursor.fetchall())
+    return existing
+
+
+class BatchResult:
+    """
+    一批写入的结果统计
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.duplicates = 0  # 同一批内重复的键，只保留最后一条
+        self.failed = []  # [(行参数, 错误信息), ...]
+        self.error = None  # 导致整个文件中止的错误
+        self.written = []  # 实际交给数据库插入或upsert成功的行；只在单批结果中有意义，add() 不累加
+
+    def add(self, other):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.duplicates += other.duplicates
+        self.failed.extend(other.failed)
+        return self
+
+    def __str__(self):
+        return f"新增 {self.inserted} 条, 更新 {self.updated} 条, 未变化 {self.unchanged} 条, " \
+               f"批内重复 {self.duplicates} 条, 失败 {len(self.failed)} 条"
+
+
+def _classify_row(result, rowcount):
+    """按单行affected rows分类: 1新增, 2更新, 0未变化"""
+    if rowcount == 2:
+        result.updated += 1
+    elif rowcount == 0:
+        result.unchanged += 1
+    else:
+        result.inserted += 1
+
+
+def write_batch(connection, cursor, table, columns, batch, key_column=None, update_columns=None,
+                existing_keys=None):
+    """
+    写入一批数据并提交
+
+    - update_columns 为None时执行普通INSERT
+    - 否则按 key_column 唯一键执行 upsert，并区分新增/更新/未变化的行数：
+      先查询本批中已存在的键数E，多行语句的affected rows R = 新增 + 2*更新，
+      新增 = N - E，更新 = (R - 新增) / 2，未变化 = E - 更新
+    - 整批失败时回滚并逐行重试，只有出错的行计入 failed
+
+    Args:
+        connection: MySQL数据库连接对象
+        cursor: 游标
+        table: 表名
+        columns: 列名，与batch中元组顺序一致
+        batch: 行参数元组列表
+        key_column: upsert所用的唯一键列
+        update_columns: 键冲突时覆盖的列
+        existing_keys: 已知本批中已存在的键（如 RowValidator 已查询过），为None时查询数据库
+
+    Returns:
+        BatchResult: 写入结果
+    """
+    result = BatchResult()
+    query = build_insert_query(table, columns, update_columns)
+    upsert = update_columns is not None
+
+    if upsert:
+        key_index = columns.index(key_column)
+        deduplicated = {}
+        for values in batch:
+            deduplicated[values[key_index]] = values
+        result.duplicates = len(batch) - len(deduplicated)
+        batch = list(deduplicated.values())
+
+    try:
+        existing = set()
+        if upsert:
+            existing = existing_keys if existing_keys is not None else \
+                fetch_existing_keys(cursor, table, key_column, [v[key_index] for v in batch])
+        cursor.executemany(query, batch)
+        connection.commit()
+        result.written = list(batch)
+        if upsert:
+            result.inserted = len(batch) - len(existing)
+            result.updated = (cursor.rowcount - result.inserted) // 2
+            result.unchanged = len(existing) - result.updated
+        else:
+            result.inserted = len(batch)
+        return result
+    except Error as e:
+        connection.rollback()
+        print(f"批量写入失败，改为逐行写入该批 {len(batch)} 行: {e}")
+
+    for values in batch:
+        try:
+            cursor.execute(query, values)
+            _classify_row(result, cursor.rowcount)
+            result.written.append(values)
+        except Error as e:
+            result.failed.append((values, str(e)))
+    connection.commit()
+    return result
+
+
+def _comparable(value):
+    """把文件中解析出的值和数据库返回的值统一成可比较的形式"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value).strip()
+
+
+class ValidationStats:
+    """
+    写入前校验的分类统计
+    """
+
+    def __init__(self):
+        self.invalid = 0  # 必填字段缺失或格式错误
+        self.duplicates = 0  # 文件内重复的链接
+        self.unchanged = 0  # 已存在且要覆盖的列没有变化
+        self.changed = 0  # 已存在且要覆盖的列有变化
+        self.new = 0  # 数据库中不存在
+
+    def __str__(self):
+        return f"校验: 无效 {self.invalid} 条, 文件内重复 {self.duplicates} 条, 已存在未变化 {self.unchanged} 条, " \
+               f"已存在有变化 {self.changed} 条, 新增 {self.new} 条"
+
+
+class RowValidator:
+    """
+    写入前按规范化链接去重，并分批对照数据库中的已有行，只把新增或有变化的行交给 write_batch
+
+    - 文件内重复：普通插入保留第一条；upsert保留最后一条（与 write_batch 的批内去重一致）
+    - 已存在的行：普通插入时一律跳过（不会覆盖），计入未变化；
+      upsert时比较 update_columns 的当前值，没有变化的跳过
+    - 必填字段校验由各加载器完成，校验失败的行通过 invalid() 计数
+    """
+
+    def __init__(self, table, columns, key_column, update_columns=None):
+        self.table = table
+        self.columns = columns
+        self.key_index = columns.index(key_column)
+        self.key_column = key_column
+        self.update_columns = update_columns
+        self.compare_indexes = [columns.index(column) for column in update_columns or []]
+        self.stats = ValidationStats()
+        self.seen = set()
+
+    def invalid(self, count=1):
+        self.stats.invalid += count
+
+    def filter(self, cursor, batch):
+        """
+        过滤一批行
+
+        Returns:
+            tuple: (需要写入的行列表, 其中已存在的键集合)
+        """
+        upsert = self.update_columns is not None
+        unique = {}
+        for values in batch:
+            key = values[self.key_index]
+            if key in unique or key in self.seen:
+                self.stats.duplicates += 1
+                if not upsert:
+                    continue
+                # upsert时后出现的行覆盖先出现的行
+                unique.pop(key, None)
+            unique[key] = values
+        self.seen.update(unique)
+
+        existing = fetch_existing_rows(cursor, self.table, self.key_column, self.update_columns or [], unique)
+        rows = []
+        existing_keys = set()
+        for key, values in unique.items():
+            if key not in existing:
+                self.stats.new += 1
+                rows.append(values)
+            elif upsert and [_comparable(values[i]) for i in self.compare_indexes] != \
+                    [_comparable(value) for value in existing[key]]:
+                self.stats.changed += 1
+                rows.append(values)
+                existing_keys.add(key)
+            else:
+                self.stats.unchanged += 1
+        return rows, existing_keys
+
+    def write(self, connection, cursor, batch):
+        """
+        过滤后写入一批行，被跳过的已存在行和重复行计入返回结果的未变化数和批内重复数
+
+        Returns:
+            BatchResult: 写入结果
+        """
+        unchanged, duplicates = self.stats.unchanged, self.stats.duplicates
+        rows, existing_keys = self.filter(cursor, batch)
+        result = BatchResult()
+        if rows:
+            result = write_batch(connection, cursor, self.table, self.columns, rows, self.key_column,
+                                 self.update_columns, existing_keys)
+        result.unchanged += self.stats.unchanged - unchanged
+        result.duplicates += self.stats.duplicates - duplicates
+        return result
+
+
+def file_checksum(file_path, block_size=1024 * 1024):
+    """计算文件的SHA-256校验和"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_ingested_checksums(cursor, checksums):
+    """
+    查询台账中已成功导入的文件校验和
+
+    Returns:
+        set: status 为 done 的校验和
+    """
+    checksums = list(checksums)
+    if not checksums:
+        return set()
+    cursor.execute(f"SELECT checksum FROM ingested_files WHERE status = 'done' "
+                   f"AND checksum IN ({', '.join(['%s'] * len(checksums))})", tuple(checksums))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def record_file_ingest(connection, checksum, file_path, status, result=None, message=None):
+    """
+    在 ingested_files 台账中登记文件导入进度
+
+    Args:
+        connection: MySQL数据库连接对象
+        checksum: 文件校验和
+        file_path: 文件路径
+        status: running / done / failed
+        result: 导入完成时的 BatchResult
+        message: 失败原因
+    """
+    result = result or BatchResult()
+    now = datetime.now()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+                       INSERT INTO ingested_files (checksum, file_name, status, rows_inserted, rows_updated,
+                                                   rows_unchanged, rows_failed, message, started_at, finished_at)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                       ON DUPLICATE KEY UPDATE file_name = VALUES(file_name), status = VALUES(status),
+                                               rows_inserted = VALUES(rows_inserted),
+                                               rows_updated = VALUES(rows_updated),
+                                               rows_unchanged = VALUES(rows_unchanged),
+                                               rows_failed = VALUES(rows_failed), message = VALUES(message),
+                                               started_at = IF(VALUES(status) = 'running', VALUES(started_at), started_at),
+                                               finished_at = VALUES(finished_at)
+                       """, (checksum, os.path.basename(file_path), status, result.inserted, result.updated,
+                             result.unchanged, len(result.failed), message, now,
+                             None if status == 'running' else now))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+class LoadCheckpoint:
+    """
+    导入断点：记录源文件中已提交到数据库的最后一行
+
+    断点文件默认保存在源文件旁（<源文件>.checkpoint.json），同时记录源文件大小和修改时间，
+    源文件变化后断点自动失效。
+    """
+
+    def __init__(self, source_path, checkpoint_path=None):
+        self.source_path = source_path
+        self.path = checkpoint_path or source_path + '.checkpoint.json'
+        stat = os.stat(source_path)
+        self.fingerprint = {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+        self.row = 0
+        self.chunk_id = 0
+
+    def load(self):
+        """读取断点，返回已提交的最后一行行号（无有效断点时为0）"""
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('file') == os.path.abspath(self.source_path) and state.get('fingerprint') == self.fingerprint:
+                self.row = state['row']
+                self.chunk_id = state['chunk_id']
+                print(f"从断点继续: 第 {self.row} 行之后（第 {self.chunk_id} 批之后）")
+            else:
+                print(f"断点文件 {self.path} 与源文件不匹配，从头开始导入")
+        return self.row
+
+    def save(self, row, chunk_id):
+        """在一批数据提交后保存断点"""
+        self.row = row
+        self.chunk_id = chunk_id
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'file': os.path.abspath(self.source_path), 'fingerprint': self.fingerprint,
+                       'row': row, 'chunk_id': chunk_id}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """整个文件导入成功后删除断点"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Quarantine:
+    """
+    隔离文件：把被拒绝的行连同原因写入CSV，供修正后重新导入
+
+    列为源文件原始列加上 _row_no、_reason；原因列放在最后，
+    采集CSV的隔离文件可直接作为 load_csv_to_mysql 的输入重放。
+    被拒绝的行先缓存在内存中，随所在批次提交时调用 flush 写盘，
+    避免断点续传时同一行被重复写入隔离文件。
+    """
+
+    def __init__(self, path, header, append=False):
+        self.path = path
+        self.header = list(header) + ['_row_no', '_reason']
+        self.append = append
+        self.pending = []
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, row_no, reason, values):
+        self.pending.append(list(values) + [row_no, reason])
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self._writer is None:
+            exists = self.append and os.path.exists(self.path)
+            self._file = open(self.path, 'a' if exists else 'w', newline='', encoding='utf-8-sig')
+            self._writer = csv.writer(self._file)
+            if not exists:
+                self._writer.writerow(self.header)
+        self._writer.writerows(self.pending)
+        self._file.flush()
+        self.count += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._writer = None
+        if self.count:
+            print(f"{self.count} 条被拒绝的行已写入隔离文件: {self.path}")
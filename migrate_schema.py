@@ -0,0 +1,496 @@
+import argparse
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+import mysql.connector
+from mysql.connector import Error
+
+# 微信文章长链接中用于唯一标识一篇文章的参数，其余（chksm、scene等）均为跟踪参数
+WX_LINK_KEY_PARAMS = ('__biz', 'mid', 'idx', 'sn')
+
+
+def create_connection(host, database, user, password, port=3306):
+    """创建MySQL数据库连接"""
+    try:
+        connection = mysql.connector.connect(
+            host=host,
+            database=database,
+            user=user,
+            password=password,
+            port=port
+        )
+        if connection.is_connected():
+            print(f"成功连接到MySQL数据库 {database}")
+            return connection
+    except Error as e:
+        print(f"连接MySQL时出错: {e}")
+        return None
+
+
+def canonical_link(link):
+    """
+    将微信文章链接规范化，作为去重和唯一键使用
+
+    - 去除首尾空白和 #rd 等锚点
+    - 统一为 https 协议、小写域名
+    - 长链接 /s?__biz=...&mid=...&idx=...&sn=... 只保留标识文章的参数并固定顺序（参数值保持原样不做编码转换）；
+      一个标识参数都没有的 /s 链接（如 /s?src=11&timestamp=...&signature=...）保留原查询参数，
+      否则不同文章会被归并成同一个链接
+    - 短链接 /s/xxxx 去掉全部查询参数
+    - mp.weixin.qq.com 下的其他路径保留原查询参数
+
+    规则需与 canonical_link_sql 保持一致。
+
+    Args:
+        link: 原始链接
+
+    Returns:
+        str: 规范化后的链接，空值原样返回
+    """
+    if not link:
+        return link
+    link = link.strip()
+    parts = urlsplit(link)
+    if parts.scheme not in ('http', 'https') or parts.netloc.lower() != 'mp.weixin.qq.com':
+        return link.split('#', 1)[0]
+
+    query = parts.query
+    if parts.path == '/s':
+        params = {}
+        for pair in parts.query.split('&'):
+            key, sep, value = pair.partition('=')
+            if sep:
+                params.setdefault(key, value)
+        key_query = '&'.join(f"{key}={params[key]}" for key in WX_LINK_KEY_PARAMS if key in params)
+        if key_query:
+            query = key_query
+    elif parts.path.startswith('/s/'):
+        query = ''
+    return urlunsplit(('https', 'mp.weixin.qq.com', parts.path, query, ''))
+
+
+def canonical_link_sql(column):
+    """
+    生成与 canonical_link 规则一致的SQL表达式，供集合式导入在数据库端规范化链接
+
+    路径和参数名按大小写敏感比较，与Python一致；两者的一致性由 tests/test_canonical_link.py 对照检查。
+    """
+    link = f"REGEXP_REPLACE({column}, '^[[:space:]]+|[[:space:]]+$', '')"
+    no_fragment = f"SUBSTRING_INDEX({link}, '#', 1)"
+    # 去掉协议和域名后剩下的 路径?查询参数
+    rest = f"REGEXP_REPLACE({no_fragment}, '^[^/]*//[^/?]*', '')"
+    path = f"SUBSTRING_INDEX({rest}, '?', 1)"
+    query = f"REGEXP_REPLACE({rest}, '^[^?]*[?]?', '')"
+    key_query = "CONCAT_WS('&', " + ", ".join(
+        f"SUBSTRING(REGEXP_SUBSTR(CONCAT('&', {query}), '&{key}=[^&]*', 1, 1, 'c'), 2)" for key in WX_LINK_KEY_PARAMS
+    ) + ")"
+    return (
+        f"CASE "
+        f"WHEN REGEXP_LIKE({link}, '^https?://mp\\\\.weixin\\\\.qq\\\\.com([/?#]|$)', 'i') "
+        f"THEN CONCAT('https://mp.weixin.qq.com', {path}, "
+        f"CASE "
+        f"WHEN REGEXP_LIKE({path}, '^/s/', 'c') THEN '' "
+        f"WHEN REGEXP_LIKE({path}, '^/s$', 'c') "
+        f"THEN COALESCE(CONCAT('?', NULLIF({key_query}, '')), CONCAT('?', NULLIF({query}, '')), '') "
+        f"ELSE COALESCE(CONCAT('?', NULLIF({query}, '')), '') "
+        f"END) "
+        f"ELSE {no_fragment} "
+        f"END"
+    )
+
+
+def release_day_sql(column):
+    """
+    生成把发布日期文本解析为DATE的SQL表达式
+
+    支持 2025-08-09、2025/08/09、2025年08月09日 以及带时间的写法，
+    其余（如"昨天"）以及不存在的日期（如 2025-02-30）解析为NULL。
+
+    与 load_csv_to_mysql._collect_time_sql 相同，先拆出年月日校验取值范围（含当月天数），
+    只对合法的值调用 STR_TO_DATE：严格模式下触发器和 UPDATE 中的 STR_TO_DATE
+    遇到非法日期会报错中止整条语句，而不是返回NULL。
+    """
+    def valid(parts):
+        year, month, day = (f"CAST({part} AS UNSIGNED)" for part in parts)
+        # 月份先夹到1-12再计算当月天数，避免日期运算本身溢出
+        days_in_month = (f"DAY(LAST_DAY(MAKEDATE(GREATEST({year}, 1000), 1) "
+                         f"+ INTERVAL (LEAST(GREATEST({month}, 1), 12) - 1) MONTH))")
+        return f"{year} >= 1000 AND {month} BETWEEN 1 AND 12 AND {day} BETWEEN 1 AND {days_in_month}"
+
+    date = f"SUBSTRING_INDEX({column}, ' ', 1)"
+    chinese_date = f"SUBSTRING_INDEX({column}, '日', 1)"
+    dashed = [f"SUBSTRING_INDEX({date}, '-', 1)",
+              f"SUBSTRING_INDEX(SUBSTRING_INDEX({date}, '-', 2), '-', -1)",
+              f"SUBSTRING_INDEX({date}, '-', -1)"]
+    slashed = [f"SUBSTRING_INDEX({date}, '/', 1)",
+               f"SUBSTRING_INDEX(SUBSTRING_INDEX({date}, '/', 2), '/', -1)",
+               f"SUBSTRING_INDEX({date}, '/', -1)"]
+    chinese = [f"SUBSTRING_INDEX({chinese_date}, '年', 1)",
+               f"SUBSTRING_INDEX(SUBSTRING_INDEX({chinese_date}, '月', 1), '年', -1)",
+               f"SUBSTRING_INDEX({chinese_date}, '月', -1)"]
+    return (
+        f"CASE "
+        f"WHEN {column} REGEXP '^[0-9]{{4}}-[0-9]{{1,2}}-[0-9]{{1,2}}( |$)' "
+        f"THEN CASE WHEN {valid(dashed)} THEN STR_TO_DATE({date}, '%Y-%m-%d') END "
+        f"WHEN {column} REGEXP '^[0-9]{{4}}/[0-9]{{1,2}}/[0-9]{{1,2}}( |$)' "
+        f"THEN CASE WHEN {valid(slashed)} THEN STR_TO_DATE({date}, '%Y/%m/%d') END "
+        f"WHEN {column} REGEXP '^[0-9]{{4}}年[0-9]{{1,2}}月[0-9]{{1,2}}日' "
+        f"THEN CASE WHEN {valid(chinese)} THEN STR_TO_DATE({chinese_date}, '%Y年%m月%d') END "
+        f"END"
+    )
+
+
+def keyword_postings_sql(where):
+    """
+    生成从 articles.segment_words 展开关键词写入 article_keywords 的语句
+
+    Args:
+        where: 限定 articles（别名 a）范围的条件
+    """
+    return f"""
+            INSERT IGNORE INTO article_keywords (keyword, article_id)
+            SELECT DISTINCT jt.keyword, a.id
+            FROM articles a,
+                 JSON_TABLE(a.segment_words, '$[*]' COLUMNS (keyword VARCHAR(128) PATH '$' NULL ON ERROR)) AS jt
+            WHERE {where} AND jt.keyword IS NOT NULL AND jt.keyword <> ''
+            """
+
+
+def backfill_keyword_postings(connection, cursor, batch_size=10000):
+    """按ID分段从 segment_words 回填 article_keywords，每段提交一次"""
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM articles")
+    max_id = cursor.fetchone()[0]
+    filled = 0
+    for start in range(0, max_id + 1, batch_size):
+        cursor.execute(keyword_postings_sql(f"a.id BETWEEN {start} AND {start + batch_size - 1}"))
+        filled += cursor.rowcount
+        connection.commit()
+    print(f"  回填关键词倒排 {filled} 条")
+    return filled
+
+
+def _column_exists(cursor, table, column):
+    cursor.execute("""
+                   SELECT COUNT(*) FROM information_schema.COLUMNS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+                   """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def _index_exists(cursor, table, index):
+    cursor.execute("""
+                   SELECT COUNT(*) FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+                   """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def _add_index(cursor, table, index, definition):
+    """索引不存在时才创建，保证迁移可重复执行"""
+    if not _index_exists(cursor, table, index):
+        print(f"  创建索引 {table}.{index}")
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+
+def _migration_create_tables(connection, cursor):
+    """创建 article_link_info 和 articles 基础表"""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS article_link_info (
+                       id           BIGINT AUTO_INCREMENT PRIMARY KEY,
+                       account_name VARCHAR(128) NOT NULL,
+                       title        VARCHAR(512) NOT NULL,
+                       link         VARCHAR(512) NOT NULL,
+                       release_date VARCHAR(64)  NOT NULL,
+                       is_free      TINYINT      NOT NULL DEFAULT 1 COMMENT '1代表免费，0代表付费',
+                       collect_time DATETIME     NOT NULL
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS articles (
+                       id             BIGINT AUTO_INCREMENT PRIMARY KEY,
+                       sys_id         VARCHAR(64),
+                       account_name   VARCHAR(128) NOT NULL,
+                       url            VARCHAR(512) NOT NULL,
+                       title          VARCHAR(512) NOT NULL,
+                       cover_image    VARCHAR(1024),
+                       summary        TEXT,
+                       create_time    DATETIME,
+                       publish_time   DATETIME,
+                       read_count     INT NOT NULL DEFAULT 0,
+                       like_count     INT NOT NULL DEFAULT 0,
+                       share_count    INT NOT NULL DEFAULT 0,
+                       favorite_count INT NOT NULL DEFAULT 0,
+                       comment_count  INT NOT NULL DEFAULT 0,
+                       author         VARCHAR(128),
+                       is_original    TINYINT NOT NULL DEFAULT 0,
+                       article_type   VARCHAR(64),
+                       collection     VARCHAR(255),
+                       content        LONGTEXT,
+                       segment_words  JSON
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+
+
+def _canonicalize_and_dedup(cursor, table, link_column, batch_size=5000):
+    """
+    把已有链接规范化，并删除规范化后重复的行（保留ID最小的一条）
+
+    被删除的行先原样复制到 <table>_dedup_backup，确认无误后可手动删除该备份表。
+    """
+    last_id = 0
+    changed = 0
+    while True:
+        cursor.execute(f"SELECT id, {link_column} FROM {table} WHERE id > %s ORDER BY id LIMIT %s",
+                       (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = [(canonical_link(link), row_id) for row_id, link in rows if link and canonical_link(link) != link]
+        if updates:
+            cursor.executemany(f"UPDATE {table} SET {link_column} = %s WHERE id = %s", updates)
+            changed += len(updates)
+        last_id = rows[-1][0]
+    print(f"  {table}: 规范化 {changed} 条链接")
+
+    duplicate_condition = f"""
+                          id NOT IN (SELECT keep_id
+                                     FROM (SELECT MIN(id) AS keep_id FROM {table} GROUP BY {link_column}) AS keep_rows)
+                          """
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {duplicate_condition}")
+    if cursor.fetchone()[0] == 0:
+        print(f"  {table}: 没有重复记录")
+        return
+
+    backup_table = f"{table}_dedup_backup"
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {backup_table} LIKE {table}")
+    # 迁移中断后重新执行时，已备份的行按主键跳过
+    cursor.execute(f"INSERT IGNORE INTO {backup_table} SELECT * FROM {table} WHERE {duplicate_condition}")
+    print(f"  {table}: 已备份 {cursor.rowcount} 条重复记录到 {backup_table}")
+    cursor.execute(f"DELETE FROM {table} WHERE {duplicate_condition}")
+    print(f"  {table}: 删除 {cursor.rowcount} 条重复记录")
+
+
+def _migration_unique_links(connection, cursor):
+    """规范化链接并在 article_link_info.link / articles.url 上建立唯一键"""
+    _canonicalize_and_dedup(cursor, 'article_link_info', 'link')
+    _canonicalize_and_dedup(cursor, 'articles', 'url')
+    _add_index(cursor, 'article_link_info', 'uk_link', 'UNIQUE KEY uk_link (link)')
+    _add_index(cursor, 'articles', 'uk_url', 'UNIQUE KEY uk_url (url)')
+
+
+def _migration_access_indexes(connection, cursor):
+    """为常用过滤条件建立复合索引（InnoDB二级索引自动附带主键id，可直接支撑 (collect_time, id) 游标分页）"""
+    _add_index(cursor, 'article_link_info', 'idx_collect_time', 'INDEX idx_collect_time (collect_time)')
+    _add_index(cursor, 'article_link_info', 'idx_account_collect',
+               'INDEX idx_account_collect (account_name, collect_time)')
+    _add_index(cursor, 'article_link_info', 'idx_free_collect', 'INDEX idx_free_collect (is_free, collect_time)')
+    _add_index(cursor, 'articles', 'idx_account_publish', 'INDEX idx_account_publish (account_name, publish_time)')
+
+
+def _migration_release_day(connection, cursor, batch_size=10000):
+    """增加解析后的发布日期列 release_day，回填历史数据并由触发器维护新数据"""
+    if not _column_exists(cursor, 'article_link_info', 'release_day'):
+        print("  增加列 article_link_info.release_day")
+        cursor.execute("ALTER TABLE article_link_info ADD COLUMN release_day DATE NULL AFTER release_date")
+
+    # 按ID分段回填，避免单个大事务长时间锁表
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM article_link_info")
+    max_id = cursor.fetchone()[0]
+    filled = 0
+    for start in range(0, max_id + 1, batch_size):
+        cursor.execute(f"""
+                       UPDATE IGNORE article_link_info
+                       SET release_day = {release_day_sql('release_date')}
+                       WHERE id BETWEEN {start} AND {start + batch_size - 1} AND release_day IS NULL
+                       """)
+        filled += cursor.rowcount
+        connection.commit()
+    print(f"  回填 release_day {filled} 条")
+
+    for event in ('INSERT', 'UPDATE'):
+        trigger = f"trg_article_link_info_release_day_{event.lower()}"
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"""
+                       CREATE TRIGGER {trigger} BEFORE {event} ON article_link_info
+                       FOR EACH ROW SET NEW.release_day = {release_day_sql('NEW.release_date')}
+                       """)
+
+    _add_index(cursor, 'article_link_info', 'idx_release_day', 'INDEX idx_release_day (release_day)')
+    _add_index(cursor, 'article_link_info', 'idx_account_release',
+               'INDEX idx_account_release (account_name, release_day)')
+
+
+def _migration_summary_index(connection, cursor):
+    """为按账号聚合统计建立覆盖索引，GROUP BY account_name 时无需回表"""
+    _add_index(cursor, 'article_link_info', 'idx_account_summary',
+               'INDEX idx_account_summary (account_name, is_free, release_day, collect_time, link)')
+
+
+def _migration_ingested_files(connection, cursor):
+    """创建导入文件台账，按文件校验和跳过已导入的文件"""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS ingested_files (
+                       checksum       CHAR(64)     NOT NULL PRIMARY KEY,
+                       file_name      VARCHAR(512) NOT NULL,
+                       status         VARCHAR(16)  NOT NULL COMMENT 'running/done/failed',
+                       rows_inserted  INT          NOT NULL DEFAULT 0,
+                       rows_updated   INT          NOT NULL DEFAULT 0,
+                       rows_unchanged INT          NOT NULL DEFAULT 0,
+                       rows_failed    INT          NOT NULL DEFAULT 0,
+                       message        TEXT,
+                       started_at     DATETIME     NOT NULL,
+                       finished_at    DATETIME
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+
+
+def _migration_article_content(connection, cursor):
+    """创建压缩正文表 article_content，正文迁移由 article_content.py --migrate 分批完成"""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS article_content (
+                       article_id   BIGINT      NOT NULL PRIMARY KEY,
+                       codec        VARCHAR(8)  NOT NULL COMMENT 'zstd/zlib',
+                       content_hash CHAR(64)    NOT NULL COMMENT '原文SHA-256',
+                       raw_length   INT         NOT NULL COMMENT '原文UTF-8字节数',
+                       data         LONGBLOB    NOT NULL,
+                       updated_at   DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                       CONSTRAINT fk_article_content_article FOREIGN KEY (article_id) REFERENCES articles (id)
+                           ON DELETE CASCADE
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+
+
+def _migration_article_keywords(connection, cursor):
+    """创建关键词倒排表 article_keywords 并从已有分词结果回填"""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS article_keywords (
+                       keyword    VARCHAR(128) NOT NULL,
+                       article_id BIGINT       NOT NULL,
+                       PRIMARY KEY (keyword, article_id),
+                       INDEX idx_article (article_id)
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+    backfill_keyword_postings(connection, cursor)
+
+
+def _migration_dup_cluster(connection, cursor):
+    """增加近似重复文章的聚类ID列 articles.dup_cluster_id，由 dedup_articles.py 计算填充"""
+    if not _column_exists(cursor, 'articles', 'dup_cluster_id'):
+        print("  增加列 articles.dup_cluster_id")
+        cursor.execute("ALTER TABLE articles ADD COLUMN dup_cluster_id BIGINT NULL COMMENT '近似重复文章所在簇中最小的文章ID'")
+    _add_index(cursor, 'articles', 'idx_dup_cluster', 'INDEX idx_dup_cluster (dup_cluster_id)')
+
+
+# 版本号必须递增；已发布的迁移不要修改，新的表结构变更请追加新版本
+MIGRATIONS = [
+    (1, '创建 article_link_info 和 articles 表', _migration_create_tables),
+    (2, '规范化链接并增加唯一键', _migration_unique_links),
+    (3, '增加按账号/免费/采集时间的复合索引', _migration_access_indexes),
+    (4, '增加 release_day 日期列及回填', _migration_release_day),
+    (5, '增加账号统计覆盖索引', _migration_summary_index),
+    (6, '创建导入文件台账 ingested_files', _migration_ingested_files),
+    (7, '创建压缩正文表 article_content', _migration_article_content),
+    (8, '创建关键词倒排表 article_keywords', _migration_article_keywords),
+    (9, '增加近似重复聚类列 articles.dup_cluster_id', _migration_dup_cluster),
+]
+
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS schema_version (
+                       version     INT PRIMARY KEY,
+                       description VARCHAR(255) NOT NULL,
+                       applied_at  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP
+                   ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+                   """)
+
+
+def get_current_version(connection):
+    """获取数据库当前的表结构版本，未迁移过时为0"""
+    cursor = connection.cursor()
+    try:
+        ensure_version_table(cursor)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def migrate(connection, target_version=None):
+    """
+    依次执行尚未应用的迁移
+
+    MySQL的DDL会隐式提交，因此每个迁移都写成可重复执行的形式：
+    中途失败后修复问题重新运行即可从失败的版本继续。
+
+    Args:
+        connection: MySQL数据库连接对象
+        target_version: 迁移到的目标版本，默认为最新版本
+
+    Returns:
+        int: 迁移完成后的版本号，出错时为最后一个成功应用的版本
+    """
+    current = get_current_version(connection)
+    target = target_version if target_version is not None else MIGRATIONS[-1][0]
+    pending = [m for m in MIGRATIONS if current < m[0] <= target]
+    if not pending:
+        print(f"表结构已是版本 {current}，无需迁移")
+        return current
+
+    cursor = connection.cursor()
+    try:
+        for version, description, func in pending:
+            print(f"应用迁移 {version}: {description}")
+            func(connection, cursor)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                           (version, description))
+            connection.commit()
+            current = version
+        print(f"迁移完成，当前版本 {current}")
+    except Error as e:
+        print(f"迁移版本 {version} 时出错: {e}")
+        connection.rollback()
+    finally:
+        cursor.close()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description='创建和升级文章相关表结构')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--target', type=int, help='迁移到的目标版本 (默认: 最新)')
+    parser.add_argument('--status', action='store_true', help='只显示当前版本和待执行的迁移')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        sys.exit(1)
+
+    failed = False
+    try:
+        if args.status:
+            current = get_current_version(connection)
+            print(f"当前版本: {current}")
+            for version, description, _ in MIGRATIONS:
+                state = "已应用" if version <= current else "待执行"
+                print(f"  [{state}] {version}: {description}")
+        else:
+            target = args.target if args.target is not None else MIGRATIONS[-1][0]
+            # 迁移出错时 migrate 回滚并停在最后成功的版本
+            failed = migrate(connection, args.target) < target
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
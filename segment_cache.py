@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_dir", "segment_cache.db")
+
+# 每次 IN 查询的键数量，低于SQLite的参数个数上限
+LOOKUP_SIZE = 500
+
+CACHE_SCHEMA = """
+               CREATE TABLE IF NOT EXISTS segments (
+                   text_hash TEXT PRIMARY KEY,
+                   words     TEXT NOT NULL
+               );
+               CREATE TABLE IF NOT EXISTS cache_meta (
+                   name  TEXT PRIMARY KEY,
+                   value TEXT NOT NULL
+               );
+               """
+
+
+def normalize_text(text):
+    """去掉首尾空白并把连续空白合并为一个空格；空白不影响分词结果"""
+    return ' '.join(text.split())
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class SegmentCache:
+    """
+    分词结果的持久化缓存（SQLite）
+
+    键为规范化后标题的哈希。打开缓存时传入词典版本（由术语表和过滤规则计算），
+    与缓存中记录的版本不一致时自动清空，修改 TECH_TERMS、POS_FILTER 等之后不会读到旧结果。
+    清空缓存的提示写入 log（结果输出到标准输出时应传入 sys.stderr）。
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, version='', log=sys.stdout):
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self.path = cache_path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.log = log
+        self.db = sqlite3.connect(cache_path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(CACHE_SCHEMA)
+        self.set_version(version)
+
+    def set_version(self, version):
+        """切换词典版本，与缓存中记录的版本不一致时清空缓存"""
+        row = self.db.execute("SELECT value FROM cache_meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            if row is not None:
+                print(f"分词词典或规则已变化，清空分词缓存 {self.path}", file=self.log)
+            self.db.execute("DELETE FROM segments")
+            self.db.execute("INSERT OR REPLACE INTO cache_meta (name, value) VALUES ('version', ?)", (version,))
+            self.db.commit()
+        self.version = version
+
+    def get_many(self, texts):
+        """
+        批量查询缓存
+
+        Returns:
+            dict: {文本: 分词结果列表}，只包含命中的文本
+        """
+        keys = {}
+        for text in texts:
+            keys.setdefault(text_hash(text), []).append(text)
+        found = {}
+        hashes = list(keys)
+        for start in range(0, len(hashes), LOOKUP_SIZE):
+            chunk = hashes[start:start + LOOKUP_SIZE]
+            rows = self.db.execute(f"SELECT text_hash, words FROM segments "
+                                   f"WHERE text_hash IN ({', '.join('?' for _ in chunk)})", chunk).fetchall()
+            for key, words in rows:
+                for text in keys[key]:
+                    found[text] = json.loads(words)
+        self.hits += len(found)
+        self.misses += len(set(texts)) - len(found)
+        return found
+
+    def put_many(self, items):
+        """写入 [(文本, 分词结果列表), ...]"""
+        self.db.executemany("INSERT OR REPLACE INTO segments (text_hash, words) VALUES (?, ?)",
+                            [(text_hash(text), json.dumps(words, ensure_ascii=False)) for text, words in items])
+        self.db.commit()
+
+    def get(self, text):
+        return self.get_many([text]).get(text)
+
+    def put(self, text, words):
+        self.put_many([(text, words)])
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self):
+        return f"分词缓存: 命中 {self.hits} 条, 未命中 {self.misses} 条, 命中率 {self.hit_rate():.1%}"
+
+    def close(self):
+        self.db.close()
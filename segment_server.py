@@ -0,0 +1,122 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import split_words
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 单次请求最多分词的文本数
+MAX_BATCH_SIZE = 5000
+
+
+class SegmentService:
+    """
+    常驻的分词服务：启动时加载一次jieba词典和技术术语，之后每个请求直接分词
+    """
+
+    def __init__(self):
+        start = time.perf_counter()
+        split_words._init_worker()
+        split_words.auto_segment_and_filter("预热")
+        self.started_at = time.time()
+        self.requests = 0
+        self.texts = 0
+        # jieba的用户词典在热加载时会被修改，分词串行执行
+        self.lock = threading.Lock()
+        print(f"分词词典加载完成，耗时 {time.perf_counter() - start:.2f} 秒")
+
+    def segment(self, texts):
+        with self.lock:
+            results = [split_words.auto_segment_and_filter(text) for text in texts]
+            self.requests += 1
+            self.texts += len(texts)
+            return results, split_words.dictionary_version()
+
+    def health(self):
+        with self.lock:
+            split_words.reload_dictionary()
+            version = split_words.dictionary_version()
+        return {
+            "status": "ok",
+            "dictionary_version": version,
+            "uptime": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "texts": self.texts,
+        }
+
+
+class SegmentRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health   服务状态和当前词典版本
+    POST /segment  请求体 {"texts": [...]}，返回 {"results": [[...], ...], "dictionary_version": "..."}
+    """
+
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.service.health())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/segment":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            texts = json.loads(self.rfile.read(length).decode("utf-8"))["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts 必须是字符串列表")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"请求格式错误: {e}"})
+            return
+        if len(texts) > MAX_BATCH_SIZE:
+            self._send_json(413, {"error": f"单次最多 {MAX_BATCH_SIZE} 条文本"})
+            return
+
+        results, version = self.service.segment(texts)
+        self._send_json(200, {"results": results, "dictionary_version": version})
+
+    def log_message(self, format, *args):
+        # 不逐个请求打印访问日志
+        pass
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """启动分词服务，阻塞直到被中断"""
+    SegmentRequestHandler.service = SegmentService()
+    server = ThreadingHTTPServer((host, port), SegmentRequestHandler)
+    print(f"分词服务已启动: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("分词服务已停止")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='常驻分词服务，避免每次运行都重新加载jieba词典')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'监听地址 (默认: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口 (默认: {DEFAULT_PORT})')
+
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,125 +1,142 @@
+import jieba
 import jieba.posseg as pseg
 import re
 import csv
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from itertools import islice
+from multiprocessing import Pool
 
-# 定义硬编码的技术术语列表（避免重复定义）
-TECH_TERMS = {
-    "数据中台", "中台", "数据仓库", "数仓", "数据湖", "湖仓一体",
-    "Flink", "Spark", "Hadoop", "Hive", "Kafka", "Doris", "Paimon",
-    "实时计算", "流处理", "批处理", "ETL", "数据治理", "维度建模",
-    "事实表", "维度表", "OLAP", "数据质量", "元数据", "数据血缘",
-    "指标体系", "数据资产", "数据开发", "数据平台",
-    "数据可视化", "数据倾斜", "离线数仓", "实时数仓"
-}
-
-# 面试相关关键字
-INTERVIEW_KEYWORDS = {
-    "面试", "面试题", "面试提问", "面经", "面试官", "面试真题",
-    "面试必问", "面试系列", "面试八股文", "面试宝典", "面试经验"
-}
-
-# 词性过滤规则
-POS_FILTER = {
-    'a', 'ag', 'ad', 'an',  # 形容词
-    'q',  # 量词
-    'e', 'y', 'u', 'ug',  # 语气词/助词
-    'r', 'c', 'p', 'f',  # 代词/连词/介词/方位词
-    'v', 'vg', 'vd', 'vn',  # 动词
-    'd'  # 副词
-}
-
-# 特殊词过滤列表
-SPECIAL_FILTER = {
-    "的", "了", "啊", "呢", "吧", "呀", "哦", "嗯", "哈",
-    "你", "我", "他", "她", "它", "我们", "你们", "他们",
-    "这", "那", "哪", "谁", "什么", "怎么", "为什么",
-    "就", "都", "也", "还", "又", "再", "才", "却", "给",
-    "滚", "要", "会", "能", "可以", "觉得", "认为", "想",
-    "vs"
-}
+from segment_cache import DEFAULT_CACHE_PATH, SegmentCache
+from term_dictionary import DictionaryWatcher
+
+# 词表从 dicts/ 下的文件加载（见 term_dictionary.py），编译产物可在毫秒级反序列化；
+# 源文件修改后，运行中的进程最多 DICT_CHECK_INTERVAL 秒后自动重新加载
+DICT_CHECK_INTERVAL = 5.0
+_dictionary_watcher = DictionaryWatcher(check_interval=DICT_CHECK_INTERVAL)
+_active_dictionary = None
+
+# 技术术语、面试关键字、过滤的词性、特殊词过滤列表，以及编译好的术语匹配器（英文词不区分大小写）
+TECH_TERMS = INTERVIEW_KEYWORDS = POS_FILTER = SPECIAL_FILTER = None
+TECH_MATCHER = INTERVIEW_MATCHER = None
+
+
+def reload_dictionary():
+    """词表源文件变化时切换到新的词典"""
+    global _active_dictionary, TECH_TERMS, INTERVIEW_KEYWORDS, POS_FILTER, SPECIAL_FILTER
+    global TECH_MATCHER, INTERVIEW_MATCHER
+    dictionary = _dictionary_watcher.current()
+    if dictionary is _active_dictionary:
+        return
+    _active_dictionary = dictionary
+    TECH_TERMS = dictionary.tech_terms
+    INTERVIEW_KEYWORDS = dictionary.interview_keywords
+    POS_FILTER = dictionary.pos_filter
+    SPECIAL_FILTER = dictionary.special_filter
+    TECH_MATCHER = dictionary.tech_matcher
+    INTERVIEW_MATCHER = dictionary.interview_matcher
+
+
+reload_dictionary()
 
 
 def extract_interview_keywords(text):
-    """提取面试相关关键字"""
-    found_keywords = []
-    for keyword in INTERVIEW_KEYWORDS:
-        if keyword in text and keyword not in found_keywords:
-            found_keywords.append(keyword)
-    return found_keywords
+    """提取面试相关关键字，按在文本中首次出现的位置排列"""
+    return INTERVIEW_MATCHER.distinct(text)
+
+
+# 技术术语注册到jieba词典时的词性（其他专名），词频由 jieba.suggest_freq 计算，保证切分为一个词
+TECH_TERM_TAG = 'nz'
+_registered_terms = set()
+_registered_version = None
+
+# 修改 auto_segment_and_filter 的处理规则后递增，使分词缓存失效
+RULES_VERSION = 2
+
+
+def dictionary_version():
+    """术语表、过滤规则和jieba版本的哈希，作为分词缓存的版本"""
+    payload = json.dumps({
+        'dictionary': _active_dictionary.version,
+        'tech_term_tag': TECH_TERM_TAG,
+        'rules': RULES_VERSION,
+        'jieba': jieba.__version__,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_tech_dictionary():
+    """
+    把 TECH_TERMS 注册为jieba用户词典，使“湖仓一体”“实时数仓”等在一次切分中成为完整的词
+
+    词典重新加载后只增删变化的术语。
+    """
+    global _registered_terms, _registered_version
+    if _registered_version == _active_dictionary.version:
+        return
+    for term in _registered_terms - TECH_TERMS:
+        jieba.del_word(term)
+    for term in TECH_TERMS - _registered_terms:
+        jieba.add_word(term, tag=TECH_TERM_TAG)
+    _registered_terms = set(TECH_TERMS)
+    _registered_version = _active_dictionary.version
 
 
 def auto_segment_and_filter(text):
-    """自动化分词并过滤，保留技术专有名词"""
-    # 使用 PaddleNLP 识别技术专有名词（如果模型可用）
-    tech_terms = set()
+    """
+    自动化分词并过滤，保留技术专有名词
 
-    # 词性标注分词
-    words = pseg.cut(text)
+    结果按词在标题中出现的位置排列：分词得到的词，加上标题中出现的全部技术术语
+    （包括被更长术语包含的，如“数据中台”中的“中台”），以及出现面试关键字时的“面试”。
+    """
+    reload_dictionary()
+    load_tech_dictionary()
 
-    # 过滤处理
-    filtered_words = []
-    for word_pair in words:
+    # 记录每个保留的词在标题中的起始位置
+    positioned = []
+    offset = 0
+    for word_pair in pseg.cut(text):
         word = word_pair.word
         pos = word_pair.flag
+        start = offset
+        offset += len(word)
 
         # 跳过标点符号
         if re.match(r'[^\w\s]', word):
             continue
 
-        # 保护技术专有名词（PaddleNLP 识别出的）
-        if word in tech_terms:
-            filtered_words.append(word)
+        # 保护技术专有名词，统一为词典中的写法
+        tech_term = TECH_MATCHER.canonical(word)
+        if tech_term:
+            positioned.append((start, tech_term))
             continue
 
-        # 保护技术专有名词（硬编码列表）
-        if word in TECH_TERMS:
-            filtered_words.append(word)
+        # 过滤特定词性、特殊词和单字词
+        if pos in POS_FILTER or word in SPECIAL_FILTER or len(word) == 1:
             continue
+        positioned.append((start, word))
 
-        # 过滤特定词性和特殊词
-        if pos not in POS_FILTER and word not in SPECIAL_FILTER:
-            # 合并技术相关的单字词
-            if len(word) == 1 and filtered_words and filtered_words[-1] + word in TECH_TERMS:
-                filtered_words[-1] += word  # 如"中" + "台" -> "中台"
-            else:
-                filtered_words.append(word)
-
-    # 后处理：合并技术专有名词
-    final_result = []
-    i = 0
-    while i < len(filtered_words):
-        # 检查可能的组合词（2-3个词）
-        combined = None
-        for length in [3, 2]:
-            if i + length <= len(filtered_words):
-                candidate = "".join(filtered_words[i:i + length])
-                if candidate in tech_terms or candidate in TECH_TERMS:
-                    combined = candidate
-                    i += length - 1  # 跳过已合并的词
-                    break
-
-        if combined:
-            final_result.append(combined)
-        else:
-            # 过滤单字非技术词
-            if len(filtered_words[i]) > 1 or filtered_words[i] in TECH_TERMS:
-                final_result.append(filtered_words[i])
-        i += 1
-
-    # 检查标题中是否包含TECH_TERMS中的关键字，确保都被包含在结果中
-    for term in TECH_TERMS:
-        if term in text and term not in final_result:
-            final_result.append(term)
-
-    # 检查是否包含面试关键字
-    interview_keywords = extract_interview_keywords(text)
-    if interview_keywords and "面试" not in final_result:
-        final_result.append("面试")
-
-    # 去重但保持顺序
+    # 标题中出现的技术术语都包含在结果中
+    for start, _, term in TECH_MATCHER.find_all(text):
+        positioned.append((start, term))
+
+    # 包含面试关键字时在首个关键字的位置加入“面试”
+    interview_matches = INTERVIEW_MATCHER.find(text)
+    if interview_matches:
+        positioned.append((interview_matches[0][0], "面试"))
+
+    # 按位置排序（同一位置长词在前），去重但保持顺序
+    positioned.sort(key=lambda item: (item[0], -len(item[1])))
     seen = set()
     deduplicated_result = []
-    for item in final_result:
+    for _, item in positioned:
         if item not in seen:
             seen.add(item)
             deduplicated_result.append(item)
@@ -127,43 +144,273 @@ def auto_segment_and_filter(text):
     return deduplicated_result
 
 
-def process_csv(input_file, output_file):
-    """处理CSV文件，读取标题列并添加分词结果"""
-    processed_rows = []
+def _init_worker():
+    """工作进程启动时加载一次jieba词典和技术术语，避免每个任务重复加载"""
+    jieba.initialize()
+    reload_dictionary()
+    load_tech_dictionary()
 
-    # 读取CSV文件
-    with open(input_file, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
 
-        # 只保留需要的列
-        fieldnames = ['id', 'title', 'segmented_words']
+OUTPUT_FIELDS = ['id', 'title', 'segmented_words']
 
-        # 处理每一行
-        for row in reader:
-            title = row['title']
-            segmented_words = auto_segment_and_filter(title)
-            # 将分词结果转换为逗号分隔的字符串格式
-            processed_row = {
-                'id': row['id'],
-                'title': row['title'],
-                'segmented_words': ','.join(segmented_words)
-            }
-            processed_rows.append(processed_row)
+# segment_server.py 的默认地址
+DEFAULT_SERVER_URL = 'http://127.0.0.1:8765'
 
-    # 写入新的CSV文件
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(processed_rows)
 
-    print(f"处理完成，结果已保存到 {output_file}")
+class SegmentClient:
+    """
+    常驻分词服务（segment_server.py）的客户端
 
+    服务使用的词典版本与本地不一致时视为不可用，避免分词结果与缓存版本混用。
+    """
 
-if __name__ == "__main__":
+    def __init__(self, url=DEFAULT_SERVER_URL, timeout=30, batch_size=1000):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+    def _request(self, path, payload=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data,
+                                         headers={'Content-Type': 'application/json; charset=utf-8'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def available(self, log=sys.stdout):
+        """检查服务是否可用且词典版本一致"""
+        try:
+            health = self._request('/health')
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f"分词服务 {self.url} 不可用({e})，改为本地分词", file=log)
+            return False
+        if health.get('dictionary_version') != dictionary_version():
+            print(f"分词服务 {self.url} 的词典版本与本地不一致，改为本地分词", file=log)
+            return False
+        return True
+
+    def segment(self, texts):
+        """
+        批量分词
+
+        Raises:
+            ValueError: 服务返回的词典版本与本地不一致
+            urllib.error.URLError: 请求失败
+        """
+        results = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self._request('/segment', {'texts': texts[start:start + self.batch_size]})
+            if response['dictionary_version'] != dictionary_version():
+                raise ValueError("分词服务的词典版本已变化")
+            results.extend(response['results'])
+        return results
+
+
+def _open_input(input_file):
+    """打开输入文件：'-' 为标准输入，.gz 结尾的按gzip解压读取"""
+    if input_file == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    if input_file.endswith('.gz'):
+        return gzip.open(input_file, 'rt', encoding='utf-8-sig', newline='')
+    return open(input_file, 'r', encoding='utf-8-sig', newline='')
+
+
+def iter_input_rows(input_file, skip_ids=None):
+    """
+    逐行读取输入CSV，生成 (id, title)
+
+    Args:
+        input_file: 输入CSV文件路径，需包含 id、title 列
+        skip_ids: 需要跳过的id集合（断点续跑时为输出文件中已有的id）
+    """
+    with _open_input(input_file) as csvfile:
+        for row in csv.DictReader(csvfile):
+            if skip_ids and row['id'] in skip_ids:
+                continue
+            yield row['id'], row['title']
+
+
+def read_done_ids(output_file):
+    """
+    读取已有输出文件中的id，用于断点续跑
+
+    上次中断时最后一行可能只写了一半，先截掉不完整的末行。
+
+    Returns:
+        set: 已处理的id
+    """
+    if output_file == '-' or not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+        return set()
+
+    with open(output_file, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 1))
+        if f.read(1) != b'\n':
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+
+    with open(output_file, 'r', encoding='utf-8', newline='') as csvfile:
+        return {row['id'] for row in csv.DictReader(csvfile)}
+
+
+def segment_rows(rows, workers=1, chunk_size=200, cache=None, client=None, log=sys.stdout):
+    """
+    对 (id, title) 流分词，按输入顺序生成 (id, title, 逗号分隔的分词结果)
+
+    每次只从输入中取出有限的一段处理，内存占用与输入大小无关。
+    提供缓存时先批量查询缓存，只对未命中的标题分词，并把结果写回缓存。
+    提供分词服务客户端时由服务分词，请求失败后改为本地分词。
+    """
+    window = chunk_size * max(workers, 1) * 4
+    pool = None
+    try:
+        while True:
+            batch = list(islice(rows, window))
+            if not batch:
+                break
+
+            titles = [title for _, title in batch]
+            if cache:
+                # 运行中词典可能被重新加载，缓存版本随之切换
+                reload_dictionary()
+                cache.set_version(dictionary_version())
+            segmented = cache.get_many(titles) if cache else {}
+            missing = list(dict.fromkeys(title for title in titles if title not in segmented))
+
+            results = None
+            if client and missing:
+                try:
+                    results = client.segment(missing)
+                except (urllib.error.URLError, OSError, ValueError) as e:
+                    print(f"分词服务请求失败({e})，改为本地分词", file=log)
+                    client = None
+            if results is None:
+                if workers > 1:
+                    if pool is None:
+                        pool = Pool(processes=workers, initializer=_init_worker)
+                    # imap 按输入顺序返回结果
+                    results = pool.imap(auto_segment_and_filter, missing, chunksize=chunk_size)
+                else:
+                    results = map(auto_segment_and_filter, missing)
+            computed = list(zip(missing, results))
+            if cache and computed:
+                cache.put_many(computed)
+            segmented.update(computed)
+
+            for article_id, title in batch:
+                yield article_id, title, ','.join(segmented[title])
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+
+def write_rows(rows, output_file, append=False, flush_every=1000, log=sys.stdout):
+    """
+    逐行写出分词结果，每 flush_every 行刷新一次到磁盘
+
+    Args:
+        rows: (id, title, 分词结果) 的迭代器
+        output_file: 输出CSV文件路径，'-' 为标准输出
+        append: 追加到已有文件（不再写表头）
+        flush_every: 刷新间隔行数
+
+    Returns:
+        int: 写出的行数
+    """
+    if output_file == '-':
+        csvfile = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=False)
+    else:
+        csvfile = open(output_file, 'a' if append else 'w', newline='', encoding='utf-8')
+
+    count = 0
+    try:
+        writer = csv.writer(csvfile)
+        if not append:
+            writer.writerow(OUTPUT_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % flush_every == 0:
+                csvfile.flush()
+                print(f"已处理 {count} 行", file=log)
+    finally:
+        if output_file == '-':
+            csvfile.flush()
+            csvfile.detach()
+        else:
+            csvfile.close()
+    return count
+
+
+def process_csv(input_file, output_file, workers=1, chunk_size=200, resume=False, flush_every=1000,
+                cache_path=None, server_url=None):
+    """
+    流式处理CSV文件，读取标题列并添加分词结果
+
+    读取、分词、写出逐行进行，内存占用与文件大小无关。
+
+    Args:
+        input_file: 输入CSV文件路径，需包含 id、title 列；'-' 为标准输入，支持 .gz
+        output_file: 输出CSV文件路径，'-' 为标准输出
+        workers: 分词进程数，为1时在当前进程中串行分词
+        chunk_size: 并行时每次分发给工作进程的标题数
+        resume: 跳过输出文件中已有的id，把新结果追加到输出文件
+        flush_every: 每写出多少行刷新一次输出文件
+        cache_path: 分词缓存文件路径，为None时不使用缓存
+        server_url: 常驻分词服务地址，服务可用时由服务分词，否则本地分词
+    """
+    # 输出到标准输出时，进度信息写到标准错误
+    log = sys.stderr if output_file == '-' else sys.stdout
+    done_ids = read_done_ids(output_file) if resume else set()
+    if done_ids:
+        print(f"断点续跑: 跳过输出文件中已有的 {len(done_ids)} 行", file=log)
+
+    client = None
+    if server_url:
+        client = SegmentClient(server_url)
+        if not client.available(log):
+            client = None
+
+    cache = SegmentCache(cache_path, dictionary_version(), log) if cache_path else None
+    try:
+        rows = iter_input_rows(input_file, done_ids)
+        count = write_rows(segment_rows(rows, workers, chunk_size, cache, client, log), output_file,
+                           append=bool(done_ids), flush_every=flush_every, log=log)
+    finally:
+        if cache:
+            print(cache, file=log)
+            cache.close()
+
+    print(f"处理完成，共 {count} 行，结果已保存到 {output_file}", file=log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对文章标题分词并过滤')
     # 根据你的输入文件路径进行修改
-    input_file = "./words/articles_202508172026.csv"
-    output_file = "./words/articles_segmented_result.csv"
+    parser.add_argument('--input', default="./words/articles_202508172026.csv",
+                        help='输入CSV文件路径，- 为标准输入，支持 .gz')
+    parser.add_argument('--output', default="./words/articles_segmented_result.csv",
+                        help='输出CSV文件路径，- 为标准输出')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help=f'分词进程数，1为串行 (默认: CPU核数 {os.cpu_count()})')
+    parser.add_argument('--chunk-size', type=int, default=200, help='每次分发给工作进程的标题数 (默认: 200)')
+    parser.add_argument('--resume', action='store_true', help='跳过输出文件中已有的id，继续上次中断的处理')
+    parser.add_argument('--flush-every', type=int, default=1000, help='每写出多少行刷新一次输出 (默认: 1000)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help=f'分词缓存文件路径 (默认: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='不使用分词缓存')
+    parser.add_argument('--server', nargs='?', const=DEFAULT_SERVER_URL,
+                        help=f'使用常驻分词服务 (默认地址: {DEFAULT_SERVER_URL})，不可用时本地分词')
+
+    args = parser.parse_args()
 
-    print("开始处理CSV文件...")
-    process_csv(input_file, output_file)
-    print("所有标题处理完成！")
+    log = sys.stderr if args.output == '-' else sys.stdout
+    print("开始处理CSV文件...", file=log)
+    process_csv(args.input, args.output, args.workers, args.chunk_size, args.resume, args.flush_every,
+                None if args.no_cache else args.cache, args.server)
+    print("所有标题处理完成！", file=log)
+
+
+if __name__ == "__main__":
+    main()
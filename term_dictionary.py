@@ -0,0 +1,145 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+from keyword_matcher import KeywordMatcher
+
+DEFAULT_DICT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dicts")
+COMPILED_FILE = "compiled.pickle"
+
+# 词典名 -> 源文件名
+DICT_FILES = {
+    "tech_terms": "tech_terms.txt",
+    "interview_keywords": "interview_keywords.txt",
+    "pos_filter": "pos_filter.txt",
+    "special_filter": "special_filter.txt",
+}
+
+# 编译产物格式变化时递增，旧产物自动重新编译
+COMPILED_FORMAT = 2
+
+
+class TermDictionary:
+    """
+    编译后的分词词典：各词表集合、术语匹配器，以及按源文件内容计算的版本号
+    """
+
+    def __init__(self, terms, version, fingerprint):
+        self.tech_terms = terms["tech_terms"]
+        self.interview_keywords = terms["interview_keywords"]
+        self.pos_filter = terms["pos_filter"]
+        self.special_filter = terms["special_filter"]
+        self.tech_matcher = KeywordMatcher(self.tech_terms)
+        self.interview_matcher = KeywordMatcher(self.interview_keywords)
+        self.version = version
+        self.fingerprint = fingerprint
+
+
+def read_term_file(path):
+    """读取词表文件：每行一个词，忽略空行和 # 开头的注释"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return {line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")}
+
+
+def source_fingerprint(dict_dir=DEFAULT_DICT_DIR):
+    """各源文件的大小和修改时间，用于快速判断是否需要重新编译或重新加载"""
+    fingerprint = {}
+    for name, file_name in DICT_FILES.items():
+        stat = os.stat(os.path.join(dict_dir, file_name))
+        fingerprint[name] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprint
+
+
+def compile_dictionary(dict_dir=DEFAULT_DICT_DIR):
+    """
+    读取源文件并编译词典，写出 compiled.pickle
+
+    Returns:
+        TermDictionary: 编译后的词典
+    """
+    fingerprint = source_fingerprint(dict_dir)
+    terms = {}
+    digest = hashlib.sha256()
+    for name, file_name in DICT_FILES.items():
+        terms[name] = read_term_file(os.path.join(dict_dir, file_name))
+        digest.update(name.encode("utf-8"))
+        digest.update("\n".join(sorted(terms[name])).encode("utf-8"))
+    dictionary = TermDictionary(terms, digest.hexdigest()[:16], fingerprint)
+
+    compiled_path = os.path.join(dict_dir, COMPILED_FILE)
+    # 多个进程可能同时编译，临时文件按进程区分
+    tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((COMPILED_FORMAT, dictionary), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, compiled_path)
+    return dictionary
+
+
+def load_dictionary(dict_dir=DEFAULT_DICT_DIR):
+    """
+    加载词典：编译产物与源文件一致时直接反序列化，否则重新编译
+
+    Returns:
+        TermDictionary: 词典
+    """
+    compiled_path = os.path.join(dict_dir, COMPILED_FILE)
+    if os.path.exists(compiled_path):
+        try:
+            with open(compiled_path, "rb") as f:
+                compiled_format, dictionary = pickle.load(f)
+            if compiled_format == COMPILED_FORMAT and dictionary.fingerprint == source_fingerprint(dict_dir):
+                return dictionary
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            pass
+    return compile_dictionary(dict_dir)
+
+
+class DictionaryWatcher:
+    """
+    运行中的进程按修改时间热加载词典
+
+    current() 最多每 check_interval 秒检查一次源文件，发生变化时重新编译加载。
+    重新加载的提示写入 log，默认为标准错误，不会混入输出到标准输出的结果中。
+    """
+
+    def __init__(self, dict_dir=DEFAULT_DICT_DIR, check_interval=5.0, log=sys.stderr):
+        self.dict_dir = dict_dir
+        self.check_interval = check_interval
+        self.log = log
+        self.dictionary = load_dictionary(dict_dir)
+        self._checked_at = time.monotonic()
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = source_fingerprint(self.dict_dir) != self.dictionary.fingerprint
+            except FileNotFoundError:
+                # 编辑器保存时可能短暂删除文件，继续使用当前词典
+                changed = False
+            if changed:
+                self.dictionary = load_dictionary(self.dict_dir)
+                print(f"词典已重新加载，版本 {self.dictionary.version}", file=self.log)
+        return self.dictionary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把 dicts/ 下的词表编译为分词词典产物')
+    parser.add_argument('--dict-dir', default=DEFAULT_DICT_DIR, help=f'词表目录 (默认: {DEFAULT_DICT_DIR})')
+
+    args = parser.parse_args()
+
+    # 通过模块名调用，使pickle中记录的类路径为 term_dictionary.TermDictionary 而不是 __main__
+    import term_dictionary
+    start = time.perf_counter()
+    dictionary = term_dictionary.compile_dictionary(args.dict_dir)
+    print(f"编译完成，版本 {dictionary.version}，技术术语 {len(dictionary.tech_terms)} 个，"
+          f"耗时 {time.perf_counter() - start:.3f} 秒")
+
+
+if __name__ == "__main__":
+    main()
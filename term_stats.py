@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+from download_articles_from_db import create_connection
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_dir", "term_stats_cache.npz")
+
+
+class TermCorpus:
+    """
+    文档-词项稀疏矩阵及每篇文章的元数据
+
+    matrix 为 CSR 格式，行对应文章、列对应词项，值为该词在文章分词结果中出现的次数；
+    account_codes / month_codes 为每行所属账号、月份在 accounts / months 中的下标。
+    """
+
+    def __init__(self, matrix, terms, article_ids, accounts, account_codes, months, month_codes, fingerprint):
+        self.matrix = matrix
+        self.terms = terms
+        self.article_ids = article_ids
+        self.accounts = accounts
+        self.account_codes = account_codes
+        self.months = months
+        self.month_codes = month_codes
+        self.fingerprint = fingerprint
+        self._term_index = None
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def term_index(self, term):
+        """词项所在的列，不存在时为None"""
+        if self._term_index is None:
+            self._term_index = {term: i for i, term in enumerate(self.terms.tolist())}
+        return self._term_index.get(term)
+
+    def binary(self):
+        """文章是否包含词项的 0/1 矩阵"""
+        matrix = self.matrix.copy()
+        matrix.data = np.ones_like(matrix.data)
+        return matrix
+
+
+def corpus_fingerprint(connection):
+    """有分词结果的文章数和最大ID，用于判断缓存是否过期"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM articles WHERE segment_words IS NOT NULL")
+        count, max_id = cursor.fetchone()
+        return [int(count), int(max_id)]
+    finally:
+        cursor.close()
+
+
+def build_corpus(connection, batch_size=20000):
+    """
+    按ID分批读取 articles.segment_words，一次遍历构建文档-词项矩阵
+
+    Returns:
+        TermCorpus: 语料
+    """
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    article_ids = []
+    account_names = []
+    month_names = []
+
+    cursor = connection.cursor()
+    try:
+        last_id = 0
+        while True:
+            cursor.execute("""
+                           SELECT id, account_name, publish_time, segment_words FROM articles
+                           WHERE id > %s AND segment_words IS NOT NULL
+                           ORDER BY id LIMIT %s
+                           """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for article_id, account_name, publish_time, segment_words in rows:
+                words = json.loads(segment_words) if segment_words else []
+                indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words if word)
+                indptr.append(len(indices))
+                article_ids.append(article_id)
+                account_names.append(account_name)
+                month_names.append(publish_time.strftime("%Y-%m") if publish_time else "unknown")
+            last_id = rows[-1][0]
+            print(f"已读取 {len(article_ids)} 篇文章的分词结果")
+    finally:
+        cursor.close()
+
+    indices = np.asarray(indices, dtype=np.int32)
+    matrix = sp.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, np.asarray(indptr, dtype=np.int64)),
+                           shape=(len(article_ids), len(vocabulary)))
+    # 合并同一篇文章中重复出现的词
+    matrix.sum_duplicates()
+
+    terms = np.empty(len(vocabulary), dtype=object)
+    for word, i in vocabulary.items():
+        terms[i] = word
+    accounts, account_codes = np.unique(np.asarray(account_names, dtype=str), return_inverse=True)
+    months, month_codes = np.unique(np.asarray(month_names, dtype=str), return_inverse=True)
+    return TermCorpus(matrix, terms.astype(str), np.asarray(article_ids, dtype=np.int64), accounts, account_codes,
+                      months, month_codes, corpus_fingerprint(connection))
+
+
+def save_corpus(corpus, cache_path=DEFAULT_CACHE_PATH):
+    """把语料缓存到磁盘（npz，不使用pickle）"""
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    matrix = corpus.matrix
+    np.savez_compressed(cache_path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                        shape=np.asarray(matrix.shape), terms=corpus.terms, article_ids=corpus.article_ids,
+                        accounts=corpus.accounts, account_codes=corpus.account_codes, months=corpus.months,
+                        month_codes=corpus.month_codes, fingerprint=np.asarray(corpus.fingerprint))
+
+
+def load_cached_corpus(cache_path=DEFAULT_CACHE_PATH):
+    """读取缓存的语料，文件不存在时返回None"""
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path, allow_pickle=False) as f:
+        matrix = sp.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return TermCorpus(matrix, f["terms"], f["article_ids"], f["accounts"], f["account_codes"], f["months"],
+                          f["month_codes"], f["fingerprint"].tolist())
+
+
+def get_corpus(connection, cache_path=DEFAULT_CACHE_PATH, refresh=False):
+    """
+    获取语料：缓存与数据库一致时直接读取缓存，否则重新构建并写入缓存
+
+    只有文章数或最大ID变化会被识别为过期；重新分词后请用 refresh=True 强制重建。
+    """
+    if not refresh:
+        corpus = load_cached_corpus(cache_path)
+        if corpus is not None and corpus.fingerprint == corpus_fingerprint(connection):
+            print(f"使用缓存的语料: {cache_path}")
+            return corpus
+    corpus = build_corpus(connection)
+    save_corpus(corpus, cache_path)
+    print(f"语料已缓存到 {cache_path}")
+    return corpus
+
+
+def document_frequency(corpus):
+    """每个词项出现的文章数"""
+    return np.asarray((corpus.matrix > 0).sum(axis=0)).ravel()
+
+
+def tfidf(corpus):
+    """
+    计算TF-IDF矩阵（平滑IDF，行L2归一化）
+
+    Returns:
+        scipy.sparse.csr_matrix: 与 corpus.matrix 形状相同
+    """
+    n_docs = corpus.shape[0]
+    idf = np.log((1 + n_docs) / (1 + document_frequency(corpus))) + 1
+    weighted = sp.csr_matrix(corpus.matrix.multiply(idf[np.newaxis, :]), dtype=np.float64)
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.diags(1 / norms) @ weighted
+
+
+def _group_matrix(codes, n_groups):
+    """分组指示矩阵 (分组数 x 文章数)，左乘文档-词项矩阵即可按组求和"""
+    return sp.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(n_groups, len(codes)))
+
+
+def _top_k(row, k):
+    """一行中最大的k个值的下标，按值倒序"""
+    k = min(k, len(row))
+    if k == 0:
+        return np.array([], dtype=int)
+    top = np.argpartition(-row, k - 1)[:k]
+    return top[np.argsort(-row[top], kind="stable")]
+
+
+def top_terms_by_account(corpus, k=10, weighting="tfidf"):
+    """
+    每个账号的代表性词项
+
+    Args:
+        corpus: 语料
+        k: 每个账号返回的词数
+        weighting: tfidf 为按账号累加TF-IDF，count 为按账号统计包含该词的文章数
+
+    Returns:
+        dict: {账号: [(词, 分值), ...]}
+    """
+    weights = tfidf(corpus) if weighting == "tfidf" else corpus.binary()
+    account_term = (_group_matrix(corpus.account_codes, len(corpus.accounts)) @ weights).tocsr()
+    result = {}
+    for i, account in enumerate(corpus.accounts.tolist()):
+        row = account_term.getrow(i).toarray().ravel()
+        result[account] = [(str(corpus.terms[j]), float(row[j])) for j in _top_k(row, k) if row[j] > 0]
+    return result
+
+
+def cooccurrence_matrix(corpus):
+    """词项共现矩阵：两个词同时出现的文章数，对角线置0"""
+    binary = corpus.binary().astype(np.int32)
+    cooccur = (binary.T @ binary).tocsr()
+    cooccur.setdiag(0)
+    cooccur.eliminate_zeros()
+    return cooccur
+
+
+def top_cooccurring(corpus, term, k=10, cooccur=None):
+    """
+    与指定词一起出现最多的词
+
+    Returns:
+        list: [(词, 共同出现的文章数), ...]
+    """
+    index = corpus.term_index(term)
+    if index is None:
+        return []
+    cooccur = cooccur if cooccur is not None else cooccurrence_matrix(corpus)
+    row = cooccur.getrow(index).toarray().ravel()
+    return [(str(corpus.terms[j]), int(row[j])) for j in _top_k(row, k) if row[j] > 0]
+
+
+def top_pairs(corpus, k=20, cooccur=None):
+    """
+    全语料共现次数最多的词对
+
+    Returns:
+        list: [(词1, 词2, 共同出现的文章数), ...]
+    """
+    cooccur = cooccur if cooccur is not None else cooccurrence_matrix(corpus)
+    upper = sp.triu(cooccur, k=1).tocoo()
+    top = _top_k(upper.data.astype(np.float64), k)
+    return [(str(corpus.terms[upper.row[i]]), str(corpus.terms[upper.col[i]]), int(upper.data[i])) for i in top]
+
+
+def monthly_trends(corpus, terms):
+    """
+    词项按月的文章数和占比
+
+    Args:
+        corpus: 语料
+        terms: 词列表
+
+    Returns:
+        dict: {词: [(月份, 文章数, 占当月文章的比例), ...]}，月份升序
+    """
+    columns = [(term, corpus.term_index(term)) for term in terms]
+    columns = [(term, index) for term, index in columns if index is not None]
+    if not columns:
+        return {}
+
+    group = _group_matrix(corpus.month_codes, len(corpus.months))
+    docs_per_month = np.asarray(group.sum(axis=1)).ravel()
+    selected = corpus.binary()[:, [index for _, index in columns]]
+    counts = (group @ selected).toarray()
+    shares = counts / np.maximum(docs_per_month, 1)[:, np.newaxis]
+
+    months = corpus.months.tolist()
+    return {
+        term: [(months[m], int(counts[m, j]), float(shares[m, j])) for m in range(len(months))]
+        for j, (term, _) in enumerate(columns)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='基于分词结果的语料统计：TF-IDF、账号代表词、共现和月度趋势')
+    parser.add_argument('--host', required=True, help='MySQL服务器地址')
+    parser.add_argument('--database', required=True, help='数据库名称')
+    parser.add_argument('--user', required=True, help='用户名')
+    parser.add_argument('--password', required=True, help='密码')
+    parser.add_argument('--port', type=int, default=3306, help='端口号 (默认: 3306)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help=f'语料缓存文件 (默认: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--refresh', action='store_true', help='忽略缓存，从数据库重建语料')
+    parser.add_argument('--top-k', type=int, default=10, help='每项列出的词数 (默认: 10)')
+    parser.add_argument('--weighting', choices=['tfidf', 'count'], default='tfidf',
+                        help='账号代表词的计分方式 (默认: tfidf)')
+    parser.add_argument('--cooccur', nargs='+', metavar='TERM', help='列出与这些词共现最多的词')
+    parser.add_argument('--pairs', action='store_true', help='列出全语料共现最多的词对')
+    parser.add_argument('--trend', nargs='+', metavar='TERM', help='列出这些词的月度趋势')
+
+    args = parser.parse_args()
+
+    connection = create_connection(args.host, args.database, args.user, args.password, args.port)
+    if not connection:
+        return
+
+    try:
+        corpus = get_corpus(connection, args.cache, args.refresh)
+    finally:
+        if connection.is_connected():
+            connection.close()
+            print("MySQL连接已关闭")
+
+    print(f"语料: {corpus.shape[0]} 篇文章, {corpus.shape[1]} 个词项")
+
+    print("各账号代表词:")
+    for account, terms in top_terms_by_account(corpus, args.top_k, args.weighting).items():
+        print(f"  {account}: {', '.join(f'{term}({score:.2f})' for term, score in terms)}")
+
+    if args.cooccur or args.pairs:
+        cooccur = cooccurrence_matrix(corpus)
+        for term in args.cooccur or []:
+            pairs = top_cooccurring(corpus, term, args.top_k, cooccur)
+            print(f"与 {term} 共现: {', '.join(f'{other}({count})' for other, count in pairs) or '无'}")
+        if args.pairs:
+            print("共现最多的词对:")
+            for first, second, count in top_pairs(corpus, args.top_k, cooccur):
+                print(f"  {first} + {second}: {count}")
+
+    if args.trend:
+        for term, points in monthly_trends(corpus, args.trend).items():
+            print(f"{term} 月度趋势:")
+            for month, count, share in points:
+                print(f"  {month}: {count} 篇 ({share:.1%})")
+
+
+if __name__ == "__main__":
+    main()
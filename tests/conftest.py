@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# 脚本都在仓库根目录，测试直接按模块名导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def mysql_connection():
+    """设置 MYSQL_TEST_HOST 等环境变量时连接测试库，否则跳过需要MySQL的测试"""
+    if not os.environ.get("MYSQL_TEST_HOST"):
+        pytest.skip("未设置 MYSQL_TEST_HOST，跳过需要MySQL的测试")
+    from migrate_schema import create_connection
+    connection = create_connection(os.environ["MYSQL_TEST_HOST"], os.environ.get("MYSQL_TEST_DATABASE", "test"),
+                                   os.environ.get("MYSQL_TEST_USER", "root"),
+                                   os.environ.get("MYSQL_TEST_PASSWORD", ""),
+                                   int(os.environ.get("MYSQL_TEST_PORT", 3306)))
+    if not connection:
+        pytest.skip("无法连接测试MySQL")
+    yield connection
+    connection.close()
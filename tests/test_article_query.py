@@ -0,0 +1,56 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from download_articles_from_db import ArticleQuery, decode_page_token, encode_page_token
+
+
+@pytest.fixture
+def mirror():
+    """与本地镜像相同结构的内存SQLite库，采集时间有并列"""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+                       CREATE TABLE article_link_info (
+                           id INTEGER PRIMARY KEY, account_name TEXT, title TEXT, link TEXT, release_date TEXT,
+                           release_day TEXT, is_free INTEGER, collect_time TEXT
+                       )
+                       """)
+    rows = []
+    for article_id in range(1, 12):
+        collect_time = f"2025-08-0{1 + article_id // 3} 10:00:00"
+        rows.append((article_id, "账号A" if article_id % 2 else "账号B", f"标题{article_id}",
+                     f"https://mp.weixin.qq.com/s/{article_id}", "2025-08-01", "2025-08-01", 1,
+                     collect_time))
+    connection.executemany("INSERT INTO article_link_info VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    yield connection
+    connection.close()
+
+
+def test_page_token_round_trip():
+    token = encode_page_token(datetime(2025, 8, 9, 10, 0, 0), 42)
+    assert decode_page_token(token) == (datetime(2025, 8, 9, 10, 0, 0), 42)
+    with pytest.raises(ValueError):
+        decode_page_token("not-a-token")
+
+
+def test_pages_cover_all_rows_once(mirror):
+    query = ArticleQuery()
+    expected = [article.id for article in query.fetch_all(mirror)]
+
+    pages = list(query.iter_pages(mirror, 4))
+
+    assert [len(articles) for articles, _ in pages] == [4, 4, 3]
+    assert [article.id for articles, _ in pages for article in articles] == expected
+    assert pages[-1][1] is None
+    assert expected[:3] == [11, 10, 9]
+
+
+def test_fetch_page_resumes_from_token(mirror):
+    query = ArticleQuery(account_name="账号A")
+    first, token = query.fetch_page(mirror, 2)
+    second, _ = query.fetch_page(mirror, 2, token)
+
+    all_ids = [article.id for article in query.fetch_all(mirror)]
+    assert [article.id for article in first + second] == all_ids[:4]
+    assert decode_page_token(token) == (first[-1].collect_time, first[-1].id)
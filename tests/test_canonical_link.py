@@ -0,0 +1,59 @@
+import pytest
+
+from migrate_schema import canonical_link, canonical_link_sql
+
+# (原始链接, 规范化后的链接)
+LINK_CORPUS = [
+    ("https://mp.weixin.qq.com/s?__biz=MzA=&mid=1&idx=1&sn=abc&chksm=x&scene=21#wechat_redirect",
+     "https://mp.weixin.qq.com/s?__biz=MzA=&mid=1&idx=1&sn=abc"),
+    ("http://MP.WEIXIN.QQ.COM/s?sn=abc&idx=1&mid=1&__biz=MzA=",
+     "https://mp.weixin.qq.com/s?__biz=MzA=&mid=1&idx=1&sn=abc"),
+    ("https://mp.weixin.qq.com/s?__biz=中文&mid=1", "https://mp.weixin.qq.com/s?__biz=中文&mid=1"),
+    ("https://mp.weixin.qq.com/s?mid=1&mid=2", "https://mp.weixin.qq.com/s?mid=1"),
+    ("https://mp.weixin.qq.com/s?MID=1&mid=2", "https://mp.weixin.qq.com/s?mid=2"),
+    ("https://mp.weixin.qq.com/s?mid&idx=3", "https://mp.weixin.qq.com/s?idx=3"),
+    ("https://mp.weixin.qq.com/s?mid=&idx=3", "https://mp.weixin.qq.com/s?mid=&idx=3"),
+    ("https://mp.weixin.qq.com/s?a=1#x?mid=2", "https://mp.weixin.qq.com/s?a=1"),
+    # 没有标识参数的 /s 链接保留原查询参数
+    ("https://mp.weixin.qq.com/s?src=11&timestamp=1&ver=1&signature=a*b",
+     "https://mp.weixin.qq.com/s?src=11&timestamp=1&ver=1&signature=a*b"),
+    ("https://mp.weixin.qq.com/s?foo=1", "https://mp.weixin.qq.com/s?foo=1"),
+    ("https://mp.weixin.qq.com/s?", "https://mp.weixin.qq.com/s"),
+    ("https://mp.weixin.qq.com/s#rd", "https://mp.weixin.qq.com/s"),
+    ("https://mp.weixin.qq.com/s#x?mid=2", "https://mp.weixin.qq.com/s"),
+    # 短链接去掉全部查询参数
+    ("  https://mp.weixin.qq.com/s/AbCdEf?x=1#rd  ", "https://mp.weixin.qq.com/s/AbCdEf"),
+    ("https://mp.weixin.qq.com/s/", "https://mp.weixin.qq.com/s/"),
+    # 其他路径保留查询参数，路径大小写敏感
+    ("https://mp.weixin.qq.com/mp/appmsg?a=1#x", "https://mp.weixin.qq.com/mp/appmsg?a=1"),
+    ("https://mp.weixin.qq.com/S?mid=1", "https://mp.weixin.qq.com/S?mid=1"),
+    ("https://mp.weixin.qq.com", "https://mp.weixin.qq.com"),
+    ("https://mp.weixin.qq.com?x=1", "https://mp.weixin.qq.com?x=1"),
+    ("\thttps://mp.weixin.qq.com/s?mid=1\n", "https://mp.weixin.qq.com/s?mid=1"),
+    # 非微信链接只去掉锚点
+    ("https://example.com/a?b=1#c", "https://example.com/a?b=1"),
+    ("HTTP://Example.com/a?", "HTTP://Example.com/a?"),
+    ("https://mp.weixin.qq.com:443/s?mid=1", "https://mp.weixin.qq.com:443/s?mid=1"),
+    ("https://mp.weixin.qq.com.evil.com/s?mid=1", "https://mp.weixin.qq.com.evil.com/s?mid=1"),
+    ("ftp://mp.weixin.qq.com/s?mid=1", "ftp://mp.weixin.qq.com/s?mid=1"),
+    ("   ", ""),
+]
+
+
+@pytest.mark.parametrize("link, expected", LINK_CORPUS)
+def test_canonical_link(link, expected):
+    assert canonical_link(link) == expected
+
+
+def test_canonical_link_sql_matches_python(mysql_connection):
+    cursor = mysql_connection.cursor()
+    try:
+        cursor.execute("CREATE TEMPORARY TABLE tmp_links (link VARCHAR(512)) DEFAULT CHARSET = utf8mb4")
+        cursor.executemany("INSERT INTO tmp_links (link) VALUES (%s)", [(link,) for link, _ in LINK_CORPUS])
+        cursor.execute(f"SELECT link, {canonical_link_sql('link')} FROM tmp_links")
+        results = cursor.fetchall()
+    finally:
+        cursor.close()
+    assert len(results) == len(LINK_CORPUS)
+    for link, canonical in results:
+        assert canonical == canonical_link(link), link
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from dedup_articles import MIN_FEATURES, MinHasher, article_features, cluster_duplicates, lsh_candidate_pairs
+
+BODY = "Flink是一个分布式流处理框架，支持有状态计算、事件时间和精确一次语义，常用于实时数仓和实时风控等场景。"
+
+
+def test_article_features_always_include_title_shingles():
+    words = json.dumps(["Flink"])
+    first = article_features("Flink到底是什么？", words)
+    second = article_features("Flink为什么这么快？", words)
+
+    assert "w:Flink" in first
+    assert "t:Fli" in first
+    assert first != second
+    assert len(article_features("短", None)) < MIN_FEATURES
+
+
+def test_signature_is_deterministic():
+    features = article_features("标题", None, BODY)
+    assert np.array_equal(MinHasher().signature(features), MinHasher().signature(set(features)))
+    assert (MinHasher().signature(set()) == np.iinfo(np.uint32).max).all()
+
+
+def test_cluster_duplicates_groups_near_duplicates():
+    hasher = MinHasher()
+    texts = {
+        10: ("Flink入门", BODY),
+        11: ("Flink入门（转载）", BODY),
+        12: ("Flink入门", BODY + "欢迎关注。"),
+        13: ("Kafka消息队列", "Kafka是一个高吞吐的分布式消息系统，基于分区日志实现，常用于日志收集和事件驱动架构。"),
+    }
+    article_ids = np.array(list(texts), dtype=np.int64)
+    signatures = np.vstack([hasher.signature(article_features(title, None, body)) for title, body in texts.values()]
+                           + [hasher.signature(set())])
+    article_ids = np.append(article_ids, 14)
+
+    clusters = cluster_duplicates(article_ids, signatures, threshold=0.8)
+
+    # 簇ID为簇中最小的文章ID；没有特征的文章不参与聚类
+    assert clusters == {10: 10, 11: 10, 12: 10}
+
+
+def test_lsh_candidate_pairs_reports_truncated_buckets():
+    signatures = np.zeros((5, 32), dtype=np.uint32)
+    signatures[4] = np.arange(32)
+
+    pairs, truncated = lsh_candidate_pairs(signatures, bands=4, max_bucket_size=3)
+
+    assert pairs == {(0, 1), (0, 2), (1, 2)}
+    # 每个band中相同签名的桶有4篇，截断1篇
+    assert truncated == 4
@@ -0,0 +1,86 @@
+import os
+from datetime import date, datetime
+
+import pytest
+from mysql.connector import Error
+
+from export_parquet import export_table, open_dataset, _load_state
+
+LINK_ROWS = [
+    (article_id, "账号A" if article_id % 2 else "账号B", f"标题{article_id}", f"https://mp.weixin.qq.com/s/{article_id}",
+     "2025-08-01", date(2025, 8, 1), 1, datetime(2025, 7 + article_id % 2, 1, 10, 0, 0))
+    for article_id in range(1, 301)
+]
+
+
+class FakeConnection:
+    """按 id 高水位分批返回 LINK_ROWS；fail_after 次查询之后报错，模拟导出中途失败"""
+
+    def __init__(self, rows, fail_after=None):
+        self.rows = rows
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._result = []
+
+    def execute(self, query, params=()):
+        connection = self.connection
+        connection.calls += 1
+        if connection.fail_after is not None and connection.calls > connection.fail_after:
+            raise Error(msg="Lost connection to MySQL server during query")
+        last_id, limit = params
+        self._result = [row for row in connection.rows if row[0] > last_id][:limit]
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+def _part_files(output_dir):
+    return sorted(name for _, _, files in os.walk(output_dir) for name in files if name.endswith(".parquet"))
+
+
+def test_failed_export_leaves_dataset_and_state_unchanged(tmp_path):
+    output_dir = str(tmp_path)
+    export_table(FakeConnection(LINK_ROWS[:100]), "article_link_info", output_dir, batch_size=100, incremental=True)
+    files = _part_files(output_dir)
+    state = _load_state(output_dir)
+
+    # 已写出两批后连接中断
+    with pytest.raises(Error):
+        export_table(FakeConnection(LINK_ROWS, fail_after=2), "article_link_info", output_dir, batch_size=100,
+                     incremental=True)
+
+    assert _part_files(output_dir) == files
+    assert _load_state(output_dir) == state
+    assert sorted(os.listdir(output_dir)) == ["_export_state.json", "article_link_info"]
+
+    # 重新运行只追加上次成功之后的行，不会重复
+    assert export_table(FakeConnection(LINK_ROWS), "article_link_info", output_dir, batch_size=100,
+                        incremental=True) == 200
+    ids = open_dataset("article_link_info", output_dir).to_table(columns=["id"]).column("id").to_pylist()
+    assert sorted(ids) == list(range(1, 301))
+
+
+def test_full_export_replaces_dataset_only_on_success(tmp_path):
+    output_dir = str(tmp_path)
+    export_table(FakeConnection(LINK_ROWS), "article_link_info", output_dir, batch_size=100)
+    files = _part_files(output_dir)
+
+    with pytest.raises(Error):
+        export_table(FakeConnection(LINK_ROWS, fail_after=2), "article_link_info", output_dir, batch_size=100)
+    assert _part_files(output_dir) == files
+
+    export_table(FakeConnection(LINK_ROWS[:2]), "article_link_info", output_dir, batch_size=100)
+    table = open_dataset("article_link_info", output_dir).to_table()
+    assert sorted(table.column("id").to_pylist()) == [1, 2]
+    assert sorted(set(table.column("month").to_pylist())) == ["2025-07", "2025-08"]
@@ -0,0 +1,45 @@
+from keyword_index import search_articles
+
+
+class RecordingConnection:
+    """记录执行的查询和参数"""
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+
+class RecordingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=()):
+        self.connection.executed.append((query, params))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+def test_and_search_merges_terms_equal_under_collation():
+    connection = RecordingConnection()
+
+    search_articles(connection, ["Flink", "flink", "ＦＬＩＮＫ", "Kafka", "kafka"], limit=10)
+
+    _, params = connection.executed[0]
+    # 关键词、期望的关键词个数、LIMIT
+    assert params == ("Flink", "Kafka", 2, 10)
+
+
+def test_or_search_keeps_distinct_terms():
+    connection = RecordingConnection()
+
+    search_articles(connection, ["数仓", "实时数仓", "数仓"], mode="or", limit=None)
+
+    query, params = connection.executed[0]
+    assert params == ("数仓", "实时数仓")
+    assert "LIMIT" not in query
@@ -0,0 +1,30 @@
+from keyword_matcher import KeywordMatcher
+
+
+def test_latin_terms_require_word_boundaries():
+    matcher = KeywordMatcher(["Hive", "Spark", "数据"])
+    assert matcher.distinct("Archive settle sparkle 数据") == ["数据"]
+    assert matcher.distinct("HIVE和spark") == ["Hive", "Spark"]
+    assert matcher.distinct("Spark3 与 Hive2") == []
+    assert matcher.distinct("Spark-SQL/Hive") == ["Spark", "Hive"]
+
+
+def test_cjk_terms_match_inside_text():
+    matcher = KeywordMatcher(["数仓", "实时数仓", "K8s"])
+    assert matcher.find("搭建实时数仓的经验") == [(2, 6, "实时数仓")]
+    assert matcher.distinct("Flink实时数仓上K8s") == ["实时数仓", "数仓", "K8s"]
+
+
+def test_find_all_matches_brute_force():
+    terms = ["ab", "b", "abc", "数据", "数据中台", "中台"]
+    matcher = KeywordMatcher(terms)
+    text = "xabc 数据中台 abc"
+    expected = sorted(
+        (i, i + len(term), term)
+        for term in terms for i in range(len(text)) if text.startswith(term, i)
+        and not (term.isascii() and term.isalnum()
+                 and ((i > 0 and text[i - 1].isalnum() and text[i - 1].isascii())
+                      or (i + len(term) < len(text) and text[i + len(term)].isascii()
+                          and text[i + len(term)].isalnum())))
+    )
+    assert sorted(matcher.find_all(text)) == expected
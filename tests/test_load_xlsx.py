@@ -0,0 +1,78 @@
+import glob
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from load_xlsx_to_mysql import XLSX_HEADERS, iter_xlsx_chunks, normalize_xlsx_frame
+
+
+def _export_row(**values):
+    """导出表格中的一行，未给出的列为空"""
+    row = dict.fromkeys(XLSX_HEADERS)
+    row.update(values)
+    return row
+
+
+def test_normalize_xlsx_frame():
+    df = pd.DataFrame([
+        _export_row(ID=1001, 链接="https://mp.weixin.qq.com/s?__biz=MzA=&mid=1&idx=1&sn=abc&chksm=x#rd",
+                    标题="正常文章", 创建时间="2025-08-09 10:00:00", 阅读="120", 点赞=3.0, 是否原创=" 原创"),
+        _export_row(ID=1002, 链接="https://mp.weixin.qq.com/s/AbC", 标题="时间格式错误", 发布时间="昨天"),
+        _export_row(ID=1003, 链接="https://mp.weixin.qq.com/s/Def", 标题="计数错误", 阅读="十万+"),
+        _export_row(ID=1004, 链接="https://mp.weixin.qq.com/s/Ghi", 标题=None),
+        _export_row(ID=1005, 链接="https://mp.weixin.qq.com/s/Jkl?x=1", 标题="第二篇", 是否原创="转载",
+                    发布时间=datetime(2025, 8, 10, 8, 30)),
+    ])
+
+    records, skipped, row_numbers = normalize_xlsx_frame(df, "测试账号")
+
+    assert skipped == [(2, "时间或计数格式无法解析"), (3, "时间或计数格式无法解析"), (4, "缺少必要字段(url或title)")]
+    assert row_numbers == [1, 5]
+    first, second = records
+    assert first[:4] == ("1001", "测试账号", "https://mp.weixin.qq.com/s?__biz=MzA=&mid=1&idx=1&sn=abc", "正常文章")
+    assert first[6] == pd.Timestamp("2025-08-09 10:00:00")
+    assert first[7] is None
+    # 阅读、点赞、分享、喜欢、留言，空值为0
+    assert first[8:13] == (120, 3, 0, 0, 0)
+    assert first[14] == 1
+    assert second[0] == "1005"
+    assert second[2] == "https://mp.weixin.qq.com/s/Jkl"
+    assert second[7] == pd.Timestamp("2025-08-10 08:30:00")
+    assert second[14] == 0
+
+
+def test_normalize_xlsx_frame_requires_every_column():
+    df = pd.DataFrame([_export_row(链接="https://a", 标题="t")]).drop(columns=["留言"])
+    try:
+        normalize_xlsx_frame(df, "测试账号")
+    except ValueError as e:
+        assert "留言" in str(e)
+    else:
+        raise AssertionError("缺少列时应报错")
+
+
+def test_iter_xlsx_chunks(tmp_path, monkeypatch):
+    path = str(tmp_path / "export.xlsx")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append([" ID ", "链接", "标题"])
+    sheet.append([1, "https://a", "第一篇"])
+    sheet.append([None, None, None])
+    sheet.append([2, "https://b", "第二篇"])
+    sheet.append([3, "https://c", "第三篇"])
+    workbook.save(path)
+
+    # 共享字符串的临时文件写到测试目录，便于确认读取结束后被删除
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spool_dir))
+
+    chunks = list(iter_xlsx_chunks(path, chunk_size=2))
+
+    assert [chunk.index.tolist() for chunk in chunks] == [[0, 2], [3]]
+    assert chunks[0].columns.tolist() == ["ID", "链接", "标题"]
+    assert pd.concat(chunks)["标题"].tolist() == ["第一篇", "第二篇", "第三篇"]
+    assert glob.glob(os.path.join(str(spool_dir), "xlsx_strings_*")) == []
@@ -0,0 +1,238 @@
+import csv
+import os
+import re
+from datetime import datetime
+
+from mysql.connector import Error
+
+from loader_common import LoadCheckpoint, Quarantine, RowValidator, ValidationStats, write_batch
+
+COLUMNS = ['link', 'title', 'collect_time']
+
+
+class FakeConnection:
+    """
+    内存中的单表，模拟 write_batch / RowValidator 用到的MySQL行为
+
+    - 多行 INSERT 任一行出错时整条语句失败，回滚到上次提交
+    - ON DUPLICATE KEY UPDATE 的 affected rows：新增1、更新2、没有变化0
+    - bad 中的键写入时报错
+    """
+
+    def __init__(self, columns, key_column, rows=(), bad=()):
+        self.columns = columns
+        self.key_index = columns.index(key_column)
+        self.rows = {row[self.key_index]: tuple(row) for row in rows}
+        self.committed = dict(self.rows)
+        self.bad = set(bad)
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = dict(self.rows)
+
+    def rollback(self):
+        self.rows = dict(self.committed)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._result = []
+
+    def execute(self, query, params=()):
+        self.connection.queries.append(query)
+        if query.lstrip().startswith('SELECT'):
+            selected = [name.strip() for name in query.split('SELECT', 1)[1].split('FROM', 1)[0].split(',')]
+            indexes = [self.connection.columns.index(name) for name in selected]
+            self._result = [tuple(row[i] for i in indexes)
+                            for key, row in self.connection.rows.items() if key in params]
+        else:
+            self.rowcount = self._write(query, params)
+
+    def executemany(self, query, seq):
+        self.connection.queries.append(query)
+        self.rowcount = sum(self._write(query, params) for params in seq)
+
+    def fetchall(self):
+        return self._result
+
+    def _write(self, query, params):
+        connection = self.connection
+        key = params[connection.key_index]
+        if key in connection.bad:
+            raise Error(msg=f"Data too long for column: {key}")
+        if key not in connection.rows:
+            connection.rows[key] = tuple(params)
+            return 1
+        if 'ON DUPLICATE KEY UPDATE' not in query:
+            raise Error(msg=f"Duplicate entry '{key}'")
+        updated = list(connection.rows[key])
+        for column in re.findall(r"(\w+) = VALUES\(", query):
+            index = connection.columns.index(column)
+            updated[index] = params[index]
+        if tuple(updated) == connection.rows[key]:
+            return 0
+        connection.rows[key] = tuple(updated)
+        return 2
+
+
+def test_write_batch_counts_upsert_rows():
+    connection = FakeConnection(COLUMNS, 'link', rows=[('a', '旧标题', None), ('b', '不变', None)])
+    batch = [('a', '第一次', None), ('b', '不变', None), ('c', '新文章', None), ('a', '新标题', None)]
+
+    result = write_batch(connection, connection.cursor(), 'article_link_info', COLUMNS, batch,
+                         key_column='link', update_columns=['title'])
+
+    assert (result.inserted, result.updated, result.unchanged, result.duplicates) == (1, 1, 1, 1)
+    assert result.failed == []
+    # 批内重复的键保留最后一条
+    assert connection.committed['a'] == ('a', '新标题', None)
+    assert sorted(result.written) == [('a', '新标题', None), ('b', '不变', None), ('c', '新文章', None)]
+
+
+def test_write_batch_plain_insert():
+    connection = FakeConnection(COLUMNS, 'link')
+    batch = [('a', 'A', None), ('b', 'B', None)]
+
+    result = write_batch(connection, connection.cursor(), 'article_link_info', COLUMNS, batch)
+
+    assert (result.inserted, result.updated, result.unchanged) == (2, 0, 0)
+    assert result.written == batch
+    assert set(connection.committed) == {'a', 'b'}
+    # 普通插入不查询已有键
+    assert not any(query.startswith('SELECT') for query in connection.queries)
+
+
+def test_write_batch_falls_back_to_single_rows():
+    connection = FakeConnection(COLUMNS, 'link', rows=[('b', '旧', None)], bad={'x'})
+    batch = [('a', 'A', None), ('x', '坏行', None), ('b', '新', None)]
+
+    result = write_batch(connection, connection.cursor(), 'article_link_info', COLUMNS, batch,
+                         key_column='link', update_columns=['title'])
+
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 0)
+    assert [values for values, _ in result.failed] == [('x', '坏行', None)]
+    assert 'x' in result.failed[0][1]
+    assert ('x', '坏行', None) not in result.written
+    assert set(connection.committed) == {'a', 'b'}
+
+
+def test_row_validator_insert_skips_duplicates_and_existing_rows():
+    connection = FakeConnection(COLUMNS, 'link', rows=[('old', '已有', None)])
+    cursor = connection.cursor()
+    validator = RowValidator('article_link_info', COLUMNS, 'link')
+
+    first = validator.write(connection, cursor, [('a', '第一条', None), ('a', '第二条', None), ('old', '新', None)])
+    second = validator.write(connection, cursor, [('a', '跨批重复', None), ('b', 'B', None)])
+    validator.invalid(3)
+
+    assert (first.inserted, first.unchanged, first.duplicates) == (1, 1, 1)
+    assert (second.inserted, second.unchanged, second.duplicates) == (1, 0, 1)
+    # 普通插入时文件内重复保留第一条，已有行不被覆盖
+    assert connection.committed['a'] == ('a', '第一条', None)
+    assert connection.committed['old'] == ('old', '已有', None)
+    stats = validator.stats
+    assert (stats.invalid, stats.duplicates, stats.unchanged, stats.changed, stats.new) == (3, 2, 1, 0, 2)
+
+
+def test_row_validator_upsert_writes_only_changed_rows():
+    collected = datetime(2025, 8, 9, 10, 0, 0)
+    connection = FakeConnection(COLUMNS, 'link', rows=[('same', '标题', collected), ('changed', '旧', collected)])
+    cursor = connection.cursor()
+    validator = RowValidator('article_link_info', COLUMNS, 'link', ['title', 'collect_time'])
+
+    rows, existing_keys = validator.filter(cursor, [
+        ('same', ' 标题 ', '2025-08-09 10:00:00'),
+        ('changed', '新', collected),
+        ('new', '新文章', None),
+        ('new', '新文章（最后一条）', None),
+    ])
+
+    # 文件中的时间文本和数据库中的 datetime 按同一格式比较
+    assert rows == [('changed', '新', collected), ('new', '新文章（最后一条）', None)]
+    assert existing_keys == {'changed'}
+    stats = validator.stats
+    assert (stats.duplicates, stats.unchanged, stats.changed, stats.new) == (1, 1, 1, 1)
+
+
+def test_validation_stats_str():
+    stats = ValidationStats()
+    stats.invalid = 2
+    stats.new = 5
+    assert str(stats) == "校验: 无效 2 条, 文件内重复 0 条, 已存在未变化 0 条, 已存在有变化 0 条, 新增 5 条"
+
+
+def test_load_checkpoint_round_trip(tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text("account_name,title\n", encoding="utf-8")
+
+    checkpoint = LoadCheckpoint(str(source))
+    assert checkpoint.load() == 0
+    checkpoint.save(1000, 2)
+
+    resumed = LoadCheckpoint(str(source))
+    assert resumed.load() == 1000
+    assert resumed.chunk_id == 2
+    assert not os.path.exists(checkpoint.path + '.tmp')
+
+    resumed.clear()
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_load_checkpoint_ignored_after_source_changes(tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text("account_name,title\n", encoding="utf-8")
+    LoadCheckpoint(str(source)).save(1000, 2)
+
+    source.write_text("account_name,title\n账号,标题\n", encoding="utf-8")
+
+    checkpoint = LoadCheckpoint(str(source))
+    assert checkpoint.load() == 0
+    assert checkpoint.chunk_id == 0
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+
+def test_quarantine_writes_rows_on_flush(tmp_path):
+    path = str(tmp_path / "links.csv.quarantine.csv")
+    quarantine = Quarantine(path, ['link', 'title'])
+    quarantine.add(3, '缺少必要字段', ['https://a', ''])
+    assert not os.path.exists(path)
+
+    quarantine.flush()
+    quarantine.add(7, '标题超过512个字符', ['https://b', 'x'])
+    quarantine.close()
+
+    # 未 flush 的行属于没有提交的批次，不写入
+    assert _read_csv(path) == [['link', 'title', '_row_no', '_reason'], ['https://a', '', '3', '缺少必要字段']]
+    assert quarantine.count == 1
+
+
+def test_quarantine_append_keeps_existing_rows(tmp_path):
+    path = str(tmp_path / "links.csv.quarantine.csv")
+    first = Quarantine(path, ['link'])
+    first.add(1, '原因1', ['https://a'])
+    first.flush()
+    first.close()
+
+    resumed = Quarantine(path, ['link'], append=True)
+    resumed.add(5, '原因2', ['https://b'])
+    resumed.flush()
+    resumed.close()
+
+    assert _read_csv(path) == [['link', '_row_no', '_reason'], ['https://a', '1', '原因1'], ['https://b', '5', '原因2']]
+
+    restarted = Quarantine(path, ['link'])
+    restarted.add(2, '原因3', ['https://c'])
+    restarted.flush()
+    restarted.close()
+
+    # 不续传时覆盖旧的隔离文件
+    assert _read_csv(path) == [['link', '_row_no', '_reason'], ['https://c', '2', '原因3']]
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from migrate_schema import release_day_sql
+
+# (发布日期文本, 解析出的 release_day)
+RELEASE_DATE_CORPUS = [
+    ("2025-08-09", date(2025, 8, 9)),
+    ("2025-8-9 10:00:00", date(2025, 8, 9)),
+    ("2024-02-29", date(2024, 2, 29)),
+    ("2025/12/31 23:59", date(2025, 12, 31)),
+    ("2025年8月9日", date(2025, 8, 9)),
+    ("2025年12月31日 10:00", date(2025, 12, 31)),
+    # 不存在的日期解析为NULL，严格模式下也不能报错
+    ("2025-02-30", None),
+    ("2023-02-29", None),
+    ("2025-04-31", None),
+    ("2025-13-01", None),
+    ("2025-00-10", None),
+    ("0999-01-01", None),
+    ("2025/02/30", None),
+    ("2025年02月30日", None),
+    ("2025年13月01日", None),
+    # 无法识别的写法
+    ("昨天", None),
+    ("2025-08-09abc", None),
+    ("", None),
+]
+
+
+def test_release_day_sql_guards_every_str_to_date():
+    sql = release_day_sql('release_date')
+    # 每个格式分支都先校验年月日范围，再调用 STR_TO_DATE
+    assert sql.count("STR_TO_DATE") == 3
+    assert sql.count("THEN CASE WHEN") == 3
+    assert sql.count("BETWEEN 1 AND 12") == 3
+
+
+def test_release_day_sql_in_strict_mode(mysql_connection):
+    cursor = mysql_connection.cursor()
+    try:
+        cursor.execute("SET SESSION sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_IN_DATE,NO_ZERO_DATE'")
+        cursor.execute("CREATE TEMPORARY TABLE tmp_release_dates (release_date VARCHAR(64), release_day DATE)"
+                       " DEFAULT CHARSET = utf8mb4")
+        cursor.executemany("INSERT INTO tmp_release_dates (release_date) VALUES (%s)",
+                           [(value,) for value, _ in RELEASE_DATE_CORPUS])
+        # 触发器和回填都在 UPDATE/INSERT 中求值，严格模式下非法日期会让 STR_TO_DATE 报错
+        cursor.execute(f"UPDATE tmp_release_dates SET release_day = {release_day_sql('release_date')}")
+        cursor.execute("SELECT release_date, release_day FROM tmp_release_dates")
+        results = dict(cursor.fetchall())
+    finally:
+        cursor.close()
+    assert results == dict(RELEASE_DATE_CORPUS)
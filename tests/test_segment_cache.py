@@ -0,0 +1,38 @@
+import io
+
+from segment_cache import SegmentCache
+
+
+def test_get_many_counts_hits_and_misses(tmp_path):
+    cache = SegmentCache(str(tmp_path / "segment_cache.db"), version="v1", log=io.StringIO())
+    cache.put_many([("Flink 实时数仓", ["Flink", "实时数仓"])])
+
+    # 只差空白的文本共用同一条缓存
+    found = cache.get_many(["  Flink   实时数仓 ", "Spark调优", "Spark调优"])
+
+    assert found == {"  Flink   实时数仓 ": ["Flink", "实时数仓"]}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get("Flink 实时数仓") == ["Flink", "实时数仓"]
+    assert cache.hit_rate() == 2 / 3
+    cache.close()
+
+
+def test_version_change_clears_cache(tmp_path):
+    path = str(tmp_path / "segment_cache.db")
+    log = io.StringIO()
+    cache = SegmentCache(path, version="v1", log=log)
+    cache.put("Flink", ["Flink"])
+    cache.close()
+
+    same = SegmentCache(path, version="v1", log=log)
+    assert same.get("Flink") == ["Flink"]
+    same.close()
+    assert log.getvalue() == ""
+
+    changed = SegmentCache(path, version="v2", log=log)
+    assert changed.get("Flink") is None
+    assert "清空分词缓存" in log.getvalue()
+    changed.put("Flink", ["Flink", "流计算"])
+    changed.set_version("v2")
+    assert changed.get("Flink") == ["Flink", "流计算"]
+    changed.close()
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime
+
+import numpy as np
+
+from term_stats import build_corpus, cooccurrence_matrix, document_frequency, tfidf, top_cooccurring
+
+ARTICLES = [
+    (1, "账号A", datetime(2025, 7, 1), json.dumps(["Flink", "Kafka", "Flink"])),
+    (2, "账号A", datetime(2025, 8, 1), json.dumps(["Flink", "Spark"])),
+    (3, "账号B", None, json.dumps([])),
+    (4, "账号B", datetime(2025, 8, 2), json.dumps(["Kafka", "Spark", "Hive"])),
+]
+
+
+class FakeConnection:
+    """按 build_corpus 的分批查询返回 ARTICLES"""
+
+    def cursor(self):
+        return FakeCursor()
+
+
+class FakeCursor:
+    def __init__(self):
+        self._result = []
+
+    def execute(self, query, params=()):
+        if "COUNT(*)" in query:
+            self._result = [(len(ARTICLES), max(row[0] for row in ARTICLES))]
+        else:
+            last_id, limit = params
+            self._result = [row for row in ARTICLES if row[0] > last_id][:limit]
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0]
+
+    def close(self):
+        pass
+
+
+def _corpus():
+    return build_corpus(FakeConnection(), batch_size=2)
+
+
+def test_build_corpus_counts_terms_per_article():
+    corpus = _corpus()
+
+    assert corpus.shape == (4, 4)
+    assert corpus.article_ids.tolist() == [1, 2, 3, 4]
+    counts = {(int(i), str(corpus.terms[j])): int(corpus.matrix[i, j]) for i, j in zip(*corpus.matrix.nonzero())}
+    assert counts == {(0, "Flink"): 2, (0, "Kafka"): 1, (1, "Flink"): 1, (1, "Spark"): 1,
+                      (3, "Kafka"): 1, (3, "Spark"): 1, (3, "Hive"): 1}
+    assert corpus.accounts[corpus.account_codes].tolist() == ["账号A", "账号A", "账号B", "账号B"]
+    assert corpus.months[corpus.month_codes].tolist() == ["2025-07", "2025-08", "unknown", "2025-08"]
+    assert corpus.fingerprint == [4, 4]
+
+
+def test_tfidf_matches_reference():
+    corpus = _corpus()
+    counts = corpus.matrix.toarray().astype(float)
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + counts.shape[0]) / (1 + df)) + 1
+    expected = counts * idf
+    norms = np.linalg.norm(expected, axis=1, keepdims=True)
+    expected = np.divide(expected, norms, out=np.zeros_like(expected), where=norms > 0)
+
+    weights = tfidf(corpus).toarray()
+
+    assert document_frequency(corpus).tolist() == df.tolist()
+    np.testing.assert_allclose(weights, expected)
+    # 没有分词结果的文章保持全0
+    assert not weights[2].any()
+
+
+def test_cooccurrence_counts_articles_not_occurrences():
+    corpus = _corpus()
+    cooccur = cooccurrence_matrix(corpus)
+    flink, kafka, spark = (corpus.term_index(term) for term in ("Flink", "Kafka", "Spark"))
+
+    assert cooccur[flink, kafka] == 1
+    assert cooccur[kafka, spark] == 1
+    assert cooccur.diagonal().sum() == 0
+    assert (cooccur != cooccur.T).nnz == 0
+    assert sorted(top_cooccurring(corpus, "Spark", cooccur=cooccur)) == [("Flink", 1), ("Hive", 1), ("Kafka", 1)]
+    assert top_cooccurring(corpus, "不存在") == []